@@ -19,6 +19,7 @@ from scripts.utils.paths import (
     PROJECT_ROOT, DATA_SOURCE_DIR, DATA_CLEANED_DIR,
     DATA_DIR, RESEARCH_CONNECTIONS_DIR, RESEARCH_SUMMARIES_DIR
 )
+from scripts.utils.string_matching import first_contained_pattern, substrings_of
 
 def normalize_name(name: str) -> str:
     """Normalize names for matching"""
@@ -87,12 +88,43 @@ def load_dpor_results() -> pd.DataFrame:
 
     return pd.DataFrame()
 
+def normalize_name_series(values: pd.Series) -> pd.Series:
+    """Vectorized normalize_name over a column (missing values become "")"""
+    values = values.astype(object).where(values.notna(), "")
+    return (values.astype(str)
+            .str.upper()
+            .str.replace(r'[^\w\s]', '', regex=True)
+            .str.replace(r'\s+', ' ', regex=True)
+            .str.strip())
+
+def _column(df: pd.DataFrame, name: str, default: Any = '') -> pd.Series:
+    """Column by name, or a constant Series when the column is absent"""
+    if name in df.columns:
+        return df[name]
+    if isinstance(default, pd.Series):
+        return default
+    return pd.Series(default, index=df.index, dtype=object)
+
+def _match_references(normalized: pd.Series, references: List[str]) -> pd.Series:
+    """Index of the first reference whose normalized form is contained in each value (-1 if none)"""
+    reference_norms = [normalize_name(ref) for ref in references]
+    first_match = first_contained_pattern(normalized.unique(), reference_norms)
+    return normalized.map(first_match).fillna(-1).astype(int)
+
 def find_skidmore_connections(dpor_results: pd.DataFrame, skidmore_data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
-    """Find firms connected to Skidmore"""
-    connections = []
+    """Find firms connected to Skidmore
+
+    Reference names and addresses are normalized once; DPOR columns are
+    normalized with pandas string ops and only their distinct values are
+    matched (hash lookup for exact matches, Aho-Corasick for containment).
+    Each row takes the first check that matches, in order: principal broker,
+    Skidmore address, known firm address, known firm name. Empty values never
+    match.
+    """
+    columns = ['firm_name', 'license_number', 'state', 'connection_type', 'connection_detail', 'skidmore_license']
 
     if len(dpor_results) == 0:
-        return pd.DataFrame(columns=['firm_name', 'license_number', 'state', 'connection_type', 'connection_detail', 'skidmore_license'])
+        return pd.DataFrame(columns=columns)
 
     # Extract Skidmore name variations
     skidmore_names = [
@@ -126,75 +158,57 @@ def find_skidmore_connections(dpor_results: pd.DataFrame, skidmore_data: Dict[st
     else:
         known_firms = []
 
-    # Check each DPOR result
-    for idx, row in dpor_results.iterrows():
-        firm_name = row.get('name', '')
-        firm_name_cleaned = row.get('name_cleaned', firm_name)
-        license_number = row.get('license_number', '')
-        address = row.get('address', '')
-        address_norm = row.get('address_normalized', address)
-        principal_broker = row.get('principal_broker', '')
-        state = row.get('state', '')
-
-        connection_found = False
-        connection_type = ""
-        connection_detail = ""
-        skidmore_license = ""
-
-        # Check 1: Principal broker is Skidmore
-        if principal_broker and principal_broker != "":
-            principal_normalized = normalize_name(principal_broker)
-            for skidmore_norm in skidmore_normalized:
-                if skidmore_norm in principal_normalized or principal_normalized in skidmore_norm:
-                    connection_found = True
-                    connection_type = "Principal Broker"
-                    connection_detail = f"Listed as Principal Broker: {principal_broker}"
-                    break
-
-        # Check 2: Same address as Skidmore licenses
-        if not connection_found and address_norm and address_norm != "":
-            address_normalized = normalize_name(address_norm)
-            for skidmore_addr in skidmore_addresses:
-                skidmore_addr_norm = normalize_name(skidmore_addr)
-                if address_normalized == skidmore_addr_norm or skidmore_addr_norm in address_normalized:
-                    connection_found = True
-                    connection_type = "Same Address"
-                    connection_detail = f"Same address as Skidmore license: {skidmore_addr}"
-                    break
-
-        # Check 3: Same address as known firms
-        if not connection_found and address_norm and address_norm != "":
-            address_normalized = normalize_name(address_norm)
-            for firm_addr in known_firm_addresses:
-                firm_addr_norm = normalize_name(firm_addr)
-                if address_normalized == firm_addr_norm or firm_addr_norm in address_normalized:
-                    connection_found = True
-                    connection_type = "Same Address as Known Firm"
-                    connection_detail = f"Same address as known firm: {firm_addr}"
-                    break
-
-        # Check 4: Firm name matches known firms
-        if not connection_found and firm_name_cleaned and firm_name_cleaned != "":
-            firm_normalized = normalize_name(firm_name_cleaned)
-            for known_firm in known_firms:
-                known_firm_norm = normalize_name(known_firm)
-                if firm_normalized == known_firm_norm or known_firm_norm in firm_normalized:
-                    connection_found = True
-                    connection_type = "Known Firm Match"
-                    connection_detail = f"Matches known firm: {known_firm}"
-                    break
-
-        if connection_found:
-            connections.append({
-                'firm_name': firm_name_cleaned,
-                'license_number': license_number,
-                'state': state,
-                'connection_type': connection_type,
-                'connection_detail': connection_detail,
-                'skidmore_license': skidmore_license
-            })
-
-    return pd.DataFrame(connections)
+    firm_name = _column(dpor_results, 'name')
+    firm_name_cleaned = _column(dpor_results, 'name_cleaned', firm_name)
+    address = _column(dpor_results, 'address')
+    address_norm = _column(dpor_results, 'address_normalized', address)
+
+    principal_normalized = normalize_name_series(_column(dpor_results, 'principal_broker'))
+    address_normalized = normalize_name_series(address_norm)
+    firm_normalized = normalize_name_series(firm_name_cleaned)
+
+    connection_type = pd.Series('', index=dpor_results.index, dtype=object)
+    connection_detail = pd.Series('', index=dpor_results.index, dtype=object)
+    unmatched = pd.Series(True, index=dpor_results.index)
+
+    # Check 1: Principal broker is Skidmore (either name contains the other)
+    principal_broker = _column(dpor_results, 'principal_broker')
+    skidmore_variants = substrings_of(skidmore_normalized)
+    principal_values = principal_normalized.unique()
+    principal_hits = set(first_contained_pattern(principal_values, skidmore_normalized))
+    principal_hits.update(v for v in principal_values if v in skidmore_variants)
+    is_principal = principal_normalized.isin(principal_hits) & (principal_normalized != "")
+    connection_type[is_principal] = "Principal Broker"
+    connection_detail[is_principal] = "Listed as Principal Broker: " + principal_broker[is_principal].astype(str)
+    unmatched &= ~is_principal
+
+    # Checks 2-4: containment against reference lists, first reference in list order wins
+    reference_checks = [
+        (address_normalized, skidmore_addresses, "Same Address", "Same address as Skidmore license: "),
+        (address_normalized, known_firm_addresses, "Same Address as Known Firm", "Same address as known firm: "),
+        (firm_normalized, known_firms, "Known Firm Match", "Matches known firm: "),
+    ]
+    for normalized, references, type_label, detail_prefix in reference_checks:
+        if not references or not unmatched.any():
+            continue
+        match_index = _match_references(normalized[unmatched], references)
+        matched = match_index[match_index >= 0]
+        if matched.empty:
+            continue
+        reference_values = pd.Series(references, dtype=object).astype(str)
+        connection_type[matched.index] = type_label
+        connection_detail[matched.index] = (detail_prefix + reference_values.iloc[matched.values]).values
+        unmatched[matched.index] = False
+
+    found = ~unmatched
+    return pd.DataFrame({
+        'firm_name': firm_name_cleaned[found].values,
+        'license_number': _column(dpor_results, 'license_number')[found].values,
+        'state': _column(dpor_results, 'state')[found].values,
+        'connection_type': connection_type[found].values,
+        'connection_detail': connection_detail[found].values,
+        'skidmore_license': '',
+    }, columns=columns)
 
 def generate_network_analysis(connections: pd.DataFrame, skidmore_data: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
     """Generate connection network analysis"""
@@ -8,8 +8,12 @@ import pandas as pd
 import numpy as np
 import re
 import json
+import shutil
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from transformers import pipeline, AutoTokenizer, AutoModelForTokenClassification
+from typing import Dict, List, Optional, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -21,26 +25,238 @@ project_root = os.path.dirname(script_dir)
 
 DATA_DIR = Path(project_root) / "data" / "raw"
 CLEANED_DIR = Path(project_root) / "data" / "cleaned"
-CLEANED_DIR.mkdir(parents=True, exist_ok=True)
-
-# Initialize Hugging Face models for NER and text processing
-print("Loading Hugging Face models...")
-try:
-    # Named Entity Recognition for extracting entities
-    ner_pipeline = pipeline("ner",
-                          model="dbmdz/bert-large-cased-finetuned-conll03-english",
-                          aggregation_strategy="simple")
-    print("NER model loaded successfully")
-except Exception as e:
-    print(f"Warning: Could not load NER model: {e}")
-    ner_pipeline = None
-
-def clean_firm_names(df: pd.DataFrame) -> pd.DataFrame:
+CACHE_DIR = Path(project_root) / "data" / "cache"
+
+# Hugging Face NER model, loaded lazily on first use (CPU only)
+NER_MODEL = "dbmdz/bert-large-cased-finetuned-conll03-english"
+# Inference backend: "torch" (default), "quantized" (int8 dynamic quantization) or "onnx" (requires optimum[onnxruntime])
+NER_BACKEND = os.environ.get("NER_BACKEND", "torch").lower()
+CPU_COUNT = os.cpu_count() or 4
+NER_BATCH_SIZE = int(os.environ.get("NER_BATCH_SIZE", max(8, min(64, CPU_COUNT * 4))))
+NER_CACHE_FILE = CACHE_DIR / "ner_org_cache.sqlite"
+
+# Rows per chunk when streaming CSVs, and the state-partitioned Parquet output
+CHUNK_ROWS = int(os.environ.get("CLEAN_CHUNK_ROWS", 100_000))
+PARQUET_DIR = CLEANED_DIR / "parquet"
+PARQUET_NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# Date formats tried column-wise by parse_dates, in tie-break order, and the inference sample size
+DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+    '%Y/%m/%d',
+    '%m-%d-%Y',
+    '%d-%m-%Y',
+    '%Y-%m-%d %H:%M:%S',
+    '%m/%d/%y',
+    '%B %d, %Y',
+    '%b %d, %Y',
+    '%Y%m%d',
+    'ISO8601',
+]
+DATE_SAMPLE_SIZE = 1000
+
+_ner_pipeline = None
+_ner_loaded = False
+_ner_lock = threading.Lock()
+
+
+def _build_ner_pipeline():
+    """Construct the NER pipeline for the configured backend on CPU"""
+    from transformers import pipeline, AutoTokenizer, AutoModelForTokenClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(NER_MODEL)
+    if NER_BACKEND == "onnx":
+        from optimum.onnxruntime import ORTModelForTokenClassification
+        model = ORTModelForTokenClassification.from_pretrained(NER_MODEL, export=True)
+    else:
+        import torch
+        torch.set_num_threads(CPU_COUNT)
+        model = AutoModelForTokenClassification.from_pretrained(NER_MODEL)
+        model.eval()
+        if NER_BACKEND == "quantized":
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    return pipeline("ner", model=model, tokenizer=tokenizer,
+                    aggregation_strategy="simple", device=-1)
+
+
+def get_ner_pipeline():
+    """
+    Return the shared NER pipeline, loading it on first call.
+
+    Returns None (and does not retry) if the model cannot be loaded.
+    """
+    global _ner_pipeline, _ner_loaded
+    if not _ner_loaded:
+        with _ner_lock:
+            if not _ner_loaded:
+                print(f"Loading Hugging Face NER model ({NER_BACKEND} backend)...")
+                try:
+                    _ner_pipeline = _build_ner_pipeline()
+                    print("NER model loaded successfully")
+                except Exception as e:
+                    print(f"Warning: Could not load NER model: {e}")
+                    _ner_pipeline = None
+                _ner_loaded = True
+    return _ner_pipeline
+
+
+class NerOrgCache:
+    """Persistent name -> ORG-entity text cache (empty string when NER found no ORG)"""
+
+    def __init__(self, path: Path = NER_CACHE_FILE, model: str = NER_MODEL):
+        self.model = model
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ner_org (model TEXT NOT NULL, name TEXT NOT NULL, "
+            "org TEXT NOT NULL, PRIMARY KEY (model, name))"
+        )
+        self._conn.commit()
+
+    def get_many(self, names: List[str]) -> Dict[str, str]:
+        found = {}
+        for start in range(0, len(names), 900):
+            chunk = names[start:start + 900]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT name, org FROM ner_org WHERE model = ? AND name IN ({placeholders})",
+                [self.model] + chunk
+            ).fetchall()
+            found.update(rows)
+        return found
+
+    def put_many(self, results: Dict[str, str]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO ner_org (model, name, org) VALUES (?, ?, ?)",
+            [(self.model, name, org) for name, org in results.items()]
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def extract_org_names(names: List[str], cache_only: bool = False) -> Optional[Dict[str, str]]:
+    """
+    Map each distinct non-empty name to its NER ORG text ("" if none found).
+
+    Names already in the persistent cache skip the model entirely; the rest are
+    sent through the pipeline in CPU-sized batches, shortest first to limit
+    padding. Returns None if the model is needed but unavailable. With
+    cache_only the model is never loaded and uncached names are left out.
+    """
+    unique_names = [name for name in dict.fromkeys(names) if name]
+    if not unique_names:
+        return {}
+
+    cache = NerOrgCache()
+    try:
+        org_by_name = cache.get_many(unique_names)
+        missing = sorted((name for name in unique_names if name not in org_by_name), key=len)
+        if not missing or cache_only:
+            return org_by_name
+
+        ner = get_ner_pipeline()
+        if ner is None:
+            return None
+
+        print(f"  Running NER on {len(missing)} uncached names (batch size {NER_BATCH_SIZE})...")
+        # Persist every few batches so an interrupted run keeps its progress
+        chunk_size = NER_BATCH_SIZE * 16
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start:start + chunk_size]
+            outputs = ner(chunk, batch_size=NER_BATCH_SIZE)
+            results = {
+                name: ' '.join(e['word'] for e in entities if e['entity_group'] == 'ORG')
+                for name, entities in zip(chunk, outputs)
+            }
+            cache.put_many(results)
+            org_by_name.update(results)
+        return org_by_name
+    finally:
+        cache.close()
+
+# Precompiled patterns for vectorized Series.str.replace cleaning
+NAME_TRAILING_PUNCT_RE = re.compile(r'[.,;:]+$')
+NAME_SUFFIX_RE = re.compile(r'\s+(Inc|LLC|Corporation|Corp|Company|Co|Ltd|Limited)\.?$', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+ADDRESS_REPLACEMENTS = [
+    (re.compile(pattern, re.IGNORECASE), replacement)
+    for pattern, replacement in [
+        (r'\bSt\b', 'Street'),
+        (r'\bAve\b', 'Avenue'),
+        (r'\bRd\b', 'Road'),
+        (r'\bBlvd\b', 'Boulevard'),
+        (r'\bDr\b', 'Drive'),
+        (r'\bLn\b', 'Lane'),
+        (r'\bPkwy\b', 'Parkway'),
+        (r'\bSte\b', 'Suite'),
+        (r'\bSte\.\b', 'Suite'),
+        (r'\b#\s*', 'Suite '),
+        (r'\bApt\b', 'Apartment'),
+        (r'\bApt\.\b', 'Apartment'),
+    ]
+]
+DOUBLE_COMMA_RE = re.compile(r',\s*,')
+COMMA_SPACING_RE = re.compile(r'\s*,\s*')
+
+
+def _present_mask(values: pd.Series) -> pd.Series:
+    """Rows that are neither missing nor empty strings (those pass through unchanged)"""
+    return values.notna() & (values != "")
+
+
+def standardize_names(names: pd.Series) -> pd.Series:
+    """
+    Standardize firm names column-wise.
+
+    Trims, drops trailing punctuation and a trailing corporate suffix,
+    collapses whitespace and title-cases. Missing/empty values are unchanged.
+    """
+    mask = _present_mask(names)
+    cleaned = (names[mask].astype(str).str.strip()
+               .str.replace(NAME_TRAILING_PUNCT_RE, '', regex=True)
+               .str.replace(NAME_SUFFIX_RE, '', regex=True)
+               .str.replace(WHITESPACE_RE, ' ', regex=True)
+               .str.strip()
+               .str.title())
+    result = names.astype(object).copy()
+    result[mask] = cleaned
+    return result
+
+
+def normalize_address_series(addresses: pd.Series) -> pd.Series:
+    """
+    Normalize addresses column-wise.
+
+    Expands common abbreviations (St -> Street, Ave -> Avenue, etc.) and
+    normalizes whitespace and comma usage. Missing/empty values are unchanged.
+    """
+    mask = _present_mask(addresses)
+    cleaned = addresses[mask].astype(str).str.strip()
+    for pattern, replacement in ADDRESS_REPLACEMENTS:
+        cleaned = cleaned.str.replace(pattern, replacement, regex=True)
+    cleaned = (cleaned.str.replace(WHITESPACE_RE, ' ', regex=True)
+               .str.strip()
+               .str.replace(DOUBLE_COMMA_RE, ',', regex=True)
+               .str.replace(COMMA_SPACING_RE, ', ', regex=True))
+    result = addresses.astype(object).copy()
+    result[mask] = cleaned
+    return result
+
+
+def clean_firm_names(df: pd.DataFrame, use_ner: bool = True, ner_cache_only: bool = False) -> pd.DataFrame:
     """
     Clean and standardize firm names using pattern matching and Hugging Face NER.
 
     Args:
         df: DataFrame with 'name' column
+        use_ner: Run NER for 'name_ner'; when False it copies 'name_cleaned'
+        ner_cache_only: Only read NER results from the cache (never load the
+            model); names missing from the cache get 'name_cleaned'
 
     Returns:
         DataFrame with 'name_cleaned' and 'name_ner' columns added
@@ -48,48 +264,25 @@ def clean_firm_names(df: pd.DataFrame) -> pd.DataFrame:
     if 'name' not in df.columns:
         return df
 
-    def standardize_name(name):
-        if pd.isna(name) or name == "":
-            return name
-
-        # Remove common suffixes and standardize
-        name = str(name).strip()
-
-        # Remove trailing punctuation
-        name = re.sub(r'[.,;:]+$', '', name)
+    df['name_cleaned'] = standardize_names(df['name'])
 
-        # Standardize common suffixes
-        name = re.sub(r'\s+(Inc|LLC|Corporation|Corp|Company|Co|Ltd|Limited)\.?$', '', name, flags=re.IGNORECASE)
-
-        # Remove extra whitespace
-        name = re.sub(r'\s+', ' ', name).strip()
-
-        # Capitalize properly
-        name = name.title()
-
-        return name
-
-    df['name_cleaned'] = df['name'].apply(standardize_name)
+    if not use_ner:
+        df['name_ner'] = df['name_cleaned']
+        return df
 
-    # Use NER to extract organization names if available
-    if ner_pipeline:
-        try:
-            org_names = []
-            for name in df['name'].fillna(''):
-                if name:
-                    entities = ner_pipeline(name)
-                    org_entities = [e['word'] for e in entities if e['entity_group'] == 'ORG']
-                    if org_entities:
-                        org_names.append(' '.join(org_entities))
-                    else:
-                        org_names.append(name)
-                else:
-                    org_names.append('')
-            df['name_ner'] = org_names
-        except Exception as e:
-            print(f"Warning: NER processing failed: {e}")
+    # Use NER to extract organization names if available (batched over distinct names, cached)
+    try:
+        names = df['name'].fillna('').astype(str)
+        org_by_name = extract_org_names(names.tolist(), cache_only=ner_cache_only)
+        if org_by_name is None:
             df['name_ner'] = df['name_cleaned']
-    else:
+        else:
+            org_names = names.map(org_by_name)
+            uncached = org_names.isna() & (names != '')
+            org_names = org_names.fillna('')
+            df['name_ner'] = org_names.where(org_names != '', names).where(~uncached, df['name_cleaned'])
+    except Exception as e:
+        print(f"Warning: NER processing failed: {e}")
         df['name_ner'] = df['name_cleaned']
 
     return df
@@ -110,52 +303,102 @@ def normalize_addresses(df: pd.DataFrame) -> pd.DataFrame:
     if 'address' not in df.columns:
         return df
 
-    def normalize_address(addr):
-        if pd.isna(addr) or addr == "":
-            return addr
-
-        addr = str(addr).strip()
-
-        # Standardize common abbreviations
-        replacements = {
-            r'\bSt\b': 'Street',
-            r'\bAve\b': 'Avenue',
-            r'\bRd\b': 'Road',
-            r'\bBlvd\b': 'Boulevard',
-            r'\bDr\b': 'Drive',
-            r'\bLn\b': 'Lane',
-            r'\bPkwy\b': 'Parkway',
-            r'\bSte\b': 'Suite',
-            r'\bSte\.\b': 'Suite',
-            r'\b#\s*': 'Suite ',
-            r'\bApt\b': 'Apartment',
-            r'\bApt\.\b': 'Apartment',
-        }
+    df['address_normalized'] = normalize_address_series(df['address'])
 
-        for pattern, replacement in replacements.items():
-            addr = re.sub(pattern, replacement, addr, flags=re.IGNORECASE)
+    return df
 
-        # Remove extra whitespace
-        addr = re.sub(r'\s+', ' ', addr).strip()
+def _parse_date_value(date_str):
+    """Row-wise fallback for values no inferred column format matched"""
+    if pd.isna(date_str) or date_str == "":
+        return None
 
-        # Standardize comma usage
-        addr = re.sub(r',\s*,', ',', addr)  # Remove double commas
-        addr = re.sub(r'\s*,\s*', ', ', addr)  # Standardize comma spacing
+    date_str = str(date_str).strip()
 
-        return addr
+    # Try pandas' per-value parser (handles free-form dates)
+    parsed = pd.to_datetime(date_str, errors='coerce')
+    if pd.notna(parsed):
+        return parsed.strftime('%Y-%m-%d')
 
-    df['address_normalized'] = df['address'].apply(normalize_address)
+    for fmt in DATE_FORMATS:
+        parsed = pd.to_datetime(date_str, format=fmt, errors='coerce')
+        if pd.notna(parsed):
+            return parsed.strftime('%Y-%m-%d')
+
+    return date_str  # Return original if can't parse
+
+
+def infer_date_formats(values: pd.Series, sample_size: int = DATE_SAMPLE_SIZE) -> List[str]:
+    """
+    Candidate formats ordered by how many sampled values each one parses.
+
+    Formats that parse nothing in the sample are dropped. Ties keep the
+    DATE_FORMATS order, so ambiguous columns stay month-first.
+    """
+    if values.empty:
+        return []
+    sample = values if len(values) <= sample_size else values.sample(sample_size, random_state=0)
+    hits = {
+        fmt: int(pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum())
+        for fmt in DATE_FORMATS
+    }
+    return [fmt for fmt in sorted(DATE_FORMATS, key=lambda fmt: -hits[fmt]) if hits[fmt]]
 
-    return df
 
-def parse_dates(df: pd.DataFrame) -> pd.DataFrame:
+def parse_date_column(values: pd.Series) -> Tuple[pd.Series, Dict[str, int]]:
+    """
+    Parse a column of date strings to YYYY-MM-DD.
+
+    Distinct values are parsed in one vectorized pass per inferred format;
+    only values no format matched go through the row-wise fallback, and
+    values that still cannot be parsed are kept as-is.
+
+    Returns:
+        (parsed Series aligned with values, {format or 'fallback'/'unparsed': value count})
+    """
+    mask = _present_mask(values)
+    stripped = values[mask].astype(str).str.strip()
+    unique_values = pd.Series(stripped.unique())
+
+    # Each bucket is formatted as it is parsed: buckets can carry different
+    # datetime64 units, and a shared ns buffer cannot hold dates past 2262
+    formatted = pd.Series(None, index=unique_values.index, dtype=object)
+    matched_by = pd.Series(None, index=unique_values.index, dtype=object)
+    remaining = unique_values
+    for fmt in infer_date_formats(unique_values):
+        if remaining.empty:
+            break
+        bucket = pd.to_datetime(remaining, format=fmt, errors='coerce')
+        hit = bucket.notna()
+        formatted[hit[hit].index] = bucket[hit].dt.strftime('%Y-%m-%d').astype(object)
+        matched_by[hit[hit].index] = fmt
+        remaining = remaining[~hit]
+
+    if not remaining.empty:
+        fallback = remaining.map(_parse_date_value)
+        formatted[remaining.index] = fallback
+        recovered = fallback.notna() & (fallback != remaining)
+        matched_by[remaining.index] = np.where(recovered, 'fallback', 'unparsed')
+
+    lookup = pd.Series(formatted.values, index=unique_values.values)
+    result = pd.Series(None, index=values.index, dtype=object)
+    result[mask] = stripped.map(lookup).values
+
+    # Per-format hit counts over rows, not distinct values
+    row_formats = stripped.map(pd.Series(matched_by.values, index=unique_values.values))
+    format_hits = {fmt: int(count) for fmt, count in row_formats.value_counts().items()}
+    return result, format_hits
+
+
+def parse_dates(df: pd.DataFrame, format_hits: Optional[Dict[str, Dict[str, int]]] = None) -> pd.DataFrame:
     """
     Parse and standardize date formats.
 
-    Attempts multiple date formats and standardizes to YYYY-MM-DD.
+    Infers the dominant formats of each date column from a sample, parses the
+    column in vectorized passes per format and standardizes to YYYY-MM-DD.
 
     Args:
         df: DataFrame with date columns ('expiration_date', 'initial_cert_date')
+        format_hits: Optional accumulator updated with per-column format hit counts
 
     Returns:
         DataFrame with '_parsed' columns added for each date column
@@ -166,43 +409,19 @@ def parse_dates(df: pd.DataFrame) -> pd.DataFrame:
         if col not in df.columns:
             continue
 
-        def parse_date(date_str):
-            if pd.isna(date_str) or date_str == "":
-                return None
-
-            date_str = str(date_str).strip()
-
-            # Try pandas date parsing
-            try:
-                parsed = pd.to_datetime(date_str, errors='coerce', infer_datetime_format=True)
-                if pd.notna(parsed):
-                    return parsed.strftime('%Y-%m-%d')
-            except:
-                pass
-
-            # Try common formats
-            formats = [
-                '%Y-%m-%d',
-                '%m/%d/%Y',
-                '%d/%m/%Y',
-                '%Y/%m/%d',
-                '%m-%d-%Y',
-                '%d-%m-%Y',
-            ]
-
-            for fmt in formats:
-                try:
-                    parsed = pd.to_datetime(date_str, format=fmt)
-                    return parsed.strftime('%Y-%m-%d')
-                except:
-                    continue
-
-            return date_str  # Return original if can't parse
-
-        df[f'{col}_parsed'] = df[col].apply(parse_date)
+        df[f'{col}_parsed'], hits = parse_date_column(df[col])
+        if format_hits is not None:
+            merge_format_hits(format_hits, {col: hits})
 
     return df
 
+def merge_format_hits(total: Dict[str, Dict[str, int]], hits: Dict[str, Dict[str, int]]) -> None:
+    """Add per-column format hit counts into a running total"""
+    for col, counts in hits.items():
+        column_total = total.setdefault(col, {})
+        for fmt, count in counts.items():
+            column_total[fmt] = column_total.get(fmt, 0) + count
+
 def extract_entities(text):
     """
     Extract entities from text using Hugging Face NER
@@ -210,6 +429,7 @@ def extract_entities(text):
     if not text or pd.isna(text):
         return {}
 
+    ner_pipeline = get_ner_pipeline()
     if not ner_pipeline:
         return {}
 
@@ -237,6 +457,28 @@ def extract_entities(text):
         print(f"Error extracting entities: {e}")
         return {}
 
+def dedup_keys(df: pd.DataFrame) -> pd.Series:
+    """
+    Deduplication key per row: license number | cleaned name | normalized address | state.
+
+    Falls back to the raw name/address columns, or empty strings, when the
+    cleaned columns are missing.
+    """
+    # Use conditional column access - pandas DataFrames don't have .get() method
+    # Important: Use df.index to ensure proper alignment when creating fallback Series
+    missing = pd.Series([''] * len(df), index=df.index)
+    license_col = df['license_number'] if 'license_number' in df.columns else missing
+    name_col = df['name_cleaned'] if 'name_cleaned' in df.columns else (df['name'] if 'name' in df.columns else missing)
+    address_col = df['address_normalized'] if 'address_normalized' in df.columns else (df['address'] if 'address' in df.columns else missing)
+    state_col = df['state'] if 'state' in df.columns else missing
+
+    return (
+        license_col.fillna('').astype(str) + '|' +
+        name_col.fillna('').astype(str) + '|' +
+        address_col.fillna('').astype(str) + '|' +
+        state_col.fillna('').astype(str)
+    )
+
 def deduplicate_results(df: pd.DataFrame) -> pd.DataFrame:
     """
     Intelligent deduplication based on license number, name, and address.
@@ -252,20 +494,7 @@ def deduplicate_results(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
 
-    # Create deduplication key
-    # Use conditional column access - pandas DataFrames don't have .get() method
-    # Important: Use df.index to ensure proper alignment when creating fallback Series
-    license_col = df['license_number'] if 'license_number' in df.columns else pd.Series([''] * len(df), index=df.index)
-    name_col = df['name_cleaned'] if 'name_cleaned' in df.columns else (df['name'] if 'name' in df.columns else pd.Series([''] * len(df), index=df.index))
-    address_col = df['address_normalized'] if 'address_normalized' in df.columns else (df['address'] if 'address' in df.columns else pd.Series([''] * len(df), index=df.index))
-    state_col = df['state'] if 'state' in df.columns else pd.Series([''] * len(df), index=df.index)
-
-    df['dedup_key'] = (
-        license_col.fillna('').astype(str) + '|' +
-        name_col.fillna('').astype(str) + '|' +
-        address_col.fillna('').astype(str) + '|' +
-        state_col.fillna('').astype(str)
-    )
+    df['dedup_key'] = dedup_keys(df)
 
     # Remove exact duplicates
     df = df.drop_duplicates(subset=['dedup_key'], keep='first')
@@ -275,96 +504,238 @@ def deduplicate_results(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
-def clean_all_files():
+class StreamingDeduplicator:
     """
-    Process all CSV files in the raw data directory
+    Keep-first deduplication across a stream of chunks using a set of 64-bit key hashes.
+
+    The hashes are held as Python ints, roughly 70 bytes per distinct key
+    including the set slot, instead of the full key strings.
     """
-    csv_files = list(DATA_DIR.glob("*.csv"))
 
-    if not csv_files:
-        print(f"No CSV files found in {DATA_DIR}")
-        return
+    def __init__(self):
+        self.seen = set()
+
+    def filter(self, df: pd.DataFrame) -> pd.DataFrame:
+        if df.empty:
+            return df
+        keys = pd.util.hash_pandas_object(dedup_keys(df), index=False)
+        # Probe the persistent set per key: O(chunk), unlike isin, which hashes all of `seen`
+        seen = self.seen
+        hashes = keys.tolist()
+        unseen = np.fromiter((key not in seen for key in hashes), dtype=bool, count=len(hashes))
+        keep = ~keys.duplicated(keep='first').to_numpy() & unseen
+        seen.update(keys[keep].tolist())
+        return df[keep]
+
+
+def clean_chunk(df: pd.DataFrame, format_hits: Optional[Dict[str, Dict[str, int]]] = None) -> pd.DataFrame:
+    """Apply all row-level cleaning steps to one chunk (NER results come from the cache)"""
+    df = clean_firm_names(df, ner_cache_only=True)
+    df = normalize_addresses(df)
+    df = parse_dates(df, format_hits)
+    return df
 
-    print(f"Found {len(csv_files)} CSV files to process")
 
-    all_cleaned = []
+def _iter_csv_chunks(csv_file: Path, usecols=None):
+    """Read a CSV in CHUNK_ROWS chunks with every column as text"""
+    return pd.read_csv(csv_file, chunksize=CHUNK_ROWS, dtype=str, usecols=usecols)
 
-    for csv_file in csv_files:
-        print(f"\nProcessing: {csv_file.name}")
 
-        try:
-            # Read CSV
-            df = pd.read_csv(csv_file)
+def _clean_file_worker(csv_path: str) -> Dict:
+    """
+    Process-pool worker: clean one raw CSV chunk by chunk.
+
+    Writes the per-file cleaned CSV (deduplicated within the file) and returns
+    row counts and the output columns.
+    """
+    csv_file = Path(csv_path)
+    output_file = CLEANED_DIR / csv_file.name
+    result = {'file': csv_file.name, 'output': str(output_file), 'original_rows': 0,
+              'cleaned_rows': 0, 'columns': [], 'date_format_hits': {}, 'error': None}
+    dedup = StreamingDeduplicator()
+    tmp_file = output_file.with_suffix('.csv.tmp')
+
+    try:
+        with open(tmp_file, 'w', newline='', encoding='utf-8') as out:
+            for chunk in _iter_csv_chunks(csv_file):
+                result['original_rows'] += len(chunk)
+                cleaned = dedup.filter(clean_chunk(chunk, result['date_format_hits']))
+                if not result['columns']:
+                    result['columns'] = list(cleaned.columns)
+                cleaned.to_csv(out, index=False, header=out.tell() == 0)
+                result['cleaned_rows'] += len(cleaned)
+
+        if result['original_rows'] == 0:
+            tmp_file.unlink(missing_ok=True)
+        else:
+            os.replace(tmp_file, output_file)
+    except Exception as e:
+        tmp_file.unlink(missing_ok=True)
+        result['error'] = str(e)
 
-            if df.empty:
-                print(f"  Skipping empty file: {csv_file.name}")
-                continue
+    return result
 
-            print(f"  Original rows: {len(df)}")
 
-            # Clean firm names
-            df = clean_firm_names(df)
+def _prime_ner_cache(csv_files: List[Path]) -> None:
+    """Run NER once over the distinct names of all files so workers only hit the cache"""
+    names = set()
+    for csv_file in csv_files:
+        try:
+            for chunk in _iter_csv_chunks(csv_file, usecols=lambda c: c == 'name'):
+                if 'name' in chunk.columns:
+                    names.update(chunk['name'].dropna())
+        except Exception as e:
+            print(f"  Warning: could not scan names in {csv_file.name}: {e}")
+    if names:
+        print(f"Distinct firm names across files: {len(names)}")
+        extract_org_names(sorted(names))
+
+
+class _CleaningSummary:
+    """Accumulates create_summary_report statistics chunk by chunk"""
+
+    def __init__(self):
+        self.total_records = 0
+        self.firms = set()
+        self.states = {}
+        self.license_types = {}
+
+    def update(self, df: pd.DataFrame) -> None:
+        self.total_records += len(df)
+        if 'name_cleaned' in df.columns:
+            self.firms.update(df['name_cleaned'].dropna())
+        for column, counts in (('state', self.states), ('license_type', self.license_types)):
+            if column in df.columns:
+                for value, count in df[column].value_counts().items():
+                    counts[value] = counts.get(value, 0) + int(count)
+
+    def to_dict(self, columns: List[str]) -> Dict:
+        by_count = lambda counts: dict(sorted(counts.items(), key=lambda item: -item[1]))
+        return {
+            'total_records': self.total_records,
+            'unique_firms': len(self.firms) if 'name_cleaned' in columns else 0,
+            'states_covered': len(self.states) if 'state' in columns else 0,
+            'records_by_state': by_count(self.states) if 'state' in columns else {},
+            'license_types': by_count(self.license_types) if 'license_type' in columns else {}
+        }
 
-            # Normalize addresses
-            df = normalize_addresses(df)
 
-            # Parse dates
-            df = parse_dates(df)
+def _write_state_partitions(df: pd.DataFrame, part_name: str) -> None:
+    """Append a chunk to the Parquet dataset partitioned as state=<value>/"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
 
-            # Deduplicate
-            df = deduplicate_results(df)
+    states = df['state'].fillna(PARQUET_NULL_PARTITION) if 'state' in df.columns else \
+        pd.Series(PARQUET_NULL_PARTITION, index=df.index)
+    for state, part in df.groupby(states, sort=False):
+        partition_dir = PARQUET_DIR / f"state={state}"
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(part.drop(columns=['state'], errors='ignore'), preserve_index=False)
+        pq.write_table(table, partition_dir / f"{part_name}.parquet")
 
-            print(f"  Cleaned rows: {len(df)}")
 
-            # Save cleaned file
-            output_file = CLEANED_DIR / csv_file.name
-            df.to_csv(output_file, index=False)
-            print(f"  Saved to: {output_file}")
+def clean_all_files():
+    """
+    Process all CSV files in the raw data directory
 
-            all_cleaned.append(df)
+    Files are cleaned in parallel worker processes, chunk by chunk. The
+    per-file outputs are then streamed in file order through one global
+    deduplication pass into dpor_all_cleaned.csv and a Parquet dataset
+    partitioned by state, so memory stays bounded by the chunk size.
 
-        except Exception as e:
-            print(f"  Error processing {csv_file.name}: {e}")
-            continue
+    Returns:
+        Summary statistics dict for the combined data, or None if nothing was cleaned
+    """
+    csv_files = sorted(DATA_DIR.glob("*.csv"))
+
+    if not csv_files:
+        print(f"No CSV files found in {DATA_DIR}")
+        return
+
+    print(f"Found {len(csv_files)} CSV files to process")
 
-    # Combine all cleaned data
-    if all_cleaned:
-        combined = pd.concat(all_cleaned, ignore_index=True)
+    # NER runs once in this process; workers then resolve names from the cache
+    _prime_ner_cache(csv_files)
 
-        # Final deduplication across all files
-        combined = deduplicate_results(combined)
+    workers = max(1, min(len(csv_files), CPU_COUNT))
+    print(f"Cleaning with {workers} worker processes ({CHUNK_ROWS} rows per chunk)")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_clean_file_worker, [str(f) for f in csv_files]))
 
-        # Save combined file
-        combined_file = CLEANED_DIR / "dpor_all_cleaned.csv"
-        combined.to_csv(combined_file, index=False)
-        print(f"\nCombined cleaned data saved to: {combined_file}")
-        print(f"Total unique records: {len(combined)}")
+    cleaned_results = []
+    date_format_hits = {}
+    for result in results:
+        print(f"\nProcessing: {result['file']}")
+        if result['error']:
+            print(f"  Error processing {result['file']}: {result['error']}")
+            continue
+        if result['original_rows'] == 0:
+            print(f"  Skipping empty file: {result['file']}")
+            continue
+        print(f"  Original rows: {result['original_rows']}")
+        print(f"  Cleaned rows: {result['cleaned_rows']}")
+        print(f"  Saved to: {result['output']}")
+        merge_format_hits(date_format_hits, result['date_format_hits'])
+        cleaned_results.append(result)
 
-        return combined
+    if not cleaned_results:
+        return None
 
-    return None
+    # Union of columns in first-seen order, as pd.concat would produce
+    columns = list(dict.fromkeys(col for result in cleaned_results for col in result['columns']))
 
-def create_summary_report(df: pd.DataFrame) -> None:
+    write_parquet = True
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        write_parquet = False
+        print("\npyarrow not installed; skipping Parquet partitions")
+    if write_parquet and PARQUET_DIR.exists():
+        shutil.rmtree(PARQUET_DIR)
+
+    # Final deduplication across all files, streamed
+    dedup = StreamingDeduplicator()
+    summary = _CleaningSummary()
+    combined_file = CLEANED_DIR / "dpor_all_cleaned.csv"
+    tmp_file = combined_file.with_suffix('.csv.tmp')
+    with open(tmp_file, 'w', newline='', encoding='utf-8') as out:
+        for result in cleaned_results:
+            output_file = Path(result['output'])
+            for chunk_index, chunk in enumerate(_iter_csv_chunks(output_file)):
+                chunk = dedup.filter(chunk.reindex(columns=columns))
+                if chunk.empty:
+                    continue
+                chunk.to_csv(out, index=False, header=summary.total_records == 0)
+                summary.update(chunk)
+                if write_parquet:
+                    _write_state_partitions(chunk, f"{output_file.stem}-{chunk_index:05d}")
+    os.replace(tmp_file, combined_file)
+
+    print(f"\nCombined cleaned data saved to: {combined_file}")
+    if write_parquet:
+        print(f"Parquet partitions saved to: {PARQUET_DIR}")
+    print(f"Total unique records: {summary.total_records}")
+
+    for col, counts in date_format_hits.items():
+        print(f"Date formats in {col}:")
+        for fmt, count in sorted(counts.items(), key=lambda item: -item[1]):
+            print(f"  {fmt}: {count}")
+
+    report = summary.to_dict(columns)
+    report['date_formats'] = date_format_hits
+    return report
+
+def create_summary_report(summary: Dict) -> None:
     """
-    Create summary statistics report.
-
-    Generates JSON report with total records, unique firms, states covered,
-    and distribution statistics.
+    Write the summary statistics report.
 
     Args:
-        df: Cleaned DataFrame to summarize
+        summary: Statistics from clean_all_files (total records, unique firms,
+            states covered, distributions by state and license type)
     """
-    if df is None or df.empty:
+    if not summary or not summary.get('total_records'):
         return
 
-    summary = {
-        'total_records': len(df),
-        'unique_firms': df['name_cleaned'].nunique() if 'name_cleaned' in df.columns else 0,
-        'states_covered': df['state'].nunique() if 'state' in df.columns else 0,
-        'records_by_state': df['state'].value_counts().to_dict() if 'state' in df.columns else {},
-        'license_types': df['license_type'].value_counts().to_dict() if 'license_type' in df.columns else {}
-    }
-
     summary_file = CLEANED_DIR / "cleaning_summary.json"
     with open(summary_file, 'w') as f:
         json.dump(summary, f, indent=2)
@@ -380,13 +751,14 @@ def main() -> None:
     """
     print("Starting DPOR data cleaning process...")
     print("=" * 60)
+    CLEANED_DIR.mkdir(parents=True, exist_ok=True)
 
     # Clean all files
-    cleaned_df = clean_all_files()
+    summary = clean_all_files()
 
     # Create summary report
-    if cleaned_df is not None:
-        create_summary_report(cleaned_df)
+    if summary is not None:
+        create_summary_report(summary)
 
     print("\n" + "=" * 60)
     print("Data cleaning complete!")
@@ -68,20 +68,26 @@ def generate_summary_csvs():
             high_quality.to_csv(output_file, index=False)
             print(f"Saved high-quality records to: {output_file}")
 
-def main_outputs():
+def main_outputs(run_prerequisites: bool = True):
     """
     Main output generation function.
 
     Runs connection analysis, data validation, and generates
     all summary CSV files.
+
+    Args:
+        run_prerequisites: Re-run connection analysis and validation first.
+            bin/run_pipeline.py passes False because it schedules those
+            steps itself.
     """
     print("=== Generating All Outputs ===\n")
 
-    print("Step 1: Running connection analysis...")
-    main_analysis()
+    if run_prerequisites:
+        print("Step 1: Running connection analysis...")
+        main_analysis()
 
-    print("\nStep 2: Running data quality validation...")
-    main_validation()
+        print("\nStep 2: Running data quality validation...")
+        main_validation()
 
     print("\nStep 3: Generating summary CSV files...")
     generate_summary_csvs()
@@ -7,11 +7,14 @@ Uses Python 3.14 features: match expressions, except expressions, modern type hi
 """
 
 import sys
+import time
+import argparse
 import subprocess
 from pathlib import Path
 from typing import Optional
 
-from scripts.utils.paths import PROJECT_ROOT, SCRIPTS_DIR, DATA_DIR, RESEARCH_DIR
+from scripts.utils.paths import PROJECT_ROOT, SCRIPTS_DIR, DATA_DIR, RESEARCH_DIR, ensure_directories
+from scripts.utils.incremental_pipeline import PipelineStep, IncrementalRunner, print_run_summary
 
 try:
     from scripts.etl.etl_pipeline import ETLPipeline
@@ -215,7 +218,8 @@ def run_output_generation() -> bool:
     try:
         from bin.generate_reports import main_outputs
         try:
-            main_outputs()
+            # Analysis and validation are separate DAG steps; don't repeat them here
+            main_outputs(run_prerequisites=False)
             print("✓ Output generation complete\n")
             return True
         except Exception as e:
@@ -246,6 +250,62 @@ def run_output_generation() -> bool:
             return False
 
 
+def build_steps() -> list[PipelineStep]:
+    """
+    Declare pipeline steps with the files each one reads and writes.
+
+    Paths are relative to the project root. Each step also lists its own
+    script and the project modules it imports, so code changes invalidate it.
+    The state search reads live external sites, so it always runs.
+    """
+    return [
+        PipelineStep(
+            "Search all states", run_search_states,
+            inputs=["bin/search_states.R"],
+            outputs=["data/raw/*.csv"],
+            always_run=True,
+        ),
+        PipelineStep(
+            "Clean data", run_data_cleaning,
+            inputs=["bin/clean_data.py", "data/raw/*.csv"],
+            outputs=["data/cleaned/*.csv", "data/cleaned/cleaning_summary.json", "data/cleaned/parquet"],
+            depends_on=["Search all states"],
+            required=True,
+        ),
+        PipelineStep(
+            "Analyze connections", run_connection_analysis,
+            inputs=["bin/analyze_connections.py", "scripts/utils/paths.py", "scripts/utils/string_matching.py",
+                    "data/source/skidmore_*", "data/cleaned/dpor_all_cleaned.csv", "data/raw/*.csv"],
+            outputs=["research/connections/dpor_skidmore_connections.csv",
+                     "research/summaries/analysis_summary.json"],
+            depends_on=["Clean data"],
+        ),
+        PipelineStep(
+            "Validate data", run_data_validation,
+            inputs=["bin/validate_data.py", "scripts/utils/paths.py", "data/cleaned/dpor_all_cleaned.csv"],
+            outputs=["research/verification/dpor_validated.csv",
+                     "research/verification/data_quality_issues.csv",
+                     "research/summaries/data_quality_report.json"],
+            depends_on=["Clean data"],
+        ),
+        PipelineStep(
+            "ETL pipeline", run_etl_pipeline,
+            inputs=["scripts/etl/**/*.py", "scripts/utils/paths.py", "data/cleaned/*.csv"],
+            outputs=["data/vectors/etl_results.json"],
+            depends_on=["Clean data"],
+        ),
+        PipelineStep(
+            "Generate outputs", run_output_generation,
+            inputs=["bin/generate_reports.py", "scripts/utils/paths.py",
+                    "research/connections/dpor_skidmore_connections.csv",
+                    "research/verification/dpor_validated.csv"],
+            outputs=["dpor_multi_state_summary.csv", "dpor_connection_type_summary.csv",
+                     "dpor_high_quality_records.csv"],
+            depends_on=["Analyze connections", "Validate data"],
+        ),
+    ]
+
+
 def main() -> None:
     """
     Main pipeline execution function.
@@ -253,35 +313,32 @@ def main() -> None:
     Runs the complete DPOR search and analysis pipeline:
     1. Multi-state search
     2. Data cleaning
-    3. Connection analysis
-    4. Data validation
-    5. ETL pipeline
-    6. Output generation
+    3. Connection analysis and data validation (concurrently)
+    4. ETL pipeline
+    5. Output generation
+
+    Steps whose inputs and outputs are unchanged since their last successful
+    run are skipped; pass --force to run everything.
     """
+    parser = argparse.ArgumentParser(description="Run the DPOR analysis pipeline")
+    parser.add_argument("--force", action="store_true", help="Run every step even if up to date")
+    parser.add_argument("--jobs", type=int, default=None, help="Maximum concurrent steps")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("DPOR Multi-State License Search Pipeline (Python 3.14)")
     print("=" * 60)
     print()
 
-    # Execute pipeline steps
-    steps = [
-        ("Search all states", run_search_states, False),  # Optional step
-        ("Clean data", run_data_cleaning, True),  # Required step
-        ("Analyze connections", run_connection_analysis, False),
-        ("Validate data", run_data_validation, False),
-        ("ETL pipeline", run_etl_pipeline, False),
-        ("Generate outputs", run_output_generation, False),
-    ]
-
-    for step_name, step_func, required in steps:
-        success = step_func()
-        if not success and required:
-            print(f"Pipeline stopped due to {step_name.lower()} failure.")
-            return
+    ensure_directories()
+    start = time.perf_counter()
+    runner = IncrementalRunner(build_steps(), max_workers=args.jobs, force=args.force)
+    results = runner.run()
 
     print("=" * 60)
     print("Pipeline Complete!")
     print("=" * 60)
+    print_run_summary(results, time.perf_counter() - start)
     print("\nCheck the following directories for results:")
     print("  - data/raw/        - Raw search results")
     print("  - data/cleaned/    - Cleaned data")
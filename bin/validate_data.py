@@ -10,6 +10,7 @@ import json
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
 # Add scripts directory to path
@@ -19,12 +20,40 @@ from scripts.utils.paths import (
     PROJECT_ROOT, DATA_CLEANED_DIR, RESEARCH_VERIFICATION_DIR, RESEARCH_SUMMARIES_DIR
 )
 
+LICENSE_PATTERN = re.compile(r'[A-Za-z0-9\s\-]+')
+STREET_PATTERN = re.compile(r'(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Boulevard|Blvd|Lane|Ln)', re.IGNORECASE)
+CITY_STATE_ZIP_PATTERN = re.compile(r'[A-Z]{2}\s+\d{5}')  # State + ZIP pattern
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+MIN_DATE = pd.Timestamp('1900-01-01')
+MAX_DATE = pd.Timestamp('2100-01-01')
+# Formats parsed column-wise in validate_dates before falling back to per-value parsing
+VALIDATION_DATE_FORMATS = ['ISO8601', '%m/%d/%Y']
+
 def normalize_text(text: str) -> str:
     """Normalize text for matching"""
     if pd.isna(text) or text == "":
         return ""
     return re.sub(r'[^\w\s]', '', str(text).upper()).strip()
 
+def _as_text(values: pd.Series) -> pd.Series:
+    """str() of every value, computed in one numpy cast (missing values become 'nan'/'None')"""
+    return pd.Series(values.to_numpy(dtype=object).astype(str), index=values.index)
+
+def normalize_text_series(values: pd.Series) -> pd.Series:
+    """Column-wise normalize_text(str(x)) (missing values become 'NAN', as str() makes them)"""
+    return _as_text(values).str.upper().str.replace(PUNCTUATION_PATTERN, '', regex=True).str.strip()
+
+def _missing_mask(values: pd.Series) -> pd.Series:
+    """Rows that are missing or empty strings"""
+    return values.isna() | (values == "")
+
+def _issue_column(index: pd.Index, rules: List[tuple]) -> pd.Series:
+    """Issue text per row from (mask, message) rules; later rules take precedence"""
+    issues = pd.Series("", index=index, dtype=object)
+    for mask, message in rules:
+        issues = issues.mask(mask, message)
+    return issues
+
 def validate_license_numbers(df: pd.DataFrame) -> pd.DataFrame:
     """Validate license number formats"""
     if len(df) == 0:
@@ -35,76 +64,90 @@ def validate_license_numbers(df: pd.DataFrame) -> pd.DataFrame:
         df['license_format_issue'] = "License number column not found"
         return df
 
-    df['license_valid'] = True
-    df['license_format_issue'] = ""
-
-    for idx, row in df.iterrows():
-        license = row.get('license_number', '')
+    licenses = df['license_number']
+    missing = _missing_mask(licenses)
+    stripped = _as_text(licenses).str.strip()
 
-        if pd.isna(license) or license == "":
-            df.at[idx, 'license_valid'] = False
-            df.at[idx, 'license_format_issue'] = "Missing license number"
-            continue
-
-        license = str(license).strip()
+    # Check for common valid formats (6-15 characters, alphanumeric)
+    lengths = stripped.str.len()
+    bad_length = ~missing & ((lengths < 6) | (lengths > 15))
 
-        # Check for common valid formats (6-15 characters, alphanumeric)
-        if len(license) < 6 or len(license) > 15:
-            df.at[idx, 'license_valid'] = False
-            df.at[idx, 'license_format_issue'] = f"Invalid length: {len(license)}"
+    # Check for invalid characters
+    bad_chars = ~missing & ~stripped.str.fullmatch(LICENSE_PATTERN).fillna(False).astype(bool)
 
-        # Check for invalid characters
-        if not re.match(r'^[A-Za-z0-9\s\-]+$', license):
-            df.at[idx, 'license_valid'] = False
-            df.at[idx, 'license_format_issue'] = "Contains invalid characters"
+    df['license_valid'] = ~(missing | bad_length | bad_chars)
+    df['license_format_issue'] = _issue_column(df.index, [
+        (bad_length, "Invalid length: " + lengths.astype(str)),
+        (bad_chars, "Contains invalid characters"),
+        (missing, "Missing license number"),
+    ])
 
     return df
 
+def _normalized_codes(df: pd.DataFrame, column: str) -> tuple:
+    """(per-row codes, normalized distinct values) for a column; normalizes each distinct value once"""
+    if column not in df.columns:
+        return np.zeros(len(df), dtype=np.intp), np.array([''], dtype=object)
+    codes, uniques = pd.factorize(df[column], use_na_sentinel=False)
+    normalized = normalize_text_series(pd.Series(np.asarray(uniques, dtype=object)))
+    normalized_codes, normalized_uniques = pd.factorize(normalized)
+    return normalized_codes[codes], np.asarray(normalized_uniques, dtype=object)
+
+def _combine_codes(codes: List[np.ndarray]) -> np.ndarray:
+    """Dense codes for the row-wise tuple of several code arrays"""
+    combined = codes[0]
+    for part in codes[1:]:
+        combined = pd.factorize(combined.astype(np.int64) * (int(part.max()) + 1) + part)[0]
+    return combined
+
+def _sorted_group_ids(key_codes: np.ndarray, mask: np.ndarray, parts: List[tuple]) -> np.ndarray:
+    """1-based group ids for masked rows, numbered in sorted 'a|b|c' key order as groupby().ngroup() does"""
+    if not mask.any():
+        return np.array([], dtype=np.int64)
+    unique_keys, first_rows, inverse = np.unique(key_codes[mask], return_index=True, return_inverse=True)
+    rows = np.flatnonzero(mask)[first_rows]
+    first_codes, first_values = parts[0]
+    key_text = first_values[first_codes[rows]]
+    for codes, values in parts[1:]:
+        key_text = key_text + "|" + values[codes[rows]]
+    ranks = np.empty(len(unique_keys), dtype=np.int64)
+    ranks[np.argsort(key_text, kind='stable')] = np.arange(len(unique_keys))
+    return ranks[inverse] + 1
+
 def flag_duplicates(df: pd.DataFrame) -> pd.DataFrame:
     """Flag potential duplicates"""
     if len(df) == 0:
         return df
 
-    df['is_duplicate'] = False
-    df['duplicate_group'] = None
-    df['duplicate_reason'] = ""
-
-    # Create matching keys
-    has_license = 'license_number' in df.columns
-    has_name = 'name' in df.columns
-    has_address = 'address' in df.columns
-    has_state = 'state' in df.columns
-
-    license_part = df['license_number'].apply(lambda x: normalize_text(str(x))) if has_license else pd.Series([''] * len(df))
-    name_part = df['name'].apply(lambda x: normalize_text(str(x))) if has_name else pd.Series([''] * len(df))
-    address_part = df['address'].apply(lambda x: normalize_text(str(x))) if has_address else pd.Series([''] * len(df))
-    state_part = df['state'].apply(lambda x: normalize_text(str(x))) if has_state else pd.Series([''] * len(df))
-
-    df['match_key1'] = license_part + "|" + name_part + "|" + state_part
-    df['match_key2'] = name_part + "|" + address_part + "|" + state_part
-
-    # Find duplicates by license number + name + state
-    dup_groups1 = df[df.groupby('match_key1')['match_key1'].transform('size') > 1].copy()
-    if len(dup_groups1) > 0:
-        dup_groups1['duplicate_group'] = dup_groups1.groupby('match_key1').ngroup() + 1
-        df.loc[dup_groups1.index, 'is_duplicate'] = True
-        df.loc[dup_groups1.index, 'duplicate_group'] = dup_groups1['duplicate_group']
-        df.loc[dup_groups1.index, 'duplicate_reason'] = "Same license number, name, and state"
-
-    # Find duplicates by name + address + state
-    max_dup_group = df['duplicate_group'].max() if 'duplicate_group' in df.columns else 0
-    if pd.isna(max_dup_group):
-        max_dup_group = 0
-
-    dup_groups2 = df[~df['is_duplicate'] & (df.groupby('match_key2')['match_key2'].transform('size') > 1)].copy()
-    if len(dup_groups2) > 0:
-        dup_groups2['duplicate_group'] = max_dup_group + dup_groups2.groupby('match_key2').ngroup() + 1
-        df.loc[dup_groups2.index, 'is_duplicate'] = True
-        df.loc[dup_groups2.index, 'duplicate_group'] = dup_groups2['duplicate_group']
-        df.loc[dup_groups2.index, 'duplicate_reason'] = "Same name, address, and state (different license)"
-
-    # Remove temporary columns
-    df = df.drop(columns=['match_key1', 'match_key2'])
+    # Create matching keys as integer codes over normalized values
+    license_part = _normalized_codes(df, 'license_number')
+    name_part = _normalized_codes(df, 'name')
+    address_part = _normalized_codes(df, 'address')
+    state_part = _normalized_codes(df, 'state')
+
+    key1_parts = [license_part, name_part, state_part]
+    key2_parts = [name_part, address_part, state_part]
+    match_key1 = _combine_codes([codes for codes, _ in key1_parts])
+    match_key2 = _combine_codes([codes for codes, _ in key2_parts])
+
+    # Group sizes come from bincount over the key codes
+    dup1 = np.bincount(match_key1)[match_key1] > 1
+    # Name + address + state only counts for rows not already matched by license
+    dup2 = ~dup1 & (np.bincount(match_key2)[match_key2] > 1)
+
+    groups = np.full(len(df), None, dtype=object)
+    group_ids1 = _sorted_group_ids(match_key1, dup1, key1_parts)
+    groups[dup1] = group_ids1
+    max_dup_group = int(group_ids1.max()) if len(group_ids1) else 0
+    groups[dup2] = max_dup_group + _sorted_group_ids(match_key2, dup2, key2_parts)
+
+    df['is_duplicate'] = dup1 | dup2
+    df['duplicate_group'] = pd.Series(groups, index=df.index, dtype=object)
+    df['duplicate_reason'] = np.select(
+        [dup1, dup2],
+        ["Same license number, name, and state", "Same name, address, and state (different license)"],
+        default=""
+    ).astype(object)
 
     return df
 
@@ -113,34 +156,64 @@ def validate_addresses(df: pd.DataFrame) -> pd.DataFrame:
     if len(df) == 0 or 'address' not in df.columns:
         return df
 
-    df['address_valid'] = True
-    df['address_issue'] = ""
-
-    for idx, row in df.iterrows():
-        addr = row.get('address', '')
-
-        if pd.isna(addr) or addr == "":
-            df.at[idx, 'address_valid'] = False
-            df.at[idx, 'address_issue'] = "Missing address"
-            continue
+    addresses = df['address']
+    missing = _missing_mask(addresses)
+    stripped = _as_text(addresses).str.strip()
 
-        addr = str(addr).strip()
+    # Check for minimum length
+    too_short = ~missing & (stripped.str.len() < 10)
 
-        # Check for minimum length
-        if len(addr) < 10:
-            df.at[idx, 'address_valid'] = False
-            df.at[idx, 'address_issue'] = "Address too short"
+    # Check for common address components
+    has_street = stripped.str.contains(STREET_PATTERN, regex=True)
+    has_city = stripped.str.contains(CITY_STATE_ZIP_PATTERN, regex=True)
+    no_components = ~missing & ~has_street & ~has_city
 
-        # Check for common address components
-        has_street = bool(re.search(r'(Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Boulevard|Blvd|Lane|Ln)', addr, re.IGNORECASE))
-        has_city = bool(re.search(r'[A-Z]{2}\s+\d{5}', addr))  # State + ZIP pattern
-
-        if not has_street and not has_city:
-            df.at[idx, 'address_valid'] = False
-            df.at[idx, 'address_issue'] = "Missing street or city/state/zip"
+    df['address_valid'] = ~(missing | too_short | no_components)
+    df['address_issue'] = _issue_column(df.index, [
+        (too_short, "Address too short"),
+        (no_components, "Missing street or city/state/zip"),
+        (missing, "Missing address"),
+    ])
 
     return df
 
+def _to_timestamp(value) -> pd.Timestamp:
+    """Per-value parse; timezone-aware or unparseable values become NaT"""
+    try:
+        parsed = pd.to_datetime(value)
+    except (ValueError, TypeError, OverflowError):
+        return pd.NaT
+    return parsed if pd.notna(parsed) and parsed.tzinfo is None else pd.NaT
+
+def _parse_dates_column(values: pd.Series) -> pd.Series:
+    """Parse each distinct value once; unparseable values become NaT"""
+    unique_values = pd.Series(values.unique())
+    if not pd.api.types.is_numeric_dtype(unique_values):
+        # Vectorized passes for the common formats, then per-element inference only for what they missed
+        parsed = pd.Series(pd.NaT, index=unique_values.index, dtype=object)
+        for fmt in VALIDATION_DATE_FORMATS:
+            leftover = parsed.isna()
+            if not leftover.any():
+                break
+            try:
+                bucket = pd.to_datetime(unique_values[leftover], format=fmt, errors='coerce')
+            except (ValueError, TypeError):
+                continue
+            if getattr(bucket.dt, 'tz', None) is not None:
+                continue
+            hit = bucket.notna()
+            parsed[hit[hit].index] = bucket[hit].astype(object)
+        leftover = parsed.isna()
+        if leftover.any():
+            parsed[leftover] = unique_values[leftover].map(_to_timestamp)
+        # Microsecond unit so far-future dates such as 9999-12-31 stay comparable to the range limits
+        parsed = pd.Series([value if pd.notna(value) else None for value in parsed],
+                           index=parsed.index, dtype='datetime64[us]')
+    else:
+        parsed = pd.to_datetime(unique_values, errors='coerce')
+    lookup = pd.Series(parsed.values, index=unique_values.values)
+    return pd.Series(values.map(lookup).values, index=values.index)
+
 def validate_dates(df: pd.DataFrame) -> pd.DataFrame:
     """Validate dates"""
     if len(df) == 0:
@@ -152,28 +225,19 @@ def validate_dates(df: pd.DataFrame) -> pd.DataFrame:
         if col not in df.columns:
             continue
 
-        df[f'{col}_valid'] = True
-        df[f'{col}_issue'] = ""
+        missing = _missing_mask(df[col])
+        parsed = _parse_dates_column(df.loc[~missing, col]).reindex(df.index)
 
-        for idx, row in df.iterrows():
-            date_val = row.get(col)
+        invalid_format = ~missing & parsed.isna()
+        # Check if date is reasonable
+        out_of_range = ~missing & ~invalid_format & ((parsed < MIN_DATE) | (parsed > MAX_DATE))
 
-            if pd.isna(date_val) or date_val == "":
-                df.at[idx, f'{col}_valid'] = False
-                df.at[idx, f'{col}_issue'] = "Missing date"
-                continue
-
-            # Try to parse date
-            try:
-                parsed_date = pd.to_datetime(date_val)
-
-                # Check if date is reasonable
-                if parsed_date < pd.Timestamp('1900-01-01') or parsed_date > pd.Timestamp('2100-01-01'):
-                    df.at[idx, f'{col}_valid'] = False
-                    df.at[idx, f'{col}_issue'] = "Date out of reasonable range"
-            except:
-                df.at[idx, f'{col}_valid'] = False
-                df.at[idx, f'{col}_issue'] = "Invalid date format"
+        df[f'{col}_valid'] = ~(missing | invalid_format | out_of_range)
+        df[f'{col}_issue'] = _issue_column(df.index, [
+            (out_of_range, "Date out of reasonable range"),
+            (invalid_format, "Invalid date format"),
+            (missing, "Missing date"),
+        ])
 
     return df
 
@@ -182,20 +246,11 @@ def cross_reference_addresses(df: pd.DataFrame) -> pd.DataFrame:
     if len(df) == 0 or 'address' not in df.columns:
         return df
 
-    df['address_cluster'] = None
-
     # Normalize addresses for clustering
-    df['address_normalized_cluster'] = df['address'].apply(
-        lambda x: normalize_text(str(x)) if pd.notna(x) and x != "" else ""
-    )
-
-    # Group by normalized address
-    address_groups = df.groupby('address_normalized_cluster').ngroup() + 1
-    df['address_cluster'] = df['address_normalized_cluster'].map(
-        dict(zip(df['address_normalized_cluster'].unique(), range(1, len(df['address_normalized_cluster'].unique()) + 1)))
-    )
+    normalized = normalize_text_series(df['address']).where(~_missing_mask(df['address']), "")
 
-    df = df.drop(columns=['address_normalized_cluster'])
+    # Cluster ids in order of first appearance
+    df['address_cluster'] = pd.factorize(normalized)[0] + 1
 
     return df
 
@@ -12,96 +12,46 @@ from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
 import numpy as np
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from scripts.utils import backends
 from scripts.utils.paths import PROJECT_ROOT, DATA_PROCESSED_DIR
+from scripts.utils.embedding_cache import CachedEncoder
+from scripts.utils.law_corpus import LawCorpus, load_law_corpus
+from scripts.utils.law_index import LawIndexConfig, load_or_build_law_index
+from scripts.analysis.utils.law_tfidf import LawTfidfIndex
+from scripts.analysis.utils.similarity_kernels import LawVectorStats, ensemble_similarities, pair_similarities
 
 # Optimize for ARM M4 MAX
 MAX_WORKERS = os.cpu_count() or 16
 BATCH_SIZE = 256  # Larger batches for better efficiency
 print(f"🚀 Advanced Evidence-Law Matching - ARM M4 MAX Optimized ({MAX_WORKERS} workers)")
 
-# Try to use faster libraries first, fallback to standard
-try:
-    import faiss  # Facebook AI Similarity Search - much faster for vector operations
-    FAISS_AVAILABLE = True
+# FAISS is optional: it is imported on first use, NumPy search otherwise
+FAISS_AVAILABLE = backends.available("faiss")
+if FAISS_AVAILABLE:
     print("✅ FAISS available for fast vector similarity")
-except ImportError:
-    FAISS_AVAILABLE = False
+else:
     print("⚠️  FAISS not available, using NumPy (install with: pip install faiss-cpu)")
 
-try:
-    from numba import jit, prange  # JIT compilation for speed
-    NUMBA_AVAILABLE = True
-    print("✅ Numba available for JIT acceleration")
-except ImportError:
-    NUMBA_AVAILABLE = False
-    print("⚠️  Numba not available (install with: pip install numba)")
-
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
-
-try:
-    from sklearn.metrics.pairwise import cosine_similarity
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    SKLEARN_AVAILABLE = True
-except ImportError:
-    SKLEARN_AVAILABLE = False
-
-try:
-    import scipy.spatial.distance as distance
-    SCIPY_AVAILABLE = True
-except ImportError:
-    SCIPY_AVAILABLE = False
-
-# Install missing libraries
-if not SENTENCE_TRANSFORMERS_AVAILABLE or not SKLEARN_AVAILABLE or not SCIPY_AVAILABLE:
-    print("Installing required ML libraries...")
-    import subprocess
-    packages = ["sentence-transformers", "scikit-learn", "numpy", "scipy"]
-    if not FAISS_AVAILABLE:
-        packages.append("faiss-cpu")
-    if not NUMBA_AVAILABLE:
-        packages.append("numba")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "--user"] + packages,
-                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-    # Re-import after installation
-    try:
-        import faiss
-        FAISS_AVAILABLE = True
-    except:
-        FAISS_AVAILABLE = False
-
-    try:
-        from numba import jit, prange
-        NUMBA_AVAILABLE = True
-    except:
-        NUMBA_AVAILABLE = False
-
-    from sentence_transformers import SentenceTransformer
-    from sklearn.metrics.pairwise import cosine_similarity
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    import scipy.spatial.distance as distance
-    print("✅ ML libraries installed")
-
 
 class AdvancedEvidenceLawMatcher:
     """Advanced ML system for matching evidence to ground truth laws with form-based weighting"""
 
-    def __init__(self):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+    def __init__(self, index_config: Optional[LawIndexConfig] = None):
+        self.model = CachedEncoder('all-MiniLM-L6-v2')
         self.violations = {}
-        self.laws = {}
+        self.law_corpus = LawCorpus()
         self.forms = {}
-        self.tfidf_vectorizer = TfidfVectorizer(max_features=5000, ngram_range=(1, 3))
+        # Built once per law set (see index_laws); rows follow self.law_ids
+        self.tfidf_index = LawTfidfIndex(max_features=5000, ngram_range=(1, 3))
+        self.law_stats: Optional[LawVectorStats] = None
+        self.law_ids: List[str] = []
+        # Persisted FAISS index; backend from LAW_INDEX_* settings unless given
+        self.index_config = index_config or LawIndexConfig.from_env()
 
     def load_data(self):
         """Load violations, laws, and forms"""
@@ -116,8 +66,7 @@ class AdvancedEvidenceLawMatcher:
         # Load laws
         law_file = PROJECT_ROOT / "ref" / "law" / "jurisdiction_references.json"
         if law_file.exists():
-            with open(law_file, 'r', encoding='utf-8') as f:
-                self.laws = json.load(f)
+            self.law_corpus = load_law_corpus(law_file)
 
         # Extract forms from laws
         self._extract_forms()
@@ -128,25 +77,15 @@ class AdvancedEvidenceLawMatcher:
         print(f"   Loaded forms: {len(self.forms)}")
 
     def _extract_forms(self):
-        """Extract all reporting forms from laws"""
-        def extract_forms_recursive(data, path=""):
-            if isinstance(data, dict):
-                if "reporting_forms" in data:
-                    for form in data["reporting_forms"]:
-                        form_id = form.get("form_number") or form.get("form_name", "unknown")
-                        self.forms[form_id] = {
-                            **form,
-                            "law": data.get("name", ""),
-                            "path": path
-                        }
-                for key, value in data.items():
-                    if key not in ["embedding", "embedding_text", "ground_truth_embedding", "ground_truth_text"]:
-                        extract_forms_recursive(value, f"{path}.{key}" if path else key)
-            elif isinstance(data, list):
-                for i, item in enumerate(data):
-                    extract_forms_recursive(item, f"{path}[{i}]")
-
-        extract_forms_recursive(self.laws)
+        """Index all reporting forms from the compiled law corpus"""
+        for form in self.law_corpus.forms:
+            fields = form["fields"]
+            form_id = fields.get("form_number") or fields.get("form_name", "unknown")
+            self.forms[form_id] = {
+                **fields,
+                "law": form["law_name"],
+                "path": form["law_path"]
+            }
 
     def create_evidence_text(self, violation: Dict[str, Any]) -> str:
         """Create comprehensive evidence text for matching"""
@@ -169,102 +108,42 @@ class AdvancedEvidenceLawMatcher:
 
         law_embeddings = {}
 
-        def extract_laws_recursive(data, path=""):
-            if isinstance(data, dict):
-                # Prioritize ground truth embeddings
-                if "ground_truth_embedding" in data and "ground_truth_text" in data:
-                    law_id = f"law_{path}"
-                    law_embeddings[law_id] = {
-                        "embedding": np.array(data["ground_truth_embedding"]),
-                        "text": data["ground_truth_text"],
-                        "law_data": data,
-                        "is_ground_truth": True
-                    }
-                elif "embedding" in data and "embedding_text" in data:
-                    law_id = f"law_{path}"
-                    law_embeddings[law_id] = {
-                        "embedding": np.array(data["embedding"]),
-                        "text": data["embedding_text"],
-                        "law_data": data,
-                        "is_ground_truth": False
-                    }
-
-                for key, value in data.items():
-                    if key not in ["embedding", "embedding_text", "ground_truth_embedding", "ground_truth_text"]:
-                        extract_laws_recursive(value, f"{path}.{key}" if path else key)
-            elif isinstance(data, list):
-                for i, item in enumerate(data):
-                    extract_laws_recursive(item, f"{path}[{i}]")
-
-        extract_laws_recursive(self.laws)
+        # Prioritize ground truth embeddings
+        for law in self.law_corpus.laws:
+            embedded = self.law_corpus.preferred_embedding(law)
+            if embedded is None:
+                continue
+            vector, text, is_ground_truth = embedded
+            law_embeddings[f"law_{law['path']}"] = {
+                "embedding": np.asarray(vector),
+                "text": text,
+                "law_data": law["fields"],
+                "is_ground_truth": is_ground_truth
+            }
 
         print(f"   Extracted {len(law_embeddings)} law embeddings")
         return law_embeddings
 
     def compute_multiple_similarities(self, evidence_embedding: np.ndarray,
                                      law_embedding: np.ndarray) -> Dict[str, float]:
-        """Compute multiple similarity metrics using optimized implementations"""
-        similarities = {}
-
-        # Use optimized NumPy operations
-        evidence_norm = np.linalg.norm(evidence_embedding)
-        law_norm = np.linalg.norm(law_embedding)
-        dot_product = np.dot(evidence_embedding, law_embedding)
-
-        # 1. Cosine Similarity (optimized)
-        if evidence_norm > 0 and law_norm > 0:
-            similarities["cosine"] = float(dot_product / (evidence_norm * law_norm))
-        else:
-            similarities["cosine"] = 0.0
-
-        # 2. Euclidean Distance (vectorized, inverted)
-        diff = evidence_embedding - law_embedding
-        euclidean_dist = np.sqrt(np.dot(diff, diff))  # Faster than np.linalg.norm
-        similarities["euclidean"] = float(1 / (1 + euclidean_dist))
-
-        # 3. Manhattan Distance (vectorized)
-        manhattan_dist = np.sum(np.abs(diff))
-        similarities["manhattan"] = float(1 / (1 + manhattan_dist))
-
-        # 4. Dot Product (already computed)
-        similarities["dot_product"] = float(dot_product)
-
-        # 5. Jaccard Similarity (optimized with vectorized operations)
-        evidence_binary = (evidence_embedding > 0)
-        law_binary = (law_embedding > 0)
-        intersection = np.sum(evidence_binary & law_binary)
-        union = np.sum(evidence_binary | law_binary)
-        similarities["jaccard"] = float(intersection / union) if union > 0 else 0.0
-
-        # 6. Pearson Correlation (vectorized)
-        if len(evidence_embedding) > 1:
-            try:
-                # Use optimized correlation computation
-                evidence_mean = np.mean(evidence_embedding)
-                law_mean = np.mean(law_embedding)
-                evidence_centered = evidence_embedding - evidence_mean
-                law_centered = law_embedding - law_mean
-                numerator = np.dot(evidence_centered, law_centered)
-                denominator = np.sqrt(np.dot(evidence_centered, evidence_centered) *
-                                    np.dot(law_centered, law_centered))
-                correlation = numerator / denominator if denominator > 0 else 0.0
-                similarities["pearson"] = float(correlation) if not np.isnan(correlation) else 0.0
-            except:
-                similarities["pearson"] = 0.0
-        else:
-            similarities["pearson"] = 0.0
-
-        return similarities
+        """Compute multiple similarity metrics for one pair with the batched kernel"""
+        return pair_similarities(evidence_embedding, law_embedding)
+
+    def index_laws(self, law_embeddings: Dict[str, Dict]) -> None:
+        """Fit TF-IDF and precompute vector statistics once; redone only if the set of laws changes"""
+        law_ids = list(law_embeddings.keys())
+        if self.law_stats is not None and law_ids == self.law_ids:
+            return
+        self.tfidf_index.fit([law_embeddings[law_id]["text"] for law_id in law_ids])
+        dimension = len(law_embeddings[law_ids[0]]["embedding"]) if law_ids else 0
+        vectors = (np.vstack([law_embeddings[law_id]["embedding"] for law_id in law_ids])
+                   if law_ids else np.zeros((0, dimension)))
+        self.law_stats = LawVectorStats(vectors)
+        self.law_ids = law_ids
 
     def compute_tfidf_similarity(self, evidence_text: str, law_text: str) -> float:
-        """Compute TF-IDF similarity"""
-        try:
-            texts = [evidence_text, law_text]
-            tfidf_matrix = self.tfidf_vectorizer.fit_transform(texts)
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            return float(similarity)
-        except:
-            return 0.0
+        """Compute TF-IDF similarity in the law-corpus vocabulary (no refitting)"""
+        return self.tfidf_index.pair_similarity(evidence_text, law_text)
 
     def compute_form_weight(self, violation: Dict[str, Any], law_data: Dict[str, Any]) -> float:
         """Compute weight based on available reporting forms"""
@@ -301,91 +180,93 @@ class AdvancedEvidenceLawMatcher:
 
         return min(1.0, weight)
 
-    def ensemble_match(self, evidence_text: str, evidence_embedding: np.ndarray,
-                      law_embeddings: Dict[str, Dict]) -> List[Dict[str, Any]]:
-        """Use ensemble of ML techniques to match evidence to laws"""
-        matches = []
+    @staticmethod
+    def _violation_fields(evidence_text: str) -> Dict[str, str]:
+        """Recover the fields used for form weighting from an evidence text"""
+        return {
+            "violation_type": evidence_text.split("VIOLATION_TYPE:")[1].split("|")[0].strip() if "VIOLATION_TYPE:" in evidence_text else "",
+            "jurisdiction": evidence_text.split("JURISDICTION:")[1].split("|")[0].strip() if "JURISDICTION:" in evidence_text else "",
+            "severity": evidence_text.split("SEVERITY:")[1].split("|")[0].strip() if "SEVERITY:" in evidence_text else "MEDIUM"
+        }
 
-        for law_id, law_info in law_embeddings.items():
-            law_embedding = law_info["embedding"]
-            law_text = law_info["text"]
-            law_data = law_info["law_data"]
+    def _build_match(self, law_id: str, law_info: Dict[str, Any], similarities: Dict[str, float],
+                     violation_dict: Dict[str, str]) -> Dict[str, Any]:
+        """Combine similarity metrics and form weight into one scored match"""
+        law_data = law_info["law_data"]
+        form_weight = self.compute_form_weight(violation_dict, law_data)
+
+        # Ensemble score (weighted combination)
+        ensemble_score = (
+            0.30 * similarities["cosine"] +
+            0.15 * similarities["euclidean"] +
+            0.10 * similarities["manhattan"] +
+            0.10 * similarities["dot_product"] +
+            0.10 * similarities["jaccard"] +
+            0.10 * similarities["pearson"] +
+            0.10 * similarities["tfidf"] +
+            0.05 * form_weight
+        )
+
+        # Ground truth bonus
+        if law_info.get("is_ground_truth"):
+            ensemble_score *= 1.1
 
-            # Compute multiple similarity metrics
-            similarities = self.compute_multiple_similarities(evidence_embedding, law_embedding)
+        return {
+            "law_id": law_id,
+            "law_name": law_data.get("name", ""),
+            "ensemble_score": ensemble_score,
+            "similarities": similarities,
+            "form_weight": form_weight,
+            "is_ground_truth": law_info.get("is_ground_truth", False),
+            "law_data": law_data
+        }
 
-            # TF-IDF similarity
-            tfidf_sim = self.compute_tfidf_similarity(evidence_text, law_text)
-            similarities["tfidf"] = tfidf_sim
+    def score_candidates(self, evidence_texts: List[str], evidence_embeddings: np.ndarray,
+                         candidate_indices: np.ndarray, law_embeddings: Dict[str, Dict]) -> List[List[Dict[str, Any]]]:
+        """Score (n, k) candidate laws per evidence item; every metric is computed as an (n, k) array"""
+        self.index_laws(law_embeddings)
+        metrics = ensemble_similarities(evidence_embeddings, self.law_stats, candidate_indices)
+        metrics["tfidf"] = self.tfidf_index.candidate_similarities(
+            self.tfidf_index.transform(evidence_texts), candidate_indices
+        )
 
-            # Form-based weight
-            violation_dict = {
-                "violation_type": evidence_text.split("VIOLATION_TYPE:")[1].split("|")[0].strip() if "VIOLATION_TYPE:" in evidence_text else "",
-                "jurisdiction": evidence_text.split("JURISDICTION:")[1].split("|")[0].strip() if "JURISDICTION:" in evidence_text else "",
-                "severity": evidence_text.split("SEVERITY:")[1].split("|")[0].strip() if "SEVERITY:" in evidence_text else "MEDIUM"
-            }
-            form_weight = self.compute_form_weight(violation_dict, law_data)
-
-            # Ensemble score (weighted combination)
-            ensemble_score = (
-                0.30 * similarities["cosine"] +
-                0.15 * similarities["euclidean"] +
-                0.10 * similarities["manhattan"] +
-                0.10 * similarities["dot_product"] +
-                0.10 * similarities["jaccard"] +
-                0.10 * similarities["pearson"] +
-                0.10 * similarities["tfidf"] +
-                0.05 * form_weight
-            )
-
-            # Ground truth bonus
-            if law_info.get("is_ground_truth"):
-                ensemble_score *= 1.1
-
-            matches.append({
-                "law_id": law_id,
-                "law_name": law_data.get("name", ""),
-                "ensemble_score": ensemble_score,
-                "similarities": similarities,
-                "form_weight": form_weight,
-                "is_ground_truth": law_info.get("is_ground_truth", False),
-                "law_data": law_data
-            })
-
-        matches.sort(key=lambda x: x["ensemble_score"], reverse=True)
-        return matches
+        all_matches = []
+        for i, evidence_text in enumerate(evidence_texts):
+            violation_dict = self._violation_fields(evidence_text)
+            matches = []
+            for j, law_idx in enumerate(candidate_indices[i]):
+                if not 0 <= law_idx < len(self.law_ids):
+                    continue
+                law_id = self.law_ids[law_idx]
+                similarities = {name: float(values[i, j]) for name, values in metrics.items()}
+                matches.append(self._build_match(law_id, law_embeddings[law_id], similarities, violation_dict))
+            matches.sort(key=lambda x: x["ensemble_score"], reverse=True)
+            all_matches.append(matches)
+        return all_matches
+
+    def ensemble_match(self, evidence_text: str, evidence_embedding: np.ndarray,
+                      law_embeddings: Dict[str, Dict]) -> List[Dict[str, Any]]:
+        """Use ensemble of ML techniques to match evidence to laws"""
+        candidates = np.arange(len(law_embeddings))[None, :]
+        return self.score_candidates([evidence_text], np.asarray(evidence_embedding).reshape(1, -1),
+                                     candidates, law_embeddings)[0]
 
     def match_all_evidence_fast(self, top_k: int = 5) -> Dict[str, Any]:
         """Fast matching using FAISS for vector similarity search"""
         print("\n🔗 Fast matching using optimized libraries...")
 
         law_embeddings = self.extract_law_embeddings()
+        self.index_laws(law_embeddings)
 
-        # Initialize variables
-        faiss_index = None
-        law_ids = []
-
+        law_index = None
         if FAISS_AVAILABLE and len(law_embeddings) > 0:
-            # Build FAISS index for fast similarity search
-            dimension = len(list(law_embeddings.values())[0]["embedding"])
-            faiss_index = faiss.IndexFlatIP(dimension)  # Inner product (cosine similarity for normalized vectors)
-
-            # Add law embeddings to index
-            law_vectors = []
-            for law_id, law_info in law_embeddings.items():
-                law_vectors.append(law_info["embedding"].astype('float32'))
-                law_ids.append(law_id)
-
-            law_matrix = np.vstack(law_vectors)
-            faiss_index.add(law_matrix)
-
-            print(f"   ✅ Built FAISS index with {faiss_index.ntotal} vectors")
-        else:
-            # Prepare law_ids for non-FAISS path
-            law_ids = list(law_embeddings.keys())
+            # Load or build the persisted FAISS index (rows follow self.law_ids;
+            # inner product = cosine similarity for normalized vectors)
+            law_index = load_or_build_law_index(self.law_ids, self.law_stats.vectors, self.index_config)
+            action = "Loaded" if law_index.loaded else "Built"
+            print(f"   ✅ {action} FAISS {law_index.kind} index with {len(law_index)} vectors")
 
         violations_data = self.violations.get("violations", {})
-        all_matches = []
 
         # Batch encode all evidence at once (much faster)
         print("   Encoding all evidence in batch...")
@@ -401,110 +282,32 @@ class AdvancedEvidenceLawMatcher:
                     "text": evidence_text
                 })
 
-        # Batch encode (leverage 128GB RAM)
-        evidence_embeddings = self.model.encode(evidence_texts, normalize_embeddings=True,
-                                                batch_size=BATCH_SIZE, show_progress_bar=False,
-                                                convert_to_numpy=True)
-
-        print(f"   Processing {len(evidence_texts)} evidence items...")
-
-        def process_evidence_fast_batch(batch_indices, evidence_embeddings_array, law_embeddings_dict, law_ids_list, faiss_idx=None):
-            """Process batch using FAISS for fast similarity search"""
-            batch_matches = []
-
-            for idx in batch_indices:
-                evidence_embedding = evidence_embeddings_array[idx]
-                evidence_meta = evidence_metadata[idx]
-
-                if faiss_idx is not None:
-                    # Use FAISS for fast similarity search
-                    evidence_vector = evidence_embedding.astype('float32').reshape(1, -1)
-                    distances, indices = faiss_idx.search(evidence_vector, min(top_k * 2, len(law_ids_list)))  # Get more for filtering
-
-                    matches = []
-                    for sim_score, law_idx in zip(distances[0], indices[0]):
-                        if law_idx < len(law_ids_list):
-                            law_id = law_ids_list[law_idx]
-                            law_info = law_embeddings_dict[law_id]
-
-                            # Compute additional metrics for top matches
-                            law_embedding = law_info["embedding"]
-                            additional_sims = self.compute_multiple_similarities(evidence_embedding, law_embedding)
-
-                            # Form weight
-                            violation_dict = {
-                                "violation_type": evidence_meta["text"].split("VIOLATION_TYPE:")[1].split("|")[0].strip() if "VIOLATION_TYPE:" in evidence_meta["text"] else "",
-                                "jurisdiction": evidence_meta["text"].split("JURISDICTION:")[1].split("|")[0].strip() if "JURISDICTION:" in evidence_meta["text"] else "",
-                                "severity": evidence_meta["text"].split("SEVERITY:")[1].split("|")[0].strip() if "SEVERITY:" in evidence_meta["text"] else "MEDIUM"
-                            }
-                            form_weight = self.compute_form_weight(violation_dict, law_info["law_data"])
-
-                            # Ensemble score
-                            ensemble_score = (
-                                0.30 * additional_sims["cosine"] +
-                                0.15 * additional_sims["euclidean"] +
-                                0.10 * additional_sims["manhattan"] +
-                                0.10 * additional_sims["dot_product"] +
-                                0.10 * additional_sims["jaccard"] +
-                                0.10 * additional_sims["pearson"] +
-                                0.10 * self.compute_tfidf_similarity(evidence_meta["text"], law_info["text"]) +
-                                0.05 * form_weight
-                            )
-
-                            if law_info.get("is_ground_truth"):
-                                ensemble_score *= 1.1
-
-                            matches.append({
-                                "law_id": law_id,
-                                "law_name": law_info["law_data"].get("name", ""),
-                                "ensemble_score": ensemble_score,
-                                "similarities": additional_sims,
-                                "form_weight": form_weight,
-                                "is_ground_truth": law_info.get("is_ground_truth", False),
-                                "law_data": law_info["law_data"]
-                            })
-
-                    matches.sort(key=lambda x: x["ensemble_score"], reverse=True)
-                    batch_matches.append({
-                        "violation": evidence_meta["violation"],
-                        "category": evidence_meta["category"],
-                        "matches": matches[:top_k]
-                    })
-                else:
-                    # Fallback to original method
-                    matches = self.ensemble_match(
-                        evidence_meta["text"],
-                        evidence_embedding,
-                        law_embeddings_dict
-                    )
-                    batch_matches.append({
-                        "violation": evidence_meta["violation"],
-                        "category": evidence_meta["category"],
-                        "matches": matches[:top_k]
-                    })
-
-            return batch_matches
-
-        # Process in parallel batches
-        batch_size = max(1, len(evidence_texts) // MAX_WORKERS)
-        batch_indices = [list(range(i, min(i+batch_size, len(evidence_texts))))
-                        for i in range(0, len(evidence_texts), batch_size)]
-
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = [executor.submit(process_evidence_fast_batch, batch_idx,
-                                      evidence_embeddings, law_embeddings, law_ids, faiss_index)
-                      for batch_idx in batch_indices]
-
-            completed = 0
-            for future in as_completed(futures):
-                try:
-                    batch_matches = future.result()
-                    all_matches.extend(batch_matches)
-                    completed += len(batch_matches)
-                    if completed % 20 == 0:
-                        print(f"   Progress: {completed}/{len(evidence_texts)} evidence items processed")
-                except Exception as e:
-                    print(f"   ⚠️  Error in batch: {e}")
+        all_matches = []
+        if evidence_texts and law_embeddings:
+            # Batch encode (leverage 128GB RAM)
+            evidence_embeddings = self.model.encode(evidence_texts, normalize_embeddings=True,
+                                                    batch_size=BATCH_SIZE, show_progress_bar=False,
+                                                    convert_to_numpy=True)
+            evidence_embeddings = np.ascontiguousarray(evidence_embeddings, dtype=np.float32)
+
+            print(f"   Processing {len(evidence_texts)} evidence items...")
+
+            if law_index is not None:
+                # One FAISS search for all evidence (get more for filtering)
+                _, candidate_indices = law_index.search(evidence_embeddings, min(top_k * 2, len(self.law_ids)))
+            else:
+                # Without FAISS every law is a candidate
+                candidate_indices = np.tile(np.arange(len(self.law_ids)), (len(evidence_texts), 1))
+
+            scored = self.score_candidates(evidence_texts, evidence_embeddings, candidate_indices, law_embeddings)
+            all_matches = [
+                {
+                    "violation": evidence_meta["violation"],
+                    "category": evidence_meta["category"],
+                    "matches": matches[:top_k]
+                }
+                for evidence_meta, matches in zip(evidence_metadata, scored)
+            ]
 
         print(f"✅ Matched {len(all_matches)} evidence items to laws")
 
@@ -21,6 +21,11 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from scripts.utils.paths import PROJECT_ROOT, DATA_PROCESSED_DIR, DATA_VECTORS_DIR, RESEARCH_DIR
+from scripts.utils.embedding_cache import CachedEncoder
+from scripts.utils.law_corpus import LawCorpus, load_law_corpus
+from scripts.analysis.utils.graph_snapshot import GraphSnapshot, snapshot_path, source_stamp
+from scripts.analysis.utils.similarity_join import SimilarityEdges, normalize_rows, threshold_join, topk_join
+from scripts.analysis.utils.neighbor_dbscan import dbscan_cosine
 
 # Optimize for ARM M4 MAX with 128GB RAM
 MAX_WORKERS = os.cpu_count() or 16
@@ -28,56 +33,19 @@ BATCH_SIZE = 128  # Large batches for 128GB RAM
 print(f"🚀 Advanced ML Pipeline - ARM M4 MAX Optimized")
 print(f"   Workers: {MAX_WORKERS}, Batch Size: {BATCH_SIZE}, RAM: 128GB")
 
-try:
-    from sentence_transformers import SentenceTransformer
-    import tensorflow as tf
-    print("✅ TensorFlow available for parallel operations")
-except ImportError:
-    print("Installing TensorFlow and dependencies...")
-    import subprocess
-    try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "--user",
-                              "tensorflow-macos", "sentence-transformers", "scikit-learn", "numpy"],
-                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        import tensorflow as tf
-        from sentence_transformers import SentenceTransformer
-        print("✅ TensorFlow installed")
-    except:
-        print("⚠️  TensorFlow installation failed, using NumPy operations")
-        tf = None
-        from sentence_transformers import SentenceTransformer
-
-try:
-    from sklearn.metrics.pairwise import cosine_similarity
-    from sklearn.cluster import DBSCAN
-    from sklearn.decomposition import PCA
-except ImportError:
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "--user",
-                          "scikit-learn"],
-                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    from sklearn.metrics.pairwise import cosine_similarity
-    from sklearn.cluster import DBSCAN
-    from sklearn.decomposition import PCA
-
 
 class AdvancedMLPipeline:
     """Advanced ML pipeline with TensorFlow-style parallel processing and vector analysis"""
 
     def __init__(self):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model = CachedEncoder('all-MiniLM-L6-v2')
         self.violations = {}
-        self.laws = {}
+        self.law_corpus = LawCorpus()
         self.forms = {}
         self.connections = defaultdict(list)
+        self.connection_edges: Dict[str, SimilarityEdges] = {}  # Sparse COO form of self.connections
         self.vector_cache = {}  # Leverage 128GB RAM for caching
 
-        # Configure TensorFlow for ARM M4 MAX if available
-        if tf is not None:
-            tf.config.threading.set_inter_op_parallelism_threads(MAX_WORKERS)
-            tf.config.threading.set_intra_op_parallelism_threads(MAX_WORKERS)
-            print(f"✅ TensorFlow configured for {MAX_WORKERS} threads")
-
     def load_all_data(self):
         """Load all data sources in parallel"""
         print("\n📂 Loading all data sources in parallel...")
@@ -92,7 +60,6 @@ class AdvancedMLPipeline:
         # Collect all files to load
         files_to_load = [
             (DATA_PROCESSED_DIR / "integrated_violations.json", "violations"),
-            (PROJECT_ROOT / "ref" / "law" / "jurisdiction_references.json", "laws"),
             (DATA_VECTORS_DIR / "lariat_tx_embeddings.json", "lariat_embeddings"),
         ]
 
@@ -105,12 +72,16 @@ class AdvancedMLPipeline:
                 if data:
                     if name == "violations":
                         self.violations = data
-                    elif name == "laws":
-                        self.laws = data
                     elif name == "lariat_embeddings":
                         self.lariat_embeddings = data
                     print(f"   ✅ Loaded {name}")
 
+        # Laws come from the compiled corpus (flat tables instead of the nested JSON)
+        law_file = PROJECT_ROOT / "ref" / "law" / "jurisdiction_references.json"
+        if law_file.exists():
+            self.law_corpus = load_law_corpus(law_file)
+            print(f"   ✅ Loaded laws")
+
         print(f"✅ Data loading complete")
 
     def extract_all_embeddings_parallel(self) -> Dict[str, np.ndarray]:
@@ -183,7 +154,7 @@ class AdvancedMLPipeline:
 
         # Collect all texts
         all_texts, all_ids = collect_texts(self.violations)
-        law_texts, law_ids = collect_texts(self.laws)
+        law_texts, law_ids = self._collect_law_texts()
         all_texts.extend(law_texts)
         all_ids.extend(law_ids)
 
@@ -227,6 +198,35 @@ class AdvancedMLPipeline:
             parts.append(f"URL: {form['url']}")
         return " | ".join(parts)
 
+    def _collect_law_texts(self) -> Tuple[List[str], List[str]]:
+        """Texts and ids of laws and their forms from the compiled law corpus"""
+        texts = []
+        ids = []
+        collected_ids = set()
+
+        def add(item_id: str, text: str) -> None:
+            if item_id not in collected_ids:
+                texts.append(text)
+                ids.append(item_id)
+                collected_ids.add(item_id)
+
+        for law in self.law_corpus.laws:
+            fields = law["fields"]
+            # Use the ground truth text if available, else create one
+            if law["ground_truth_offset"] >= 0:
+                add(f"law_{law['path']}", law["ground_truth_text"])
+            elif "name" in fields and ("key_sections" in fields or "description" in fields):
+                law_text = self._create_law_text(fields, law["path"])
+                if law_text:
+                    add(f"law_{law['path']}", law_text)
+
+            for form in self.law_corpus.forms_of(law["law_id"]):
+                form_fields = form["fields"]
+                form_key = form_fields.get('form_number', form_fields.get('form_name', 'unknown'))
+                add(f"form_{form_key}_{form['form_index']}", self._create_form_text(form_fields))
+
+        return texts, ids
+
     def _create_law_text(self, law_data: Dict[str, Any], path: str = "") -> str:
         """Create comprehensive text for law embedding"""
         parts = []
@@ -257,182 +257,45 @@ class AdvancedMLPipeline:
         print(f"   Laws: {len(law_embeddings)}")
         print(f"   Forms: {len(form_embeddings)}")
 
-        connections = {
-            "violation_law": [],
-            "violation_form": [],
-            "law_form": [],
-            "violation_violation": []
+        # One normalized float32 matrix per type; joins stream row blocks through BLAS
+        violation_keys = list(violation_embeddings.keys())
+        law_keys = list(law_embeddings.keys())
+        form_keys = list(form_embeddings.keys())
+        violation_matrix = self._stack_normalized(violation_embeddings)
+        law_matrix = self._stack_normalized(law_embeddings)
+        form_matrix = self._stack_normalized(form_embeddings)
+
+        edges = {
+            # Violation-Law: top 5 laws per violation, lower threshold for ground truth matching
+            "violation_law": topk_join(violation_matrix, law_matrix, k=5, threshold=max(0.5, threshold - 0.15),
+                                       normalized=True),
+            # Violation-Form: top 3 forms per violation with a lower threshold
+            "violation_form": topk_join(violation_matrix, form_matrix, k=3, threshold=max(0.5, threshold - 0.1),
+                                        normalized=True),
+            # Law-Form: all pairs above threshold
+            "law_form": threshold_join(law_matrix, form_matrix, threshold, normalized=True),
+            # Violation-Violation: each similar pair once
+            "violation_violation": threshold_join(violation_matrix, None, threshold, normalized=True),
+        }
+        endpoints = {
+            "violation_law": (("violation", violation_keys), ("law", law_keys)),
+            "violation_form": (("violation", violation_keys), ("form", form_keys)),
+            "law_form": (("law", law_keys), ("form", form_keys)),
+            "violation_violation": (("violation1", violation_keys), ("violation2", violation_keys)),
         }
 
-        # Use TensorFlow-style batch operations if available, else NumPy
-        if tf is not None:
-            # Convert to TensorFlow tensors for parallel operations
-            violation_tensors = {k: tf.constant(v) for k, v in violation_embeddings.items()}
-            law_tensors = {k: tf.constant(v) for k, v in law_embeddings.items()}
-            form_tensors = {k: tf.constant(v) for k, v in form_embeddings.items()}
-
-            # Batch compute similarities using TensorFlow
-            print("   Using TensorFlow for parallel similarity computation...")
-
-            # Violation-Law connections
-            if violation_tensors and law_tensors:
-                violation_matrix = tf.stack(list(violation_tensors.values()))
-                law_matrix = tf.stack(list(law_tensors.values()))
-
-                # Compute cosine similarity in parallel
-                violation_norm = tf.nn.l2_normalize(violation_matrix, axis=1)
-                law_norm = tf.nn.l2_normalize(law_matrix, axis=1)
-                similarity_matrix = tf.matmul(violation_norm, law_norm, transpose_b=True)
-
-                # Get results
-                similarity_np = similarity_matrix.numpy()
-                violation_keys = list(violation_tensors.keys())
-                law_keys = list(law_tensors.keys())
-
-                for i, v_key in enumerate(violation_keys):
-                    for j, l_key in enumerate(law_keys):
-                        similarity = float(similarity_np[i, j])
-                        if similarity >= threshold:
-                            connections["violation_law"].append({
-                                "violation": v_key,
-                                "law": l_key,
-                                "similarity": similarity,
-                                "connection_type": "violation_law"
-                            })
-        else:
-            # Fallback to NumPy with parallel processing
-            print("   Using NumPy with parallel processing...")
-
-            def compute_violation_law_batch(batch_violations, law_embeddings_dict, threshold_val):
-                """Compute similarities for a batch of violations"""
-                batch_results = []
-                violation_array = np.array([v for v in batch_violations.values()])
-                law_array = np.array([v for v in law_embeddings_dict.values()])
-
-                similarities = cosine_similarity(violation_array, law_array)
-
-                violation_keys = list(batch_violations.keys())
-                law_keys = list(law_embeddings_dict.keys())
-
-                for i, v_key in enumerate(violation_keys):
-                    # Get top matches per violation (not just above threshold)
-                    violation_sims = similarities[i]
-                    top_indices = np.argsort(violation_sims)[-5:][::-1]  # Top 5 matches
-
-                    for j in top_indices:
-                        similarity = float(violation_sims[j])
-                        l_key = law_keys[j]  # Get law key from index
-                        # Use lower threshold for ground truth matching
-                        if similarity >= max(0.5, threshold_val - 0.15):
-                            batch_results.append({
-                                "violation": v_key,
-                                "law": l_key,
-                                "similarity": similarity,
-                                "connection_type": "violation_law"
-                            })
-                return batch_results
-
-            # Process violations in parallel batches
-            violation_items = list(violation_embeddings.items())
-            batch_size = max(1, len(violation_items) // MAX_WORKERS)
-
-            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                futures = []
-                for i in range(0, len(violation_items), batch_size):
-                    batch = dict(violation_items[i:i+batch_size])
-                    futures.append(executor.submit(compute_violation_law_batch, batch, law_embeddings, threshold))
-
-                completed = 0
-                for future in as_completed(futures):
-                    try:
-                        batch_results = future.result()
-                        connections["violation_law"].extend(batch_results)
-                        completed += 1
-                        if completed % 5 == 0:
-                            print(f"   Progress: {completed} batches processed, {len(connections['violation_law'])} connections found")
-                    except Exception as e:
-                        print(f"   ⚠️  Error in batch: {e}")
-
-        # Violation-Form connections (parallel with lower threshold)
-        violation_form_threshold = max(0.5, threshold - 0.1)
-        if violation_embeddings and form_embeddings:
-            violation_array = np.array([v for v in violation_embeddings.values()])
-            form_array = np.array([v for v in form_embeddings.values()])
-            similarities = cosine_similarity(violation_array, form_array)
-
-            violation_keys = list(violation_embeddings.keys())
-            form_keys = list(form_embeddings.keys())
-
-            # Process in parallel batches
-            def process_violation_form_batch(batch_indices, violation_keys_list, form_keys_list, similarities_matrix):
-                batch_connections = []
-                for i in batch_indices:
-                    v_key = violation_keys_list[i]
-                    violation_similarities = similarities_matrix[i]
-                    top_indices = np.argsort(violation_similarities)[-3:][::-1]
-
-                    for j in top_indices:
-                        similarity = float(violation_similarities[j])
-                        if similarity >= violation_form_threshold:
-                            batch_connections.append({
-                                "violation": v_key,
-                                "form": form_keys_list[j],
-                                "similarity": similarity,
-                                "connection_type": "violation_form"
-                            })
-                return batch_connections
-
-            batch_size = max(1, len(violation_keys) // MAX_WORKERS)
-            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                futures = []
-                for i in range(0, len(violation_keys), batch_size):
-                    batch_indices = list(range(i, min(i+batch_size, len(violation_keys))))
-                    futures.append(executor.submit(process_violation_form_batch, batch_indices,
-                                                  violation_keys, form_keys, similarities))
-
-                for future in as_completed(futures):
-                    try:
-                        batch_connections = future.result()
-                        connections["violation_form"].extend(batch_connections)
-                    except Exception:
-                        pass
-
-        # Law-Form connections
-        if law_embeddings and form_embeddings:
-            law_array = np.array([v for v in law_embeddings.values()])
-            form_array = np.array([v for v in form_embeddings.values()])
-            similarities = cosine_similarity(law_array, form_array)
-
-            law_keys = list(law_embeddings.keys())
-            form_keys = list(form_embeddings.keys())
-
-            for i, l_key in enumerate(law_keys):
-                for j, f_key in enumerate(form_keys):
-                    similarity = float(similarities[i, j])
-                    if similarity >= threshold:
-                        connections["law_form"].append({
-                            "law": l_key,
-                            "form": f_key,
-                            "similarity": similarity,
-                            "connection_type": "law_form"
-                        })
-
-        # Violation-Violation connections (find similar violations)
-        if len(violation_embeddings) > 1:
-            violation_array = np.array([v for v in violation_embeddings.values()])
-            similarities = cosine_similarity(violation_array)
-
-            violation_keys = list(violation_embeddings.keys())
-            for i in range(len(violation_keys)):
-                for j in range(i+1, len(violation_keys)):
-                    similarity = float(similarities[i, j])
-                    if similarity >= threshold:
-                        connections["violation_violation"].append({
-                            "violation1": violation_keys[i],
-                            "violation2": violation_keys[j],
-                            "similarity": similarity,
-                            "connection_type": "violation_violation"
-                        })
+        connections = {}
+        for connection_type, edge_list in edges.items():
+            (left_name, left_keys), (right_name, right_keys) = endpoints[connection_type]
+            connections[connection_type] = [
+                {
+                    left_name: left_keys[i],
+                    right_name: right_keys[j],
+                    "similarity": score,
+                    "connection_type": connection_type
+                }
+                for i, j, score in zip(edge_list.rows.tolist(), edge_list.cols.tolist(), edge_list.scores.tolist())
+            ]
 
         print(f"✅ Found connections:")
         print(f"   - Violation-Law: {len(connections['violation_law'])}")
@@ -441,8 +304,15 @@ class AdvancedMLPipeline:
         print(f"   - Violation-Violation: {len(connections['violation_violation'])}")
 
         self.connections = connections
+        self.connection_edges = edges
         return connections
 
+    @staticmethod
+    def _stack_normalized(embeddings: Dict[str, np.ndarray]) -> np.ndarray:
+        if not embeddings:
+            return np.empty((0, 0), dtype=np.float32)
+        return normalize_rows(np.vstack(list(embeddings.values())))
+
     def build_ground_truth_network(self, connections: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
         """Build ground truth network graph of all connections"""
         print("\n🌐 Building ground truth network...")
@@ -479,44 +349,25 @@ class AdvancedMLPipeline:
                 }
 
         # Add law nodes (from ground truth embeddings)
-        def extract_law_nodes(data, path=""):
-            if isinstance(data, dict):
-                if "ground_truth_embedding" in data:
-                    node_id = f"law_{path}"
-                    network["nodes"]["laws"][node_id] = {
-                        "id": node_id,
-                        "type": "law",
-                        "name": data.get("name", ""),
-                        "data": data
-                    }
-                for key, value in data.items():
-                    if key not in ["ground_truth_embedding", "ground_truth_text"]:
-                        extract_law_nodes(value, f"{path}.{key}" if path else key)
-            elif isinstance(data, list):
-                for i, item in enumerate(data):
-                    extract_law_nodes(item, f"{path}[{i}]")
-
-        extract_law_nodes(self.laws)
+        for law in self.law_corpus.laws:
+            if law["ground_truth_offset"] >= 0:
+                node_id = f"law_{law['path']}"
+                network["nodes"]["laws"][node_id] = {
+                    "id": node_id,
+                    "type": "law",
+                    "name": law["name"],
+                    "data": law["fields"]
+                }
 
         # Add form nodes
-        def extract_form_nodes(data, path=""):
-            if isinstance(data, dict):
-                if "reporting_forms" in data:
-                    for form in data["reporting_forms"]:
-                        form_id = form.get("form_number") or form.get("form_name", "unknown")
-                        node_id = f"form_{form_id}"
-                        network["nodes"]["forms"][node_id] = {
-                            "id": node_id,
-                            "type": "form",
-                            "data": form
-                        }
-                for key, value in data.items():
-                    extract_form_nodes(value, f"{path}.{key}" if path else key)
-            elif isinstance(data, list):
-                for i, item in enumerate(data):
-                    extract_form_nodes(item, f"{path}[{i}]")
-
-        extract_form_nodes(self.laws)
+        for form in self.law_corpus.forms:
+            form_id = form["fields"].get("form_number") or form["fields"].get("form_name", "unknown")
+            node_id = f"form_{form_id}"
+            network["nodes"]["forms"][node_id] = {
+                "id": node_id,
+                "type": "form",
+                "data": form["fields"]
+            }
 
         # Add edges from connections
         for edge_type, edge_list in connections.items():
@@ -554,9 +405,8 @@ class AdvancedMLPipeline:
 
         all_vectors_array = np.array(all_vectors)
 
-        # Use DBSCAN with parallel processing
-        clustering = DBSCAN(eps=eps, min_samples=min_samples, metric='cosine', n_jobs=MAX_WORKERS)
-        cluster_labels = clustering.fit_predict(all_vectors_array)
+        # DBSCAN over a cached sparse cosine radius graph (no dense pairwise distances)
+        cluster_labels = dbscan_cosine(all_vectors_array, eps=eps, min_samples=min_samples)
 
         # Organize clusters
         clusters = defaultdict(list)
@@ -623,6 +473,8 @@ class AdvancedMLPipeline:
         output_file.parent.mkdir(parents=True, exist_ok=True)
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(analysis, f, indent=2, ensure_ascii=False)
+        # CSR snapshot of the connection graph for graph_theory_analysis.py
+        GraphSnapshot.from_analysis(analysis, source=source_stamp(output_file)).save(snapshot_path(output_file))
 
         print(f"✅ Saved to {output_file}")
         print(f"   Total embeddings: {analysis['summary']['total_embeddings']}")
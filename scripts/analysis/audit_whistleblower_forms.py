@@ -15,6 +15,7 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from scripts.utils.paths import PROJECT_ROOT, DATA_PROCESSED_DIR
+from scripts.utils.law_corpus import load_law_corpus
 
 print("🔍 Auditing Whistleblower and Private Citizen Reporting Forms")
 
@@ -39,61 +40,47 @@ class WhistleblowerFormAuditor:
             print(f"❌ Law references file not found: {law_file}")
             return
 
-        with open(law_file, 'r', encoding='utf-8') as f:
-            self.laws = json.load(f)
+        self.law_corpus = load_law_corpus(law_file)
 
         # Extract all forms
-        self._extract_all_forms(self.laws)
+        self._extract_all_forms()
 
         print(f"   Found {len(self.all_forms)} total forms")
         print(f"   Whistleblower forms: {len(self.whistleblower_forms)}")
         print(f"   Citizen complaint forms: {len(self.citizen_forms)}")
         print(f"   Tip forms: {len(self.tip_forms)}")
 
-    def _extract_all_forms(self, data: Any, path: str = ""):
-        """Recursively extract all reporting forms"""
-        if isinstance(data, dict):
-            # Check for reporting_forms
-            if "reporting_forms" in data:
-                for form in data["reporting_forms"]:
-                    form_info = {
-                        "form_name": form.get("form_name", ""),
-                        "form_number": form.get("form_number", ""),
-                        "agency": form.get("agency", ""),
-                        "url": form.get("url", ""),
-                        "description": form.get("description", ""),
-                        "form_type": form.get("form_type", ""),
-                        "law": data.get("name", ""),
-                        "path": path
-                    }
-                    self.all_forms.append(form_info)
-
-                    # Categorize
-                    desc_lower = form_info["description"].lower()
-                    name_lower = form_info["form_name"].lower()
-                    combined = f"{desc_lower} {name_lower}"
-
-                    if any(term in combined for term in ["whistleblower", "whistle-blower", "whistle blower"]):
-                        self.whistleblower_forms.append(form_info)
-
-                    if any(term in combined for term in ["citizen", "private", "public", "individual"]):
-                        self.citizen_forms.append(form_info)
-
-                    if "complaint" in combined:
-                        self.complaint_forms.append(form_info)
-
-                    if any(term in combined for term in ["tip", "tips", "tip line", "hotline"]):
-                        self.tip_forms.append(form_info)
-
-            # Recursively process
-            for key, value in data.items():
-                if key not in ["embedding", "embedding_text", "ground_truth_embedding", "ground_truth_text"]:
-                    sub_path = f"{path}.{key}" if path else key
-                    self._extract_all_forms(value, sub_path)
-
-        elif isinstance(data, list):
-            for i, item in enumerate(data):
-                self._extract_all_forms(item, f"{path}[{i}]")
+    def _extract_all_forms(self):
+        """Collect and categorize all reporting forms from the compiled law corpus"""
+        for form in self.law_corpus.forms:
+            form_info = {
+                "form_name": form["form_name"],
+                "form_number": form["form_number"],
+                "agency": form["agency"],
+                "url": form["url"],
+                "description": form["description"],
+                "form_type": form["form_type"],
+                "law": form["law_name"],
+                "path": form["law_path"]
+            }
+            self.all_forms.append(form_info)
+
+            # Categorize
+            desc_lower = form_info["description"].lower()
+            name_lower = form_info["form_name"].lower()
+            combined = f"{desc_lower} {name_lower}"
+
+            if any(term in combined for term in ["whistleblower", "whistle-blower", "whistle blower"]):
+                self.whistleblower_forms.append(form_info)
+
+            if any(term in combined for term in ["citizen", "private", "public", "individual"]):
+                self.citizen_forms.append(form_info)
+
+            if "complaint" in combined:
+                self.complaint_forms.append(form_info)
+
+            if any(term in combined for term in ["tip", "tips", "tip line", "hotline"]):
+                self.tip_forms.append(form_info)
 
     def identify_missing_forms(self):
         """Identify common whistleblower/citizen forms that may be missing"""
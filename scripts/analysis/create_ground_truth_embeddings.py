@@ -16,6 +16,7 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from scripts.utils.paths import PROJECT_ROOT, DATA_PROCESSED_DIR, DATA_VECTORS_DIR
+from scripts.utils.embedding_cache import CachedEncoder
 
 try:
     from sentence_transformers import SentenceTransformer
@@ -141,7 +142,7 @@ def create_ground_truth_embeddings(law_references_file: Path, output_file: Path)
 
     # Load embedding model
     print("\n🤖 Loading embedding model...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+    model = CachedEncoder('all-MiniLM-L6-v2')
     print("✅ Model loaded")
 
     # Create ground truth texts and embeddings
@@ -21,6 +21,7 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from scripts.utils.paths import PROJECT_ROOT, DATA_PROCESSED_DIR, DATA_VECTORS_DIR, DATA_RAW_DIR, RESEARCH_DIR
+from scripts.utils.embedding_cache import CachedEncoder
 
 # Optimize for ARM M4 MAX - use all cores and leverage 128GB RAM
 MAX_WORKERS = os.cpu_count() or 16
@@ -45,7 +46,7 @@ class ViolationDiscoverySystem:
     """System for discovering new violations from various data sources"""
 
     def __init__(self):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model = CachedEncoder('all-MiniLM-L6-v2')
         self.existing_violations = set()
         self.discovered_violations = []
         self.violation_patterns = self._load_violation_patterns()
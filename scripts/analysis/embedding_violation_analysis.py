@@ -17,102 +17,88 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from scripts.utils.paths import PROJECT_ROOT, DATA_VECTORS_DIR, DATA_PROCESSED_DIR
+from scripts.analysis.utils.similarity_join import normalize_rows, threshold_join, topk_join
 
 
-def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
-    """Calculate cosine similarity between two vectors"""
-    vec1 = np.array(vec1)
-    vec2 = np.array(vec2)
+# Labelled fields in the " | "-separated embedding text: label -> (key, keep first token only)
+ENTITY_FIELDS = {
+    'Filing Number:': ('filing_number', True),
+    'Name:': ('name', False),
+    'Address:': ('address', False),
+    'Status:': ('status', False),
+    'Registered Agent:': ('registered_agent', False),
+    'Tax ID:': ('tax_id', True),
+}
 
-    dot_product = np.dot(vec1, vec2)
-    norm1 = np.linalg.norm(vec1)
-    norm2 = np.linalg.norm(vec2)
-
-    if norm1 == 0 or norm2 == 0:
-        return 0.0
-
-    return float(dot_product / (norm1 * norm2))
+VIOLATION_MARKERS = {
+    'Tax Forfeiture': 'has_tax_forfeiture',
+    'Forfeited': 'has_forfeited_status',
+    'Reinstatement': 'has_reinstatement',
+}
 
 
 def extract_entity_info(text: str) -> Dict[str, str]:
-    """Extract entity information from embedding text"""
-    info = {}
+    """Extract entity information from embedding text
+
+    The text is split into '|' segments once and each segment is checked for
+    every field label. A field's value is the text after its label, up to the
+    segment end (or a repeat of the label); when several segments carry the
+    label, the last one wins.
+    """
+    values = {}
+    for segment in text.split('|'):
+        for label in ENTITY_FIELDS:
+            if label in segment:
+                values[label] = segment.split(label, 2)[1].strip()
 
-    # Extract filing number
-    filing_match = text.find('Filing Number:')
-    if filing_match != -1:
-        parts = text[filing_match:].split('|')
-        for part in parts:
-            if 'Filing Number:' in part:
-                match = part.split('Filing Number:')[1].strip().split()[0]
-                info['filing_number'] = match
-
-    # Extract name
-    name_match = text.find('Name:')
-    if name_match != -1:
-        parts = text[name_match:].split('|')
-        for part in parts:
-            if 'Name:' in part:
-                name = part.split('Name:')[1].strip().split('|')[0].strip()
-                info['name'] = name
-
-    # Extract address
-    addr_match = text.find('Address:')
-    if addr_match != -1:
-        parts = text[addr_match:].split('|')
-        for part in parts:
-            if 'Address:' in part:
-                addr = part.split('Address:')[1].strip().split('|')[0].strip()
-                info['address'] = addr.replace('\n', ' ')
-
-    # Extract status
-    status_match = text.find('Status:')
-    if status_match != -1:
-        parts = text[status_match:].split('|')
-        for part in parts:
-            if 'Status:' in part:
-                status = part.split('Status:')[1].strip().split('|')[0].strip()
-                info['status'] = status
-
-    # Extract registered agent
-    agent_match = text.find('Registered Agent:')
-    if agent_match != -1:
-        parts = text[agent_match:].split('|')
-        for part in parts:
-            if 'Registered Agent:' in part:
-                agent = part.split('Registered Agent:')[1].strip().split('|')[0].strip()
-                info['registered_agent'] = agent
-
-    # Extract Tax ID
-    tax_match = text.find('Tax ID:')
-    if tax_match != -1:
-        parts = text[tax_match:].split('|')
-        for part in parts:
-            if 'Tax ID:' in part:
-                tax_id = part.split('Tax ID:')[1].strip().split()[0]
-                info['tax_id'] = tax_id
+    info = {}
+    for label, (key, first_token) in ENTITY_FIELDS.items():
+        value = values.get(label)
+        if value is None:
+            continue
+        if first_token:
+            if not value:
+                continue
+            value = value.split(None, 1)[0]
+        info[key] = value.replace('\n', ' ') if key == 'address' else value
 
     # Check for violations in text
-    if 'Tax Forfeiture' in text:
-        info['has_tax_forfeiture'] = True
-    if 'Forfeited' in text:
-        info['has_forfeited_status'] = True
-    if 'Reinstatement' in text:
-        info['has_reinstatement'] = True
+    for marker, key in VIOLATION_MARKERS.items():
+        if marker in text:
+            info[key] = True
 
     return info
 
 
+def similar_pairs(matrix: np.ndarray, similarity_threshold: float,
+                  top_k: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pairs (i < j) of rows with cosine similarity >= threshold, most similar first
+
+    Row blocks of the normalized matrix are scored with one matrix product
+    each (see similarity_join), so the n x n similarity matrix is never held
+    in memory. With `top_k`, only pairs where one entity is among the other's
+    k most similar are kept. Ties are ordered by (i, j).
+    """
+    unit = normalize_rows(matrix)
+    if top_k is None:
+        edges = threshold_join(unit, None, similarity_threshold, normalized=True)
+    else:
+        edges = topk_join(unit, None, top_k, similarity_threshold, normalized=True)
+    rows, cols, scores = edges.rows, edges.cols, edges.scores
+
+    order = np.lexsort((cols, rows, -scores))
+    return rows[order], cols[order], scores[order]
+
+
 def find_similar_entities(embeddings_data: Dict[str, Any],
-                         similarity_threshold: float = 0.7) -> Dict[str, Any]:
+                         similarity_threshold: float = 0.7,
+                         top_k: Optional[int] = None) -> Dict[str, Any]:
     """Find entities with similar violation patterns using cosine similarity"""
     vectors = embeddings_data.get('vectors', [])
 
     if len(vectors) < 2:
         return {'similarity_pairs': [], 'clusters': []}
 
-    # Build similarity matrix
-    similarity_pairs = []
     entity_embeddings = {}
     entity_info = {}
 
@@ -126,26 +112,21 @@ def find_similar_entities(embeddings_data: Dict[str, Any],
             entity_info[entity_id] = extract_entity_info(text)
             entity_info[entity_id]['original_id'] = vec.get('id', '')
 
-    # Calculate pairwise similarities
+    # Pairwise similarities over one matrix, extracted blockwise
     entity_ids = list(entity_embeddings.keys())
-    for i, entity_id1 in enumerate(entity_ids):
-        for entity_id2 in entity_ids[i+1:]:
-            similarity = cosine_similarity(
-                entity_embeddings[entity_id1],
-                entity_embeddings[entity_id2]
-            )
-
-            if similarity >= similarity_threshold:
-                similarity_pairs.append({
-                    'entity1': entity_id1,
-                    'entity2': entity_id2,
-                    'similarity': similarity,
-                    'entity1_info': entity_info[entity_id1],
-                    'entity2_info': entity_info[entity_id2]
-                })
-
-    # Sort by similarity
-    similarity_pairs.sort(key=lambda x: x['similarity'], reverse=True)
+    matrix = np.asarray(list(entity_embeddings.values()), dtype=np.float32)
+    rows, cols, scores = similar_pairs(matrix, similarity_threshold, top_k)
+
+    similarity_pairs = [
+        {
+            'entity1': entity_ids[i],
+            'entity2': entity_ids[j],
+            'similarity': similarity,
+            'entity1_info': entity_info[entity_ids[i]],
+            'entity2_info': entity_info[entity_ids[j]]
+        }
+        for i, j, similarity in zip(rows.tolist(), cols.tolist(), scores.tolist())
+    ]
 
     return {
         'similarity_pairs': similarity_pairs,
@@ -12,167 +12,51 @@ from typing import Dict, List, Any, Optional, Tuple, Set
 from collections import defaultdict, deque
 import numpy as np
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import heapq
+import networkx as nx
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from scripts.utils.paths import PROJECT_ROOT, DATA_PROCESSED_DIR
+from scripts.analysis.utils.centrality import compute_centralities, top_nodes
+from scripts.analysis.utils.graph_snapshot import GraphSnapshot, load_graph_snapshot
+from scripts.analysis.utils.path_search import CSRGraph, shortest_path_trees, simple_paths_to_targets, tree_path
 
 # Optimize for ARM M4 MAX
 MAX_WORKERS = os.cpu_count() or 16
+# Target additive error of the sampled (normalized) betweenness centrality
+BETWEENNESS_EPSILON = float(os.environ.get("BETWEENNESS_EPSILON", 0.05))
 print(f"🚀 Graph Theory Analysis - ARM M4 MAX Optimized ({MAX_WORKERS} workers)")
 
-try:
-    import networkx as nx
-    print("✅ NetworkX available")
-except ImportError:
-    print("Installing NetworkX...")
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "--user", "networkx"],
-                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    import networkx as nx
-    print("✅ NetworkX installed")
-
 
 class GraphTheoryAnalyzer:
     """Graph theory analysis for violation-form connections"""
 
     def __init__(self):
-        self.graph = nx.DiGraph()  # Directed graph
-        self.violations = {}
-        self.laws = {}
-        self.forms = {}
-        self.node_metadata = {}
-        self.edge_weights = {}
+        self.snapshot: Optional[GraphSnapshot] = None
+        self._graph: Optional[nx.DiGraph] = None
+
+    @property
+    def graph(self) -> nx.DiGraph:
+        """NetworkX view of the snapshot, built on first use"""
+        if self._graph is None:
+            self._graph = self.snapshot.to_networkx() if self.snapshot is not None else nx.DiGraph()
+        return self._graph
 
     def load_connections(self, analysis_file: Path):
-        """Load connections from advanced ML analysis"""
+        """Load the connection graph of an advanced ML analysis (via its CSR snapshot)"""
         print(f"\n📂 Loading connections from {analysis_file}...")
 
-        with open(analysis_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        # Load network structure
-        network = data.get("network", {})
-        connections = data.get("connections", {})
-
-        # Extract nodes
-        nodes = network.get("nodes", {})
-        self.violations = nodes.get("violations", {})
-        self.laws = nodes.get("laws", {})
-        self.forms = nodes.get("forms", {})
-
-        print(f"   Loaded {len(self.violations)} violations")
-        print(f"   Loaded {len(self.laws)} laws")
-        print(f"   Loaded {len(self.forms)} forms")
-
-        # Build graph from connections
-        self._build_graph(connections, network.get("edges", {}))
-
-        print(f"✅ Graph built: {self.graph.number_of_nodes()} nodes, {self.graph.number_of_edges()} edges")
-
-    def _build_graph(self, connections: Dict[str, List], edges: Dict[str, List]):
-        """Build NetworkX graph from connections"""
-        print(f"\n🔨 Building graph structure...")
-
-        # Add all nodes with metadata
-        for node_id, node_data in self.violations.items():
-            # node_data already has 'type' and 'data' keys, use as-is
-            if isinstance(node_data, dict):
-                # Keep the structure but ensure type is set
-                node_attrs = {k: v for k, v in node_data.items() if k != "data"}
-                node_attrs["type"] = node_data.get("type", "violation")
-                self.graph.add_node(node_id, **node_attrs)
-            else:
-                self.graph.add_node(node_id, type="violation")
-            self.node_metadata[node_id] = {"type": "violation", "data": node_data}
-
-        for node_id, node_data in self.laws.items():
-            if isinstance(node_data, dict):
-                node_attrs = {k: v for k, v in node_data.items() if k != "data"}
-                node_attrs["type"] = node_data.get("type", "law")
-                self.graph.add_node(node_id, **node_attrs)
-            else:
-                self.graph.add_node(node_id, type="law")
-            self.node_metadata[node_id] = {"type": "law", "data": node_data}
-
-        for node_id, node_data in self.forms.items():
-            if isinstance(node_data, dict):
-                node_attrs = {k: v for k, v in node_data.items() if k != "data"}
-                node_attrs["type"] = node_data.get("type", "form")
-                self.graph.add_node(node_id, **node_attrs)
-            else:
-                self.graph.add_node(node_id, type="form")
-            self.node_metadata[node_id] = {"type": "form", "data": node_data}
-
-        # Add edges from connections (and add missing nodes)
-        edge_count = 0
-
-        # Violation-Law edges
-        for conn in connections.get("violation_law", []):
-            violation = conn.get("violation")
-            law = conn.get("law")
-            similarity = conn.get("similarity", 0.5)
-            if violation and law:
-                # Add nodes if they don't exist
-                if violation not in self.graph:
-                    self.graph.add_node(violation, type="violation")
-                if law not in self.graph:
-                    self.graph.add_node(law, type="law")
-
-                # Weight is inverse of similarity (lower = better path)
-                weight = 1.0 - similarity
-                self.graph.add_edge(violation, law,
-                                   weight=weight,
-                                   similarity=similarity,
-                                   connection_type="violation_law")
-                self.edge_weights[(violation, law)] = weight
-                edge_count += 1
-
-        # Violation-Form edges (direct)
-        for conn in connections.get("violation_form", []):
-            violation = conn.get("violation")
-            form = conn.get("form")
-            similarity = conn.get("similarity", 0.5)
-            if violation and form:
-                # Add nodes if they don't exist
-                if violation not in self.graph:
-                    self.graph.add_node(violation, type="violation")
-                if form not in self.graph:
-                    self.graph.add_node(form, type="form")
-
-                weight = 1.0 - similarity
-                self.graph.add_edge(violation, form,
-                                   weight=weight,
-                                   similarity=similarity,
-                                   connection_type="violation_form")
-                self.edge_weights[(violation, form)] = weight
-                edge_count += 1
-
-        # Law-Form edges
-        for conn in connections.get("law_form", []):
-            law = conn.get("law")
-            form = conn.get("form")
-            similarity = conn.get("similarity", 0.5)
-            if law and form:
-                # Add nodes if they don't exist
-                if law not in self.graph:
-                    self.graph.add_node(law, type="law")
-                if form not in self.graph:
-                    self.graph.add_node(form, type="form")
-
-                weight = 1.0 - similarity
-                self.graph.add_edge(law, form,
-                                   weight=weight,
-                                   similarity=similarity,
-                                   connection_type="law_form")
-                self.edge_weights[(law, form)] = weight
-                edge_count += 1
-
-        print(f"   Added {edge_count} weighted edges")
+        self.snapshot = load_graph_snapshot(analysis_file)
+        self._graph = None
+        counts = self.snapshot.meta["counts"]
+
+        print(f"   Loaded {counts['violations']} violations")
+        print(f"   Loaded {counts['laws']} laws")
+        print(f"   Loaded {counts['forms']} forms")
+        print(f"✅ Graph loaded: {self.snapshot.n_nodes} nodes, {self.snapshot.n_edges} edges")
 
     def find_shortest_paths_dijkstra(self, source: str, target: str) -> Optional[List[str]]:
         """Find shortest path using Dijkstra's algorithm"""
@@ -195,100 +79,73 @@ class GraphTheoryAnalyzer:
         """Find all paths from violations to forms using multiple algorithms"""
         print(f"\n🔍 Finding all violation-to-form paths (max length: {max_path_length})...")
 
-        violation_nodes = [n for n in self.graph.nodes() if self.graph.nodes[n].get("type") == "violation"]
-        form_nodes = [n for n in self.graph.nodes() if self.graph.nodes[n].get("type") == "form"]
+        snapshot = self.snapshot
+        sources = snapshot.nodes_of_type("violation")
+        form_ids = snapshot.nodes_of_type("form")
 
-        print(f"   Analyzing {len(violation_nodes)} violations → {len(form_nodes)} forms")
-        print(f"   Graph has {self.graph.number_of_edges()} edges")
+        print(f"   Analyzing {len(sources)} violations → {len(form_ids)} forms")
+        print(f"   Graph has {snapshot.n_edges} edges")
 
         # Debug: Check if we have any direct violation-form edges
-        direct_edges = sum(1 for u, v in self.graph.edges()
-                          if self.graph.nodes[u].get("type") == "violation"
-                          and self.graph.nodes[v].get("type") == "form")
+        is_violation = np.zeros(snapshot.n_nodes, dtype=bool)
+        is_violation[sources] = True
+        is_form = np.zeros(snapshot.n_nodes, dtype=bool)
+        is_form[form_ids] = True
+        direct_edges = int(np.count_nonzero(is_violation[snapshot.edge_sources()] & is_form[snapshot.indices]))
         print(f"   Direct violation-form edges: {direct_edges}")
 
         all_paths = defaultdict(list)
 
-        def find_paths_for_pair(violation, form):
-            """Find paths between a violation and form"""
-            paths = []
+        # One Dijkstra tree and one bounded DFS per violation, fanned out to every form
+        csr = CSRGraph(snapshot.node_ids, snapshot.to_csgraph())
+        neighbours, weights = csr.adjacency_lists()
 
-            # Skip if nodes don't exist
-            if violation not in self.graph or form not in self.graph:
-                return paths
+        for processed, (source, distances, predecessors) in enumerate(
+                shortest_path_trees(csr, sources), start=1):
+            violation = csr.nodes[source]
+            out_edges = snapshot.row_edges(source)
+            reachable = form_ids[np.isfinite(distances[form_ids]) & (form_ids != source)]
+            simple_paths = simple_paths_to_targets(neighbours, weights, source, is_form, max_path_length)
+
+            for target in reachable:
+                form = csr.nodes[target]
+                paths = []
+
+                # 1. Direct path (if exists)
+                edge = out_edges.get(int(target))
+                if edge is not None:
+                    paths.append({
+                        "path": [violation, form],
+                        "length": 1,
+                        "algorithm": "direct",
+                        "weight": float(snapshot.weights[edge]),
+                        "similarity": float(snapshot.similarity[edge])
+                    })
 
-            # 1. Direct path (if exists)
-            if self.graph.has_edge(violation, form):
-                edge_data = self.graph[violation][form]
+                # 2. Dijkstra shortest path
+                dijkstra_path = [csr.nodes[i] for i in tree_path(predecessors, source, int(target))]
                 paths.append({
-                    "path": [violation, form],
-                    "length": 1,
-                    "algorithm": "direct",
-                    "weight": edge_data.get("weight", 1.0),
-                    "similarity": edge_data.get("similarity", 0.0)
+                    "path": dijkstra_path,
+                    "length": len(dijkstra_path) - 1,
+                    "algorithm": "dijkstra",
+                    "weight": float(distances[target]),
+                    "hops": len(dijkstra_path) - 1
                 })
 
-            # 2. Dijkstra shortest path
-            try:
-                dijkstra_path = nx.shortest_path(self.graph, violation, form, weight='weight')
-                if len(dijkstra_path) > 1:
-                    path_weight = sum(self.graph[dijkstra_path[i]][dijkstra_path[i+1]].get("weight", 1.0)
-                                     for i in range(len(dijkstra_path)-1))
+                # 3. All simple paths (up to max_path_length)
+                for path, path_weight in simple_paths.get(int(target), []):
                     paths.append({
-                        "path": dijkstra_path,
-                        "length": len(dijkstra_path) - 1,
-                        "algorithm": "dijkstra",
+                        "path": [csr.nodes[i] for i in path],
+                        "length": len(path) - 1,
+                        "algorithm": "all_simple_paths",
                         "weight": path_weight,
-                        "hops": len(dijkstra_path) - 1
+                        "hops": len(path) - 1
                     })
-            except (nx.NetworkXNoPath, KeyError, nx.NodeNotFound):
-                pass
-
-            # 3. All simple paths (up to max_path_length)
-            try:
-                simple_paths = list(nx.all_simple_paths(self.graph, violation, form, cutoff=max_path_length))
-                for path in simple_paths:
-                    if len(path) > 1:
-                        path_weight = sum(self.graph[path[i]][path[i+1]].get("weight", 1.0)
-                                         for i in range(len(path)-1))
-                        paths.append({
-                            "path": path,
-                            "length": len(path) - 1,
-                            "algorithm": "all_simple_paths",
-                            "weight": path_weight,
-                            "hops": len(path) - 1
-                        })
-            except (nx.NetworkXNoPath, KeyError, nx.NodeNotFound):
-                pass
-
-            return paths
-
-        # Process in parallel batches
-        total_pairs = len(violation_nodes) * len(form_nodes)
-        processed = 0
-
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = {}
-            for violation in violation_nodes:
-                for form in form_nodes:
-                    future = executor.submit(find_paths_for_pair, violation, form)
-                    futures[future] = (violation, form)
-
-            for future in as_completed(futures):
-                try:
-                    violation_id, form_id = futures[future]
-                    paths = future.result()
-                    if paths:
-                        pair_key = f"{violation_id}→{form_id}"
-                        all_paths[pair_key].extend(paths)
-
-                    processed += 1
-                    if processed % 100 == 0:
-                        print(f"   Progress: {processed}/{total_pairs} pairs analyzed, {len(all_paths)} pairs with paths")
-                except Exception as e:
-                    print(f"   ⚠️  Error: {e}")
-                    import traceback
-                    traceback.print_exc()
+
+                all_paths[f"{violation}→{form}"].extend(paths)
+
+            if processed % 100 == 0:
+                print(f"   Progress: {processed}/{len(sources)} violations searched, {len(all_paths)} pairs with paths")
 
         print(f"✅ Found paths for {len(all_paths)} violation-form pairs")
         return dict(all_paths)
@@ -297,31 +154,18 @@ class GraphTheoryAnalyzer:
         """Analyze graph centrality metrics"""
         print(f"\n📊 Analyzing graph centrality...")
 
-        centrality = {}
-
-        # Degree centrality
-        degree_centrality = nx.degree_centrality(self.graph)
-        centrality["degree"] = dict(sorted(degree_centrality.items(),
-                                          key=lambda x: x[1], reverse=True)[:20])
-
-        # Betweenness centrality (parallel computation)
-        print("   Computing betweenness centrality (parallel)...")
-        betweenness_centrality = nx.betweenness_centrality(self.graph, weight='weight',
-                                                           k=min(100, self.graph.number_of_nodes()))
-        centrality["betweenness"] = dict(sorted(betweenness_centrality.items(),
-                                              key=lambda x: x[1], reverse=True)[:20])
-
-        # Closeness centrality
-        print("   Computing closeness centrality...")
-        closeness_centrality = nx.closeness_centrality(self.graph, distance='weight')
-        centrality["closeness"] = dict(sorted(closeness_centrality.items(),
-                                             key=lambda x: x[1], reverse=True)[:20])
+        # Sparse power iteration / blockwise csgraph on the snapshot; betweenness is sampled
+        print(f"   Betweenness from sampled sources (±{BETWEENNESS_EPSILON} target error, parallel)...")
+        nodes = self.snapshot.node_ids
+        values, timings = compute_centralities(
+            self.snapshot.to_csgraph(), measures=("degree", "betweenness", "closeness", "pagerank"),
+            directed=True, weighted=True, betweenness_epsilon=BETWEENNESS_EPSILON, seed=42
+        )
 
-        # PageRank
-        print("   Computing PageRank...")
-        pagerank = nx.pagerank(self.graph, weight='weight')
-        centrality["pagerank"] = dict(sorted(pagerank.items(),
-                                           key=lambda x: x[1], reverse=True)[:20])
+        centrality = {name: top_nodes(nodes, values[name]) for name in values}
+        centrality["timings"] = {name: round(seconds, 3) for name, seconds in timings.items()}
+        for name, seconds in timings.items():
+            print(f"   {name}: {seconds:.2f}s")
 
         print(f"✅ Centrality analysis complete")
         return centrality
@@ -431,11 +275,11 @@ class GraphTheoryAnalyzer:
         report = {
             "metadata": {
                 "generated": datetime.now().isoformat(),
-                "graph_nodes": self.graph.number_of_nodes(),
-                "graph_edges": self.graph.number_of_edges(),
-                "violations": len(self.violations),
-                "laws": len(self.laws),
-                "forms": len(self.forms)
+                "graph_nodes": self.snapshot.n_nodes,
+                "graph_edges": self.snapshot.n_edges,
+                "violations": self.snapshot.meta["counts"]["violations"],
+                "laws": self.snapshot.meta["counts"]["laws"],
+                "forms": self.snapshot.meta["counts"]["forms"]
             },
             "graph_statistics": {
                 "density": nx.density(self.graph),
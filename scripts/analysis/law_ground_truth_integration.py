@@ -19,32 +19,19 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from scripts.utils.paths import PROJECT_ROOT, DATA_PROCESSED_DIR, DATA_VECTORS_DIR, RESEARCH_DIR, DATA_RAW_DIR
-
-try:
-    from sentence_transformers import SentenceTransformer
-    import sklearn
-    from sklearn.metrics.pairwise import cosine_similarity
-    from sklearn.cluster import DBSCAN
-    from sklearn.decomposition import PCA
-except ImportError:
-    print("Installing required packages...")
-    import subprocess
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "--user",
-                          "sentence-transformers", "scikit-learn", "numpy"],
-                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    from sentence_transformers import SentenceTransformer
-    import sklearn
-    from sklearn.metrics.pairwise import cosine_similarity
-    from sklearn.cluster import DBSCAN
-    from sklearn.decomposition import PCA
+from scripts.utils.embedding_cache import CachedEncoder
+from scripts.utils.law_corpus import LawCorpus, load_law_corpus
+from scripts.analysis.utils.similarity_join import normalize_rows, topk_join
+from scripts.analysis.utils.neighbor_dbscan import dbscan_cosine
 
 
 class LawGroundTruthSystem:
     """System for integrating law references as ground truth with violations"""
 
     def __init__(self):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model = CachedEncoder('all-MiniLM-L6-v2')
         self.law_references = {}
+        self.law_corpus = LawCorpus()
         self.violations = {}
         self.lariat_embeddings = {}
         self.research_intersections = {}
@@ -56,6 +43,7 @@ class LawGroundTruthSystem:
         try:
             with open(law_file, 'r', encoding='utf-8') as f:
                 self.law_references = json.load(f)
+            self.law_corpus = load_law_corpus(law_file)
             print(f"✅ Loaded law references")
             return self.law_references
         except FileNotFoundError:
@@ -81,6 +69,7 @@ class LawGroundTruthSystem:
             json.dump(references, f, indent=2, ensure_ascii=False)
 
         self.law_references = references
+        self.law_corpus = load_law_corpus(law_file)
         return references
 
     def load_violations(self, violations_file: Path) -> Dict[str, Any]:
@@ -122,35 +111,26 @@ class LawGroundTruthSystem:
     def extract_law_embeddings(self) -> List[Dict[str, Any]]:
         """Extract all law embeddings from references (ground truth citations)"""
         law_vectors = []
+        for law in self.law_corpus.laws:
+            embedding = self.law_corpus.embedding(law)
+            if embedding is None:
+                continue
+            # This is a ground truth law reference
+            law_vectors.append({
+                "path": law["path"],
+                "text": law["embedding_text"],
+                "embedding": embedding.tolist(),
+                "name": law["name"],
+                "description": law["description"],
+                "url": law["url"],
+                "relevance": law["relevance"],
+                "key_sections": law["key_sections"],
+                "reporting_forms": law["fields"].get("reporting_forms", []),
+                "is_ground_truth": True,  # Mark as ground truth
+                "authoritative": True,
+                "full_citations": law["key_sections"]  # Full law citations
+            })
 
-        def extract_recursive(data: Any, path: str = ""):
-            if isinstance(data, dict):
-                if "embedding" in data and "embedding_text" in data:
-                    # This is a ground truth law reference
-                    law_vectors.append({
-                        "path": path,
-                        "text": data.get("embedding_text", ""),
-                        "embedding": data.get("embedding", []),
-                        "name": data.get("name", ""),
-                        "description": data.get("description", ""),
-                        "url": data.get("url", ""),
-                        "relevance": data.get("relevance", ""),
-                        "key_sections": data.get("key_sections", []),
-                        "reporting_forms": data.get("reporting_forms", []),
-                        "is_ground_truth": True,  # Mark as ground truth
-                        "authoritative": True,
-                        "full_citations": data.get("key_sections", [])  # Full law citations
-                    })
-                for key, value in data.items():
-                    if key not in ["embedding", "embedding_text"]:
-                        new_path = f"{path}.{key}" if path else key
-                        extract_recursive(value, new_path)
-            elif isinstance(data, list):
-                for i, item in enumerate(data):
-                    new_path = f"{path}[{i}]"
-                    extract_recursive(item, new_path)
-
-        extract_recursive(self.law_references)
         print(f"✅ Extracted {len(law_vectors)} ground truth law embeddings")
         return law_vectors
 
@@ -216,13 +196,17 @@ class LawGroundTruthSystem:
         print(f"   - Connections: {len(intersections.get('connections', []))}")
         return intersections
 
-    def match_violations_to_laws(self, threshold: float = 0.5) -> List[Dict[str, Any]]:
+    def match_violations_to_laws(self, threshold: float = 0.5, top_k: int = 3) -> List[Dict[str, Any]]:
         """Match violations to relevant laws using cosine similarity
-        Laws serve as ground truth - violations are matched against authoritative law citations"""
+        Laws serve as ground truth - violations are matched against authoritative law citations
+
+        Violation texts are encoded in one batch and scored against the stacked,
+        normalized law matrix with one matrix product per row block; the top_k
+        laws per violation are picked with argpartition (see similarity_join)."""
         print(f"Matching violations to ground truth laws (threshold: {threshold})...")
         print(f"   Using full law citations as authoritative reference...")
 
-        law_vectors = self.extract_law_embeddings()
+        law_vectors = [law for law in self.extract_law_embeddings() if law.get("embedding")]
         if not law_vectors:
             print("⚠️  No law vectors found")
             return []
@@ -238,12 +222,13 @@ class LawGroundTruthSystem:
                     "source": "lariat_embeddings"
                 })
 
-        # Also create embeddings for violations from extracted_violations.json
-        violations_data = self.violations.get("violations", {})
-        for category, items in violations_data.items():
-            for item in items:
-                violation_text = self._create_violation_text(item)
-                embedding = self.model.encode(violation_text, normalize_embeddings=True)
+        # Also create embeddings for violations from extracted_violations.json, in one batch
+        extracted = [(category, item) for category, items in self.violations.get("violations", {}).items()
+                     for item in items]
+        violation_texts = [self._create_violation_text(item) for _, item in extracted]
+        if violation_texts:
+            embeddings = self.model.encode(violation_texts, normalize_embeddings=True)
+            for (category, item), violation_text, embedding in zip(extracted, violation_texts, embeddings):
                 violation_vectors.append({
                     "id": f"violation_{category}_{item.get('entity_name', 'unknown')}",
                     "text": violation_text,
@@ -252,37 +237,28 @@ class LawGroundTruthSystem:
                     "source": "extracted_violations"
                 })
 
-        # Match violations to laws - find top 3 matches per violation
-        matches = []
-        for violation in violation_vectors:
-            if not violation.get("embedding"):
-                continue
-
-            violation_emb = np.array(violation["embedding"]).reshape(1, -1)
-            law_scores = []
-
-            for law in law_vectors:
-                if not law.get("embedding"):
-                    continue
-
-                law_emb = np.array(law["embedding"]).reshape(1, -1)
-                similarity = cosine_similarity(violation_emb, law_emb)[0][0]
-
-                law_scores.append({
-                    "law": law,
-                    "similarity": float(similarity)
-                })
+        violation_vectors = [violation for violation in violation_vectors if violation.get("embedding")]
+        if not violation_vectors:
+            print(f"✅ Matched 0 violations to laws")
+            self.matched_violations = []
+            return []
 
-            # Sort by similarity and take top matches above threshold
-            law_scores.sort(key=lambda x: x["similarity"], reverse=True)
-            for score_data in law_scores[:3]:  # Top 3 matches
-                if score_data["similarity"] >= threshold:
-                    matches.append({
-                        "violation": violation,
-                        "law": score_data["law"],
-                        "similarity": score_data["similarity"],
-                        "matched_at": datetime.now().isoformat()
-                    })
+        # Match violations to laws - top_k matches per violation above threshold, best first
+        law_matrix = normalize_rows(np.asarray([law["embedding"] for law in law_vectors], dtype=np.float32))
+        violation_matrix = normalize_rows(np.asarray([violation["embedding"] for violation in violation_vectors],
+                                                     dtype=np.float32))
+        edges = topk_join(violation_matrix, law_matrix, k=top_k, threshold=threshold, normalized=True)
+
+        matched_at = datetime.now().isoformat()
+        matches = [
+            {
+                "violation": violation_vectors[i],
+                "law": law_vectors[j],
+                "similarity": similarity,
+                "matched_at": matched_at
+            }
+            for i, j, similarity in zip(edges.rows.tolist(), edges.cols.tolist(), edges.scores.tolist())
+        ]
 
         self.matched_violations = matches
         print(f"✅ Matched {len(matches)} violations to laws")
@@ -340,9 +316,8 @@ class LawGroundTruthSystem:
 
         embeddings_array = np.array(embeddings)
 
-        # Apply DBSCAN
-        clustering = DBSCAN(eps=eps, min_samples=min_samples, metric='cosine')
-        cluster_labels = clustering.fit_predict(embeddings_array)
+        # Apply DBSCAN over a cached sparse cosine radius graph
+        cluster_labels = dbscan_cosine(embeddings_array, eps=eps, min_samples=min_samples)
 
         # Organize results
         clusters = defaultdict(list)
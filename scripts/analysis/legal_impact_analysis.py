@@ -17,6 +17,7 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from scripts.utils.paths import PROJECT_ROOT, DATA_PROCESSED_DIR
+from scripts.utils.law_corpus import LawCorpus, load_law_corpus
 
 print("🔍 Legal Impact Analysis - Analyzing Legal Consequences")
 
@@ -26,7 +27,7 @@ class LegalImpactAnalyzer:
 
     def __init__(self):
         self.violations = {}
-        self.laws = {}
+        self.law_corpus = LawCorpus()
         self.forms = {}
         self.legal_impacts = defaultdict(list)
         self.penalties = defaultdict(list)
@@ -47,8 +48,7 @@ class LegalImpactAnalyzer:
         # Load law references
         law_file = PROJECT_ROOT / "ref" / "law" / "jurisdiction_references.json"
         if law_file.exists():
-            with open(law_file, 'r', encoding='utf-8') as f:
-                self.laws = json.load(f)
+            self.law_corpus = load_law_corpus(law_file)
 
         # Load graph analysis for pathways
         graph_file = DATA_PROCESSED_DIR / "graph_theory_analysis.json"
@@ -59,51 +59,19 @@ class LegalImpactAnalyzer:
         print(f"   Loaded {len(self.violations)} violations with law matches")
         print(f"   Loaded law references")
 
-    def extract_legal_penalties(self, law_data: Dict[str, Any], path: str = "") -> List[Dict[str, Any]]:
-        """Extract penalty information from law data"""
-        penalties = []
-
-        if isinstance(law_data, dict):
-            # Check for penalty-related fields
-            description = law_data.get("description", "").lower()
-            relevance = law_data.get("relevance", "").lower()
-            name = law_data.get("name", "").lower()
-
-            # Look for penalty indicators
-            penalty_keywords = [
-                "fine", "penalty", "imprisonment", "misdemeanor", "felony",
-                "criminal", "civil penalty", "monetary", "sentence", "jail",
-                "prison", "restitution", "damages", "punitive", "sanction"
-            ]
-
-            text_to_search = f"{name} {description} {relevance}"
-
-            for keyword in penalty_keywords:
-                if keyword in text_to_search:
-                    # Extract context around keyword
-                    penalty_info = {
-                        "law": law_data.get("name", ""),
-                        "path": path,
-                        "keyword": keyword,
-                        "description": description[:200] if description else "",
-                        "url": law_data.get("url", ""),
-                        "key_sections": law_data.get("key_sections", [])
-                    }
-                    penalties.append(penalty_info)
-                    break
-
-            # Recursively search nested structures
-            for key, value in law_data.items():
-                if key not in ["embedding", "embedding_text", "ground_truth_embedding", "ground_truth_text"]:
-                    sub_path = f"{path}.{key}" if path else key
-                    penalties.extend(self.extract_legal_penalties(value, sub_path))
-
-        elif isinstance(law_data, list):
-            for i, item in enumerate(law_data):
-                sub_path = f"{path}[{i}]"
-                penalties.extend(self.extract_legal_penalties(item, sub_path))
-
-        return penalties
+    def extract_legal_penalties(self) -> List[Dict[str, Any]]:
+        """Penalty information from the compiled law corpus (first penalty keyword per law)"""
+        return [
+            {
+                "law": penalty["law_name"],
+                "path": penalty["path"],
+                "keyword": penalty["keyword"],
+                "description": penalty["description"],
+                "url": penalty["url"],
+                "key_sections": penalty["key_sections"]
+            }
+            for penalty in self.law_corpus.penalties
+        ]
 
     def categorize_penalties(self, penalties: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
         """Categorize penalties by type"""
@@ -197,41 +165,24 @@ class LegalImpactAnalyzer:
             "compliance_deadlines": []
         }
 
-        # Extract from law references
-        def extract_enforcement(data, path=""):
-            if isinstance(data, dict):
-                # Check for reporting forms
-                if "reporting_forms" in data:
-                    for form in data["reporting_forms"]:
-                        enforcement["reporting_forms"].append({
-                            "form_name": form.get("form_name", ""),
-                            "form_number": form.get("form_number", ""),
-                            "agency": form.get("agency", ""),
-                            "url": form.get("url", ""),
-                            "description": form.get("description", ""),
-                            "law": data.get("name", ""),
-                            "path": path
-                        })
-
-                # Extract agency information
-                if "agency" in data:
-                    enforcement["enforcement_agencies"].append({
-                        "agency": data["agency"],
-                        "law": data.get("name", ""),
-                        "path": path
-                    })
-
-                # Recursively process
-                for key, value in data.items():
-                    if key not in ["embedding", "embedding_text", "ground_truth_embedding", "ground_truth_text"]:
-                        sub_path = f"{path}.{key}" if path else key
-                        extract_enforcement(value, sub_path)
-
-            elif isinstance(data, list):
-                for i, item in enumerate(data):
-                    extract_enforcement(item, f"{path}[{i}]")
-
-        extract_enforcement(self.laws)
+        # Extract from the compiled law corpus
+        for form in self.law_corpus.forms:
+            enforcement["reporting_forms"].append({
+                "form_name": form["form_name"],
+                "form_number": form["form_number"],
+                "agency": form["agency"],
+                "url": form["url"],
+                "description": form["description"],
+                "law": form["law_name"],
+                "path": form["law_path"]
+            })
+
+        for mechanism in self.law_corpus.enforcement:
+            enforcement["enforcement_agencies"].append({
+                "agency": mechanism["agency"],
+                "law": mechanism["law_name"],
+                "path": mechanism["path"]
+            })
 
         print(f"   Reporting Forms: {len(enforcement['reporting_forms'])}")
         print(f"   Enforcement Agencies: {len(set(f['agency'] for f in enforcement['reporting_forms'] if f.get('agency')))}")
@@ -284,7 +235,7 @@ class LegalImpactAnalyzer:
         print("\n📊 Generating legal impact report...")
 
         # Extract penalties from laws
-        penalties = self.extract_legal_penalties(self.laws)
+        penalties = self.extract_legal_penalties()
         categorized_penalties = self.categorize_penalties(penalties)
 
         # Analyze severity
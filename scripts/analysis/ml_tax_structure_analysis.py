@@ -4,21 +4,28 @@ ML-based tax structure analysis with clustering, anomaly detection, and classifi
 """
 
 import json
+import os
 import sys
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
+import pandas as pd
 from collections import defaultdict
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from scripts.utils import backends
 from scripts.utils.paths import PROJECT_ROOT, DATA_PROCESSED_DIR, RESEARCH_DIR
-from scripts.analysis.utils.feature_engineering import extract_all_features
+from scripts.analysis.utils.feature_table import cached_feature_matrix
+from scripts.analysis.utils.event_series import (
+    violation_events, period_counts, detect_bursts, change_points, lag_features, parse_iso_dates
+)
+from scripts.analysis.utils.centrality import adjacency_from_networkx, compute_centralities
 from scripts.analysis.utils.ml_utils import (
-    normalize_features, find_optimal_clusters_kmeans, prepare_feature_matrix
+    normalize_features, find_optimal_clusters_kmeans
 )
 
 # Try importing ML libraries
@@ -54,27 +61,18 @@ except ImportError:
     NETWORKX_AVAILABLE = False
     print("Warning: networkx not available. Network analysis will be disabled.")
 
-try:
-    import umap
-    UMAP_AVAILABLE = True
-except ImportError:
-    UMAP_AVAILABLE = False
+# Heavy optional libraries are imported on first use (see scripts/utils/backends.py)
+UMAP_AVAILABLE = backends.available("umap")
+if not UMAP_AVAILABLE:
     print("Warning: umap-learn not available. UMAP visualization will be disabled.")
 
-try:
-    import shap
-    SHAP_AVAILABLE = True
-except ImportError:
-    SHAP_AVAILABLE = False
+SHAP_AVAILABLE = backends.available("shap")
+if not SHAP_AVAILABLE:
     print("Warning: shap not available. SHAP explainability will be disabled.")
 
 # Modern visualization libraries (preferred)
-try:
-    import plotly.graph_objects as go
-    import plotly.express as px
-    PLOTLY_AVAILABLE = True
-except ImportError:
-    PLOTLY_AVAILABLE = False
+PLOTLY_AVAILABLE = backends.available("plotly")
+if not PLOTLY_AVAILABLE:
     print("Info: Plotly not available. Using fallback visualization libraries.")
 
 try:
@@ -87,20 +85,26 @@ except ImportError:
     MATPLOTLIB_AVAILABLE = False
     print("Warning: matplotlib/seaborn not available. Visualizations will be disabled.")
 
+# Target additive error of the sampled (normalized) betweenness centrality
+BETWEENNESS_EPSILON = float(os.environ.get("BETWEENNESS_EPSILON", 0.05))
+
+
+# Inputs of load_data; their contents key the cached feature matrix
+ENRICHED_FILE = DATA_PROCESSED_DIR / "lariat_enriched.json"
+VIOLATIONS_FILE = DATA_PROCESSED_DIR / "extracted_violations.json"
+GRAPH_FILE = DATA_PROCESSED_DIR / "entity_relationships.json"
+INPUT_FILES = (ENRICHED_FILE, VIOLATIONS_FILE, GRAPH_FILE)
+
 
 def load_data() -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
     """Load enriched entities, violations, and relationship graph"""
-    enriched_file = DATA_PROCESSED_DIR / "lariat_enriched.json"
-    violations_file = DATA_PROCESSED_DIR / "extracted_violations.json"
-    graph_file = DATA_PROCESSED_DIR / "entity_relationships.json"
-
-    with open(enriched_file, 'r') as f:
+    with open(ENRICHED_FILE, 'r') as f:
         enriched_data = json.load(f)
 
-    with open(violations_file, 'r') as f:
+    with open(VIOLATIONS_FILE, 'r') as f:
         violations_data = json.load(f)
 
-    with open(graph_file, 'r') as f:
+    with open(GRAPH_FILE, 'r') as f:
         graph_data = json.load(f)
 
     return (
@@ -269,6 +273,7 @@ def classify_violation_likelihood(features: np.ndarray, labels: np.ndarray) -> D
     shap_values = {}
     if SHAP_AVAILABLE:
         try:
+            shap = backends.require("shap")
             explainer = shap.TreeExplainer(rf)
             shap_vals = explainer.shap_values(features)
             # For binary classification, use the positive class
@@ -343,12 +348,14 @@ def analyze_network(graph: Dict[str, Any]) -> Dict[str, Any]:
     if len(G.nodes()) == 0:
         return {'error': 'Empty graph'}
 
-    # Calculate centrality measures
+    # Calculate centrality measures (sparse power iteration; betweenness from sampled sources)
     try:
-        pagerank = nx.pagerank(G)
-        betweenness = nx.betweenness_centrality(G)
-        degree_centrality = nx.degree_centrality(G)
-    except:
+        nodes, adjacency = adjacency_from_networkx(G, weight='weight')
+        values, timings = compute_centralities(
+            adjacency, measures=("pagerank", "betweenness", "degree"), directed=False, weighted=False,
+            betweenness_epsilon=BETWEENNESS_EPSILON, seed=42
+        )
+    except Exception:
         return {'error': 'Could not calculate centrality'}
 
     # Community detection
@@ -360,9 +367,10 @@ def analyze_network(graph: Dict[str, Any]) -> Dict[str, Any]:
     return {
         'n_nodes': len(G.nodes()),
         'n_edges': len(G.edges()),
-        'pagerank': {str(k): float(v) for k, v in pagerank.items()},
-        'betweenness_centrality': {str(k): float(v) for k, v in betweenness.items()},
-        'degree_centrality': {str(k): float(v) for k, v in degree_centrality.items()},
+        'pagerank': {str(k): float(v) for k, v in zip(nodes, values['pagerank'])},
+        'betweenness_centrality': {str(k): float(v) for k, v in zip(nodes, values['betweenness'])},
+        'degree_centrality': {str(k): float(v) for k, v in zip(nodes, values['degree'])},
+        'centrality_timings': {name: round(seconds, 3) for name, seconds in timings.items()},
         'communities': [list(c) for c in communities],
         'n_communities': len(communities)
     }
@@ -390,6 +398,7 @@ def perform_umap(features: np.ndarray, n_components: int = 2) -> Dict[str, Any]:
     if not UMAP_AVAILABLE or len(features) == 0:
         return {'error': 'umap not available or no features'}
 
+    umap = backends.require("umap")
     reducer = umap.UMAP(n_components=n_components, random_state=42)
     embedding = reducer.fit_transform(features)
 
@@ -401,132 +410,113 @@ def perform_umap(features: np.ndarray, n_components: int = 2) -> Dict[str, Any]:
 def analyze_time_series_violations(entities: List[Dict[str, Any]],
                                    violations: Dict[str, List]) -> Dict[str, Any]:
     """Analyze violation patterns over time"""
-    from datetime import datetime, timedelta
-    from collections import defaultdict
-
-    # Extract violation dates
-    violation_dates = []
-    violation_by_month = defaultdict(int)
-    violation_by_year = defaultdict(int)
-
-    for violation_type, violation_list in violations.items():
-        for violation in violation_list:
-            date_str = violation.get('filing_date') or violation.get('effective_date')
-            if date_str:
-                try:
-                    if isinstance(date_str, str):
-                        violation_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                    else:
-                        continue
-                    violation_dates.append(violation_date)
-
-                    # Group by month and year
-                    month_key = violation_date.strftime('%Y-%m')
-                    year_key = violation_date.year
-                    violation_by_month[month_key] += 1
-                    violation_by_year[year_key] += 1
-                except Exception as e:
-                    continue
-
-    # Calculate trends
+    events = violation_events(violations)
+
+    # Calculate trends (years and months that have violations)
+    yearly = events.groupby(events.index.year).size()
+    monthly = period_counts(events, "MS")
+    active_months = monthly[monthly > 0]
+
     trends = {}
-    if len(violation_by_year) > 1:
-        years = sorted(violation_by_year.keys())
-        counts = [violation_by_year[y] for y in years]
+    if len(yearly) > 1:
+        years = [int(y) for y in yearly.index]
+        counts = [int(c) for c in yearly]
 
         # Simple linear trend
-        if len(counts) > 1:
-            trend_slope = (counts[-1] - counts[0]) / len(counts) if len(counts) > 1 else 0
-            trends['yearly_trend'] = {
-                'slope': float(trend_slope),
-                'direction': 'increasing' if trend_slope > 0 else 'decreasing' if trend_slope < 0 else 'stable',
-                'years': years,
-                'counts': counts
-            }
+        trend_slope = (counts[-1] - counts[0]) / len(counts)
+        trends['yearly_trend'] = {
+            'slope': float(trend_slope),
+            'direction': 'increasing' if trend_slope > 0 else 'decreasing' if trend_slope < 0 else 'stable',
+            'years': years,
+            'counts': counts
+        }
 
     # Seasonal patterns (by month)
     monthly_patterns = {}
-    if violation_by_month:
-        months = sorted(violation_by_month.keys())
-        month_counts = [violation_by_month[m] for m in months]
-
-        # Extract month numbers for seasonal analysis
-        month_numbers = [int(m.split('-')[1]) for m in months]
+    if len(active_months):
         monthly_patterns = {
-            'months': months,
-            'counts': month_counts,
-            'month_numbers': month_numbers
+            'months': active_months.index.strftime('%Y-%m').tolist(),
+            'counts': [int(c) for c in active_months],
+            'month_numbers': [int(m) for m in active_months.index.month]
         }
 
+    # Bursts and level shifts on the zero-filled monthly series
+    bursts = detect_bursts(monthly)
+    shifts = change_points(monthly)
+
+    # Per-entity violation cadence
+    lags = lag_features(events)
+
     # Entity lifecycle analysis
-    lifecycle_stages = defaultdict(int)
+    lifecycle_stages = {}
     lifecycle_transitions = []
+    if entities:
+        now = datetime.now()
+        filing_dates = parse_iso_dates([entity.get('original_filing_date') for entity in entities])
+        dated = filing_dates.notna().to_numpy()
+        days_existed = ((np.datetime64(now, 'us') - filing_dates) // pd.Timedelta(days=1)).to_numpy()
+        status = pd.Series([str(entity.get('status') or '').lower() for entity in entities])
+
+        # Determine lifecycle stage
+        stage = np.select(
+            [status.str.contains('forfeited', regex=False).to_numpy(), days_existed < 365, days_existed < 1825],
+            ['forfeited', 'new', 'established'],
+            'mature'
+        )
+        lifecycle_stages = {
+            str(name): int(count) for name, count in pd.Series(stage[dated]).value_counts(sort=False).items()
+        }
 
-    for entity in entities:
-        filing_date_str = entity.get('original_filing_date')
-        status = entity.get('status', '').lower()
-
-        if filing_date_str:
-            try:
-                filing_date = datetime.fromisoformat(filing_date_str)
-                current_date = datetime.now()
-                days_existed = (current_date - filing_date).days
-
-                # Determine lifecycle stage
-                if 'forfeited' in status:
-                    lifecycle_stages['forfeited'] += 1
-                elif days_existed < 365:
-                    lifecycle_stages['new'] += 1
-                elif days_existed < 1825:  # 5 years
-                    lifecycle_stages['established'] += 1
-                else:
-                    lifecycle_stages['mature'] += 1
-
-                # Check for forfeiture -> reinstatement pattern
-                filing_history = entity.get('filing_history', [])
-                has_forfeiture = any('Tax Forfeiture' in str(f) for f in filing_history)
-                has_reinstatement = any('Reinstatement' in str(f) for f in filing_history)
-
-                if has_forfeiture and has_reinstatement:
-                    lifecycle_transitions.append({
-                        'entity_id': entity.get('filing_number'),
-                        'pattern': 'forfeiture_reinstatement'
-                    })
-            except:
-                pass
+        # Check for forfeiture -> reinstatement pattern
+        for entity, has_date in zip(entities, dated):
+            filing_history = [str(f) for f in entity.get('filing_history') or []] if has_date else []
+            if (any('Tax Forfeiture' in f for f in filing_history)
+                    and any('Reinstatement' in f for f in filing_history)):
+                lifecycle_transitions.append({
+                    'entity_id': entity.get('filing_number'),
+                    'pattern': 'forfeiture_reinstatement'
+                })
 
     # Predict future violations (simple trend-based)
     predictions = {}
     if trends.get('yearly_trend'):
         trend_data = trends['yearly_trend']
-        if len(trend_data['years']) > 0:
-            last_year = trend_data['years'][-1]
-            last_count = trend_data['counts'][-1]
-            slope = trend_data['slope']
-
-            # Predict next year
-            next_year = last_year + 1
-            predicted_count = max(0, int(last_count + slope))
-
-            predictions['next_year'] = {
-                'year': next_year,
-                'predicted_violations': predicted_count,
-                'confidence': 'low'  # Simple trend, low confidence
-            }
+        last_year = trend_data['years'][-1]
+        last_count = trend_data['counts'][-1]
+        slope = trend_data['slope']
+
+        # Predict next year
+        predictions['next_year'] = {
+            'year': last_year + 1,
+            'predicted_violations': max(0, int(last_count + slope)),
+            'confidence': 'low'  # Simple trend, low confidence
+        }
 
     return {
         'violation_trends': trends,
         'seasonal_patterns': monthly_patterns,
+        'bursts': [
+            {'month': month.strftime('%Y-%m'), 'count': int(row['count']),
+             'expected': float(row['expected']), 'score': float(row['score'])}
+            for month, row in bursts.iterrows()
+        ],
+        'change_points': [month.strftime('%Y-%m') for month in shifts],
+        'entity_activity': {
+            'entities': len(lags),
+            'repeat_violators': int((lags['events'] > 1).sum()),
+            'median_gap_days': float(lags['mean_gap_days'].median()) if lags['mean_gap_days'].notna().any() else None,
+            'recently_active': int((lags['recent_events'] > 0).sum()),
+        },
         'lifecycle_analysis': {
-            'stages': dict(lifecycle_stages),
+            'stages': lifecycle_stages,
             'transitions': lifecycle_transitions,
             'forfeiture_reinstatement_count': len(lifecycle_transitions)
         },
         'predictions': predictions,
         'summary': {
-            'total_violations_over_time': len(violation_dates),
-            'violation_months': len(violation_by_month),
-            'violation_years': len(violation_by_year),
+            'total_violations_over_time': len(events),
+            'violation_months': len(active_months),
+            'violation_years': len(yearly),
             'entities_in_lifecycle': sum(lifecycle_stages.values())
         }
     }
@@ -786,16 +776,16 @@ def main():
 
     # Extract features
     print("\n2. Extracting features...")
-    feature_matrix, entity_ids = prepare_feature_matrix(
-        entities,
-        lambda e: extract_all_features(e, relationship_graph, violations)
+    feature_matrix, entity_ids, cache_hit = cached_feature_matrix(
+        entities, relationship_graph, violations, INPUT_FILES
     )
 
     if len(feature_matrix) == 0:
         print("Error: No features extracted")
         return
 
-    print(f"   Extracted {feature_matrix.shape[1]} features for {len(feature_matrix)} entities")
+    source = "from cache" if cache_hit else "extracted"
+    print(f"   {feature_matrix.shape[1]} features for {len(feature_matrix)} entities ({source})")
 
     # Normalize features
     print("\n3. Normalizing features...")
@@ -16,6 +16,9 @@ import numpy as np
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from scripts.utils.vector_store import open_store
+from scripts.utils.embedding_cache import CachedEncoder
+
 try:
     from sentence_transformers import SentenceTransformer
 except ImportError:
@@ -93,7 +96,7 @@ def parse_lariat_file(file_path: Path) -> Dict[str, Any]:
 
         elif current_entity:
             # Parse entity type (may be on same line as Filing Number)
-            elif 'Entity Type:' in line:
+            if 'Entity Type:' in line:
                 match = re.search(r'Entity Type:\s+([^\t\n]+)', line)
                 if match:
                     current_entity['entity_type'] = match.group(1).strip()
@@ -419,7 +422,7 @@ def create_text_representations(data: Dict[str, Any]) -> List[Dict[str, Any]]:
 def generate_embeddings(texts: List[str]) -> np.ndarray:
     """Generate embeddings for texts"""
     print("Loading embedding model...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+    model = CachedEncoder('all-MiniLM-L6-v2')
 
     print(f"Generating embeddings for {len(texts)} texts...")
     embeddings = model.encode(texts, normalize_embeddings=True, show_progress_bar=True)
@@ -489,6 +492,12 @@ def main():
     embeddings_output = PROJECT_ROOT / "data" / "vectors" / "lariat_tx_embeddings.json"
     embeddings_output.parent.mkdir(parents=True, exist_ok=True)
 
+    # Binary copy of the matrix so consumers can mmap it instead of parsing JSON
+    vector_ids = [f"lariat_tx_{t['filing_number']}" for t in texts]
+    vector_store = open_store(embeddings_output.parent / "lariat_tx", dimension=embeddings.shape[1])
+    vector_offsets = vector_store.add_many(vector_ids, embeddings)
+    vector_store.flush()
+
     embeddings_data = {
         'metadata': {
             'source': 'lariat.txt',
@@ -496,13 +505,15 @@ def main():
             'model': 'all-MiniLM-L6-v2',
             'dimension': embeddings.shape[1] if len(embeddings.shape) > 1 else len(embeddings),
             'count': len(embeddings),
-            'created': datetime.now().isoformat()
+            'created': datetime.now().isoformat(),
+            'vector_store': str(vector_store.root.relative_to(PROJECT_ROOT))
         },
         'vectors': [
             {
-                'id': f"lariat_tx_{texts[i]['filing_number']}",
+                'id': vector_ids[i],
                 'text': texts[i]['text'],
                 'embedding': embeddings[i].tolist(),
+                'embedding_offset': vector_offsets[i],
                 'metadata': {
                     'filing_number': texts[i]['filing_number'],
                     'entity_name': texts[i]['entity_name'],
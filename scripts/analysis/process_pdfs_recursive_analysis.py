@@ -46,6 +46,9 @@ print(f"ARM M4 MAX optimization: Using {PARALLEL_WORKERS} workers out of {CPU_CO
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from scripts.utils.vector_store import VectorStore, open_store
+from scripts.utils.embedding_cache import CachedEncoder
+
 try:
     from sentence_transformers import SentenceTransformer
 except ImportError:
@@ -317,32 +320,59 @@ def generate_embeddings_batch(texts: List[str], model: SentenceTransformer) -> L
     return result
 
 def save_json_with_embedding(data: Dict[str, Any], file_path: Path, model: SentenceTransformer,
-                            text_representation: Optional[str] = None):
-    """Save JSON file and generate embedding"""
+                            text_representation: Optional[str] = None,
+                            vector_store: Optional[VectorStore] = None,
+                            pending: Optional[List[Tuple[Path, Dict[str, Any]]]] = None):
+    """Save JSON file and generate embedding
+
+    When a vector store is given the embedding is appended to it and the JSON
+    only carries an `embedding_ref` pointer instead of the inline float list.
+    A JSON with a pointer must not be written before the store is flushed:
+    with `pending` it is queued there as (path, output) for the caller to
+    write after its own flush, otherwise the store is flushed here first.
+    """
     file_path.parent.mkdir(parents=True, exist_ok=True)
 
     if text_representation is None:
         text_representation = create_text_representation(data)
 
     embedding = generate_embedding(text_representation, model)
+    embedding_ref = None
+    if vector_store is not None and embedding is not None:
+        try:
+            key = str(file_path.relative_to(PROJECT_ROOT))
+        except ValueError:
+            key = str(file_path)
+        vector_store.add(key, embedding)
+        embedding_ref = vector_store.ref(key)
+        embedding = None
 
     output = {
         'metadata': {
             'source': 'pdf_analysis',
             'created': datetime.now().isoformat(),
             'file_path': str(file_path),
-            'has_embedding': embedding is not None
+            'has_embedding': embedding is not None or embedding_ref is not None
         },
         'data': data,
         'text_representation': text_representation,
         'embedding': embedding
     }
+    if embedding_ref is not None:
+        output['embedding_ref'] = embedding_ref
+        if pending is not None:
+            pending.append((file_path, output))
+            return output
+        vector_store.flush()
+
+    write_json(file_path, output)
+    return output
 
+def write_json(file_path: Path, output: Dict[str, Any]):
+    """Write a JSON record as save_json_with_embedding lays it out"""
     with open(file_path, 'w', encoding='utf-8') as f:
         json.dump(output, f, indent=2, ensure_ascii=False)
 
-    return output
-
 # Global model variable for thread-safe access
 import threading
 _model_lock = threading.Lock()
@@ -354,11 +384,15 @@ def get_model():
     if _shared_model is None:
         with _model_lock:
             if _shared_model is None:
-                _shared_model = SentenceTransformer('all-MiniLM-L6-v2')
+                _shared_model = CachedEncoder('all-MiniLM-L6-v2')
     return _shared_model
 
 def process_page_worker(args: Tuple) -> Dict[str, Any]:
-    """Worker function for processing a single page in parallel"""
+    """Worker function for processing a single page in parallel
+
+    JSONs pointing into the vector store are not written here; they are
+    returned under 'pending_writes' for process_pdf to write after its flush.
+    """
     page_data, pdf_name, base_dir_str, page_num = args
 
     # Convert string paths back to Path objects
@@ -367,8 +401,9 @@ def process_page_worker(args: Tuple) -> Dict[str, Any]:
     # Ensure page_num is an integer for proper padding
     page_num = int(page_num) if not isinstance(page_num, int) else page_num
 
-    # Get shared model (thread-safe)
+    # Get shared model and vector store (thread-safe)
     model = get_model()
+    vector_store = open_store(base_dir / 'vectors')
 
     # Analyze for abnormal patterns
     anomalies = analyze_abnormal_patterns(page_data['text'], page_num, pdf_name)
@@ -383,21 +418,24 @@ def process_page_worker(args: Tuple) -> Dict[str, Any]:
         'word_count': page_data['word_count'],
         'anomalies': anomalies
     }
-    save_json_with_embedding(page_output, page_file, model)
+    pending_writes = []
+    save_json_with_embedding(page_output, page_file, model, vector_store=vector_store, pending=pending_writes)
 
     result = {
         'page_number': page_num,
         'file': str(page_file.relative_to(PROJECT_ROOT)),
         'anomalies_count': sum(len(v) if isinstance(v, list) else 1 for v in anomalies.values() if v),
         'has_anomalies': any(anomalies.values()),
-        'anomalies': anomalies if any(anomalies.values()) else None
+        'anomalies': anomalies if any(anomalies.values()) else None,
+        'pending_writes': pending_writes
     }
 
     # Save anomalies separately if found (with zero-padded page number)
     if result['has_anomalies']:
         anomalies_dir = base_dir / pdf_name / 'anomalies'
         anomalies_file = anomalies_dir / f"anomalies_page_{page_num:04d}.json"
-        save_json_with_embedding(anomalies, anomalies_file, model)
+        save_json_with_embedding(anomalies, anomalies_file, model, vector_store=vector_store,
+                                 pending=pending_writes)
         result['anomalies_file'] = str(anomalies_file.relative_to(PROJECT_ROOT))
 
     return result
@@ -430,6 +468,12 @@ def process_pdf(pdf_path: Path, base_dir: Path, model: SentenceTransformer, inde
     with ThreadPoolExecutor(max_workers=PARALLEL_WORKERS) as executor:
         results = list(executor.map(process_page_worker, page_args))
 
+    # Publish this PDF's vectors once, then write the JSONs that point at them
+    open_store(base_dir / 'vectors').flush()
+    for result in results:
+        for file_path, output in result.pop('pending_writes'):
+            write_json(file_path, output)
+
     # Collect results
     for result in results:
         pdf_index['pages'].append({
@@ -482,7 +526,7 @@ def main():
 
     # Initialize embedding model
     print("\n1. Loading embedding model...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+    model = CachedEncoder('all-MiniLM-L6-v2')
     print(f"   ✓ Model loaded (dimension: {model.get_sentence_embedding_dimension()})")
 
     # Define source files
@@ -495,12 +539,16 @@ def main():
     base_dir = PROJECT_ROOT / "research" / "texas" / "pdf_analysis"
     base_dir.mkdir(parents=True, exist_ok=True)
 
+    # Shared binary vector store for all page and anomaly embeddings
+    vector_store = open_store(base_dir / 'vectors', dimension=model.get_sentence_embedding_dimension())
+
     # Initialize index
     index = {
         'metadata': {
             'created': datetime.now().isoformat(),
             'embedding_model': 'all-MiniLM-L6-v2',
-            'embedding_dimension': model.get_sentence_embedding_dimension()
+            'embedding_dimension': model.get_sentence_embedding_dimension(),
+            'vector_store': str((base_dir / 'vectors').relative_to(PROJECT_ROOT))
         },
         'pdfs': [],
         'lariat_txt': None
@@ -534,6 +582,8 @@ def main():
     else:
         print(f"   Warning: {lariat_txt} not found")
 
+    vector_store.flush()
+
     # Save master index
     index_file = base_dir / "master_index.json"
     print(f"\n3. Saving master index to {index_file}")
@@ -548,6 +598,7 @@ def main():
     print(f"PDFs processed: {len(index['pdfs'])}")
     if index['lariat_txt']:
         print(f"Lariat.txt entities: {index['lariat_txt'].get('total_entities', 0)}")
+    print(f"Vectors stored: {len(vector_store)}")
     print(f"\nBase directory: {base_dir}")
     print(f"Index file: {index_file}")
     print("\n" + "=" * 70)
@@ -15,6 +15,8 @@ import numpy as np
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from scripts.utils.embedding_cache import CachedEncoder
+
 try:
     from sentence_transformers import SentenceTransformer
 except ImportError:
@@ -231,7 +233,7 @@ def main():
 
     # Initialize embedding model
     print("\n2. Loading embedding model...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+    model = CachedEncoder('all-MiniLM-L6-v2')
     print(f"   ✓ Model loaded (dimension: {model.get_sentence_embedding_dimension()})")
 
     # Create base directory
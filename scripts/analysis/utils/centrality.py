@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Sparse-matrix and sampled centrality measures
+
+All measures take a `scipy.sparse` adjacency matrix (entry (u, v) is the
+weight of edge u -> v; undirected graphs are passed as symmetric matrices)
+and return one float64 value per row, matching the NetworkX functions named
+below:
+
+    pagerank                power iteration on the row-normalized matrix (nx.pagerank)
+    eigenvector_centrality  power iteration with A + I, left eigenvector (nx.eigenvector_centrality)
+    closeness_centrality    blockwise csgraph shortest paths to each node (nx.closeness_centrality)
+    betweenness_centrality  Brandes over k sampled sources (nx.betweenness_centrality)
+    degree_centrality       (in + out degree) / (n - 1) (nx.degree_centrality)
+
+Betweenness picks k from an error target: with k sources sampled uniformly,
+every node's normalized estimate is within `epsilon` of the exact value with
+probability 1 - `delta` once k >= ln(2n / delta) / (2 epsilon^2) (Hoeffding
+plus a union bound over the nodes). For each source, shortest-path distances
+come from `scipy.sparse.csgraph`; path counts and dependencies are then
+accumulated over the edges of its shortest-path DAG in one forward and one
+backward sweep, a distance level at a time (or, for DAGs with many levels,
+as two sparse triangular solves in level order). The sources are split
+across worker processes.
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components, shortest_path
+from scipy.sparse.linalg import spsolve_triangular
+
+# Bound on the float64 distance block computed per csgraph call (64 MB)
+BLOCK_ELEMENTS = 1 << 23
+# Sampled sources x edges below which betweenness stays in-process
+PARALLEL_MIN_WORK = 5_000_000
+# Shortest-path DAGs deeper than this use triangular solves instead of per-level steps
+DEEP_DAG_LEVELS = 64
+MEASURES = ("degree", "pagerank", "eigenvector", "closeness", "betweenness")
+
+
+class PowerIterationFailedConvergence(RuntimeError):
+    """Power iteration did not reach the tolerance within max_iter iterations"""
+
+
+def adjacency_from_networkx(graph, weight: Optional[str] = "weight") -> Tuple[List, sparse.csr_matrix]:
+    """(node list, CSR adjacency) of a NetworkX graph; weight=None gives 1 per edge"""
+    import networkx as nx
+    nodes = list(graph)
+    matrix = nx.to_scipy_sparse_array(graph, nodelist=nodes, weight=weight, dtype=float, format="csr")
+    return nodes, sparse.csr_matrix(matrix)
+
+
+def _n_nodes(matrix: sparse.spmatrix) -> int:
+    return matrix.shape[0]
+
+
+def pagerank(matrix: sparse.spmatrix, alpha: float = 0.85, tol: float = 1e-6, max_iter: int = 100,
+             personalization: Optional[np.ndarray] = None) -> np.ndarray:
+    """PageRank by power iteration; dangling nodes redistribute by `personalization`"""
+    n = _n_nodes(matrix)
+    if n == 0:
+        return np.zeros(0)
+    A = sparse.csr_matrix(matrix, dtype=np.float64)
+    out_weight = np.asarray(A.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    scale = np.zeros(n)
+    scale[~dangling] = 1.0 / out_weight[~dangling]
+    A = sparse.diags(scale) @ A
+    # x @ A as A^T x on a CSR copy of the transpose
+    A_T = A.T.tocsr()
+
+    if personalization is None:
+        p = np.full(n, 1.0 / n)
+    else:
+        p = np.asarray(personalization, dtype=np.float64)
+        if p.sum() == 0:
+            raise ZeroDivisionError("personalization vector sums to zero")
+        p = p / p.sum()
+
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        x_last = x
+        x = alpha * (A_T @ x_last + x_last[dangling].sum() * p) + (1 - alpha) * p
+        if np.abs(x - x_last).sum() < n * tol:
+            return x
+    raise PowerIterationFailedConvergence(f"PageRank did not converge in {max_iter} iterations")
+
+
+def eigenvector_centrality(matrix: sparse.spmatrix, tol: float = 1e-6, max_iter: int = 100) -> np.ndarray:
+    """Left principal eigenvector of A by power iteration on A + I (L2-normalized)"""
+    n = _n_nodes(matrix)
+    if n == 0:
+        return np.zeros(0)
+    A_T = sparse.csr_matrix(matrix, dtype=np.float64).T.tocsr()
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        x_last = x
+        x = x_last + A_T @ x_last
+        norm = np.linalg.norm(x) or 1.0
+        x = x / norm
+        if np.abs(x - x_last).sum() < n * tol:
+            return x
+    raise PowerIterationFailedConvergence(f"Eigenvector centrality did not converge in {max_iter} iterations")
+
+
+def degree_centrality(matrix: sparse.spmatrix, directed: bool = True) -> np.ndarray:
+    """Degree / (n - 1); directed graphs count in- plus out-edges, self-loops count twice"""
+    n = _n_nodes(matrix)
+    if n <= 1:
+        return np.ones(n)
+    A = sparse.csr_matrix(matrix)
+    out_degree = np.diff(A.indptr)
+    if directed:
+        degree = out_degree + np.bincount(A.indices, minlength=n)
+    else:
+        degree = out_degree + (A.diagonal() != 0)
+    return degree / (n - 1)
+
+
+def closeness_centrality(matrix: sparse.spmatrix, weighted: bool = True, wf_improved: bool = True,
+                         block_rows: Optional[int] = None) -> np.ndarray:
+    """Closeness from incoming distances, computed a block of targets at a time"""
+    n = _n_nodes(matrix)
+    closeness = np.zeros(n)
+    if n == 0:
+        return closeness
+    reverse = sparse.csr_matrix(matrix, dtype=np.float64).T.tocsr()
+    step = block_rows or max(1, BLOCK_ELEMENTS // n)
+    for start in range(0, n, step):
+        rows = np.arange(start, min(n, start + step))
+        distances = shortest_path(reverse, method="D", directed=True, unweighted=not weighted, indices=rows)
+        reachable = np.isfinite(distances)
+        total = np.where(reachable, distances, 0.0).sum(axis=1)
+        count = reachable.sum(axis=1) - 1
+        block = np.zeros(len(rows))
+        ok = (total > 0) & (n > 1)
+        block[ok] = count[ok] / total[ok]
+        if wf_improved and n > 1:
+            block *= count / (n - 1)
+        closeness[rows] = block
+    return closeness
+
+
+def betweenness_sample_size(n: int, epsilon: float, delta: float = 0.1) -> int:
+    """Sources needed for +/- epsilon normalized betweenness with probability 1 - delta"""
+    if n <= 2:
+        return n
+    return min(n, math.ceil(math.log(2 * n / delta) / (2 * epsilon ** 2)))
+
+
+# Per-process edge list for betweenness workers (set once by the pool initializer)
+_EDGES: Optional[Tuple[sparse.csr_matrix, np.ndarray, np.ndarray, np.ndarray, bool]] = None
+
+
+def _init_edges(matrix: sparse.csr_matrix, weighted: bool) -> None:
+    global _EDGES
+    coo = matrix.tocoo()
+    keep = coo.row != coo.col  # Self-loops never lie on a shortest path
+    _EDGES = (matrix, coo.row[keep].astype(np.int64), coo.col[keep].astype(np.int64),
+              coo.data[keep].astype(np.float64) if weighted else np.ones(int(keep.sum())), weighted)
+
+
+def _dependencies(sources: Sequence[int]) -> np.ndarray:
+    """Sum of Brandes dependencies delta_s(v) over the given sources"""
+    matrix, edge_src, edge_dst, edge_w, weighted = _EDGES
+    n = matrix.shape[0]
+    zero_weights = bool((edge_w == 0).any())
+    total = np.zeros(n)
+    step = max(1, BLOCK_ELEMENTS // max(1, n))
+    for start in range(0, len(sources), step):
+        block = np.asarray(sources[start:start + step])
+        distances = shortest_path(matrix, method="D", directed=True, unweighted=not weighted, indices=block)
+        for row, source in enumerate(block):
+            dist = distances[row]
+            reached = np.isfinite(dist[edge_src])
+            # Edges of the shortest-path DAG rooted at `source`
+            tight = reached & (dist[edge_src] + edge_w == dist[edge_dst])
+            src, dst = edge_src[tight], edge_dst[tight]
+            if len(src) == 0:
+                continue
+            if weighted:
+                src, dst = _break_zero_weight_cycles(src, dst, edge_w[tight], n)
+
+            # One topological sweep each way over the DAG
+            level = _dag_levels(dist, src, dst, weighted and zero_weights)
+            if level.max() > DEEP_DAG_LEVELS:
+                delta = _dag_dependencies_triangular(source, dist, level, src, dst)
+            else:
+                delta = _dag_dependencies_by_level(source, level, src, dst)
+            delta[source] = 0.0
+            total += delta
+    return total
+
+
+def _dag_levels(dist: np.ndarray, src: np.ndarray, dst: np.ndarray, zero_weights: bool) -> np.ndarray:
+    """Integer level per node such that every DAG edge goes to a strictly higher level
+
+    Distance orders the DAG unless zero-weight edges join nodes at equal
+    distance; those are ordered by their depth along zero-weight chains.
+    """
+    finite = np.isfinite(dist)
+    depth = np.zeros(len(dist))
+    if zero_weights:
+        flat = dist[src] == dist[dst]
+        flat_src, flat_dst = src[flat], dst[flat]
+        for _ in range(len(dist)):
+            updated = depth.copy()
+            np.maximum.at(updated, flat_dst, depth[flat_src] + 1)
+            if np.array_equal(updated, depth):
+                break
+            depth = updated
+    order = np.lexsort((depth, np.where(finite, dist, np.inf)))
+    ordered_dist, ordered_depth = dist[order], depth[order]
+    boundary = np.r_[True, (ordered_dist[1:] != ordered_dist[:-1]) | (ordered_depth[1:] != ordered_depth[:-1])]
+    level = np.empty(len(dist), dtype=np.int64)
+    level[order] = np.cumsum(boundary)
+    return level
+
+
+def _dag_dependencies_by_level(source: int, level: np.ndarray, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Path counts forward and dependencies backward, one vectorized step per level"""
+    n = len(level)
+    forward, forward_starts = _group_edges(level[dst])
+    sigma = np.zeros(n)
+    sigma[source] = 1.0
+    for group in np.split(forward, forward_starts):
+        np.add.at(sigma, dst[group], sigma[src[group]])
+
+    # Dependencies: delta_v = sum over DAG children w of sigma_v / sigma_w (1 + delta_w)
+    backward, backward_starts = _group_edges(-level[src])
+    inverse_sigma = np.divide(1.0, sigma, out=np.zeros(n), where=sigma > 0)
+    delta = np.zeros(n)
+    for group in np.split(backward, backward_starts):
+        parents, children = src[group], dst[group]
+        np.add.at(delta, parents, sigma[parents] * inverse_sigma[children] * (1.0 + delta[children]))
+    return delta
+
+
+def _dag_dependencies_triangular(source: int, dist: np.ndarray, level: np.ndarray, src: np.ndarray,
+                                 dst: np.ndarray) -> np.ndarray:
+    """The same recurrences as two sparse triangular solves in level order (for deep DAGs)
+
+    sigma = e_s + D^T sigma is lower triangular once the reached nodes are
+    sorted by level, and u = 1 + delta solves u = 1 + diag(sigma) D diag(1/sigma) u,
+    which is upper triangular in the same order.
+    """
+    n = len(level)
+    reached = np.flatnonzero(np.isfinite(dist))
+    order = reached[np.argsort(level[reached], kind="stable")]
+    position = np.empty(n, dtype=np.int64)
+    position[order] = np.arange(len(order))
+    parents, children = position[src], position[dst]
+    m = len(order)
+    identity = sparse.identity(m, format="csr")
+
+    seed = np.zeros(m)
+    seed[position[source]] = 1.0
+    counts = sparse.csr_matrix((np.ones(len(src)), (children, parents)), shape=(m, m))
+    sigma = spsolve_triangular(identity - counts, seed, lower=True)
+
+    inverse_sigma = np.divide(1.0, sigma, out=np.zeros(m), where=sigma > 0)
+    ratios = sparse.csr_matrix((sigma[parents] * inverse_sigma[children], (parents, children)), shape=(m, m))
+    delta = np.zeros(n)
+    delta[order] = spsolve_triangular(identity - ratios, np.ones(m), lower=False) - 1.0
+    return delta
+
+
+def _group_edges(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Edge order sorted by key and the split points between equal-key runs"""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    return order, np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+
+
+def _break_zero_weight_cycles(src: np.ndarray, dst: np.ndarray, weights: np.ndarray,
+                              n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Drop zero-weight DAG edges that close a cycle (both ends in one strong component)
+
+    Only zero-weight edges can make the tight-edge set cyclic; without such
+    cycles it is returned unchanged. Shortest paths that run through a
+    zero-weight cycle are not counted (NetworkX miscounts them as well).
+    """
+    zero = weights == 0
+    if not zero.any():
+        return src, dst
+    zero_graph = sparse.csr_matrix((np.ones(int(zero.sum())), (src[zero], dst[zero])), shape=(n, n))
+    n_components, labels = connected_components(zero_graph, directed=True, connection="strong")
+    if n_components == n:
+        return src, dst
+    keep = ~(zero & (labels[src] == labels[dst]))
+    return src[keep], dst[keep]
+
+
+def _rescale_betweenness(raw: np.ndarray, normalized: bool, directed: bool,
+                         sampled: Optional[np.ndarray]) -> np.ndarray:
+    """NetworkX's rescaling for endpoints=False, including the sampled-source correction"""
+    n = len(raw) - 1
+    if n < 2:
+        return raw
+    correction = 1 if directed else 2
+    if sampled is None:
+        scale = 1 / (n * (n - 1)) if normalized else 1 / correction
+        return raw * scale
+    k = len(sampled)
+    if normalized:
+        scale_source = 1 / ((k - 1) * (n - 1)) if k > 1 else math.nan
+        scale_other = 1 / (k * (n - 1))
+    else:
+        scale_source = n / ((k - 1) * correction) if k > 1 else math.nan
+        scale_other = n / (k * correction)
+    scale = np.full(len(raw), scale_other)
+    scale[sampled] = scale_source
+    return raw * scale
+
+
+def betweenness_centrality(matrix: sparse.spmatrix, k: Optional[int] = None, epsilon: Optional[float] = None,
+                           delta: float = 0.1, weighted: bool = True, normalized: bool = True,
+                           directed: bool = True, seed: Optional[int] = None,
+                           n_jobs: Optional[int] = None) -> np.ndarray:
+    """Brandes betweenness over all sources, k sampled sources, or enough for `epsilon`
+
+    Args:
+        matrix: Adjacency (weights used as distances when `weighted`)
+        k: Number of sampled sources (overrides `epsilon`)
+        epsilon: Target additive error of normalized values (sets k)
+        delta: Allowed failure probability for `epsilon`
+        weighted: Shortest paths by weight (else by hop count)
+        normalized: Divide by the number of (s, t) pairs
+        directed: False for symmetric matrices of undirected graphs
+        seed: Seed for sampling sources
+        n_jobs: Worker processes (default: all cores for large inputs, else 1)
+    """
+    n = _n_nodes(matrix)
+    if n == 0:
+        return np.zeros(0)
+    matrix = sparse.csr_matrix(matrix, dtype=np.float64)
+    if k is None and epsilon is not None:
+        k = betweenness_sample_size(n, epsilon, delta)
+    sampled = None
+    if k is not None and k < n:
+        sampled = np.sort(np.random.default_rng(seed).choice(n, size=k, replace=False))
+        sources = sampled
+    else:
+        sources = np.arange(n)
+
+    if n_jobs is None:
+        n_jobs = (os.cpu_count() or 1) if len(sources) * matrix.nnz >= PARALLEL_MIN_WORK else 1
+    n_jobs = max(1, min(n_jobs, len(sources)))
+
+    if n_jobs == 1:
+        _init_edges(matrix, weighted)
+        raw = _dependencies(sources)
+    else:
+        chunks = np.array_split(sources, n_jobs * 4)
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_edges,
+                                 initargs=(matrix, weighted)) as executor:
+            raw = sum(executor.map(_dependencies, [chunk for chunk in chunks if len(chunk)]))
+    return _rescale_betweenness(raw, normalized, directed, sampled)
+
+
+def compute_centralities(matrix: sparse.spmatrix, measures: Iterable[str] = MEASURES, directed: bool = True,
+                         weighted: bool = True, betweenness_k: Optional[int] = None,
+                         betweenness_epsilon: Optional[float] = 0.05, seed: Optional[int] = 42,
+                         n_jobs: Optional[int] = None) -> Tuple[Dict[str, np.ndarray], Dict[str, float]]:
+    """Selected measures and the seconds each one took
+
+    Returns:
+        (measure -> per-node values, measure -> seconds)
+    """
+    functions = {
+        "degree": lambda: degree_centrality(matrix, directed=directed),
+        "pagerank": lambda: pagerank(matrix),
+        "eigenvector": lambda: eigenvector_centrality(matrix),
+        "closeness": lambda: closeness_centrality(matrix, weighted=weighted),
+        "betweenness": lambda: betweenness_centrality(matrix, k=betweenness_k, epsilon=betweenness_epsilon,
+                                                      weighted=weighted, directed=directed, seed=seed,
+                                                      n_jobs=n_jobs),
+    }
+    values, timings = {}, {}
+    for name in measures:
+        start = time.perf_counter()
+        values[name] = functions[name]()
+        timings[name] = time.perf_counter() - start
+    return values, timings
+
+
+def top_nodes(nodes: Sequence, values: np.ndarray, limit: int = 20) -> Dict:
+    """Highest-scoring nodes, best first, as {node: float}"""
+    order = np.argsort(-values, kind="stable")[:limit]
+    return {nodes[i]: float(values[i]) for i in order}
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Event time series on a DatetimeIndex
+
+Filing and violation events are loaded into one DataFrame indexed by event
+date (`entity`, `kind` columns), sorted once. Everything else is a column
+operation on that frame:
+
+    period_counts      groupby + resample counts, overall or per entity
+    rolling_stats      rolling mean / std / sum over a regular count series
+    detect_bursts      periods far above the trailing window's level
+    change_points      binary segmentation of the count series (mean shifts)
+    lag_features       per-entity gaps, span and recency in one sorted pass
+
+Date strings are parsed once per distinct value (`pd.factorize`), so a
+history of millions of events with a few thousand distinct dates costs a
+few thousand `fromisoformat` calls.
+
+Usage:
+    from scripts.analysis.utils.event_series import event_frame, period_counts, detect_bursts
+    events = event_frame(violation_records)
+    monthly = period_counts(events, "MS")
+    bursts = detect_bursts(monthly)
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DATE_FIELDS = ("filing_date", "effective_date")
+BURST_WINDOW = 12
+BURST_THRESHOLD = 3.0
+MIN_SEGMENT = 3
+RECENT_DAYS = 365
+
+
+def parse_iso_dates(values: Iterable[Any], keep_aware: bool = False) -> pd.Series:
+    """datetime.fromisoformat per distinct value as datetime64, NaT where it fails
+
+    Falsy and non-string values are NaT. A trailing 'Z' is read as UTC.
+    Offset-aware dates are NaT unless `keep_aware`, which keeps their
+    wall-clock time (what `strftime` on the parsed value would print).
+    """
+    values = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    codes, uniques = pd.factorize(values)
+    parsed = np.full(len(uniques) + 1, np.datetime64("NaT"), dtype="datetime64[us]")
+    for i, value in enumerate(uniques):
+        if not isinstance(value, str) or not value:
+            continue
+        try:
+            date = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            continue
+        if date.tzinfo is not None:
+            if not keep_aware:
+                continue
+            date = date.replace(tzinfo=None)
+        parsed[i] = np.datetime64(date, "us")
+    # factorize codes missing values as -1, the trailing NaT slot
+    return pd.Series(parsed[codes], index=values.index)
+
+
+def event_frame(records: Iterable[Dict[str, Any]], date_fields: Sequence[str] = DATE_FIELDS,
+                entity_field: str = "filing_number", kind_field: Optional[str] = None,
+                kinds: Optional[Sequence[Any]] = None, keep_aware: bool = True) -> pd.DataFrame:
+    """Events as a DataFrame on a sorted DatetimeIndex named 'date'
+
+    The event date is the first truthy value of `date_fields`; records
+    without a parseable date are dropped. Columns: entity, kind (from
+    `kind_field`, or one label per record in `kinds`).
+    """
+    records = list(records)
+    dates = [None] * len(records)
+    for field in date_fields:
+        dates = [date or record.get(field) for date, record in zip(dates, records)]
+    if kinds is None:
+        kinds = [record.get(kind_field) for record in records] if kind_field else None
+    events = pd.DataFrame({
+        "date": parse_iso_dates(pd.Series(dates, dtype=object), keep_aware),
+        "entity": [record.get(entity_field) for record in records],
+        "kind": kinds,
+    })
+    events = events[events["date"].notna()].set_index("date")
+    return events.sort_index(kind="stable")
+
+
+def violation_events(violations: Dict[str, List[Dict[str, Any]]]) -> pd.DataFrame:
+    """event_frame over every violation list; kind is the list name"""
+    records = [record for violation_list in violations.values() for record in violation_list]
+    kinds = np.repeat(np.array(list(violations), dtype=object), [len(v) for v in violations.values()])
+    return event_frame(records, kinds=kinds)
+
+
+def filing_events(entities: Iterable[Dict[str, Any]]) -> pd.DataFrame:
+    """event_frame over every entity's filing_history; kind is the filing type when present"""
+    records = [
+        {**filing, "filing_number": entity.get("filing_number")}
+        for entity in entities
+        for filing in entity.get("filing_history") or []
+        if isinstance(filing, dict)
+    ]
+    return event_frame(records, kind_field="filing_type")
+
+
+def period_counts(events: pd.DataFrame, freq: str = "MS", by: Optional[str] = None) -> pd.Series:
+    """Events per period, zero-filled between the first and last event
+
+    With `by`, counts per (group, period) from one groupby, each group's
+    periods spanning only that group's own events.
+    """
+    if by is None:
+        return events.resample(freq).size()
+    counts = events.groupby([by, pd.Grouper(freq=freq)]).size()
+    return counts[counts > 0]
+
+
+def rolling_stats(counts: pd.Series, window: int = BURST_WINDOW, min_periods: int = 1) -> pd.DataFrame:
+    """Rolling sum, mean and std of a regular count series"""
+    rolling = counts.rolling(window, min_periods=min_periods)
+    return pd.DataFrame({"count": counts, "sum": rolling.sum(), "mean": rolling.mean(), "std": rolling.std()})
+
+
+def detect_bursts(counts: pd.Series, window: int = BURST_WINDOW, threshold: float = BURST_THRESHOLD,
+                  min_count: int = 2) -> pd.DataFrame:
+    """Periods whose count exceeds the trailing window's mean by `threshold` deviations
+
+    The trailing window excludes the period itself. Its deviation is floored
+    at the Poisson level sqrt(mean) and at 1, so a quiet series does not flag
+    every small uptick.
+    """
+    trailing = counts.shift(1).rolling(window, min_periods=window)
+    expected = trailing.mean()
+    scale = np.sqrt(np.maximum(trailing.var(ddof=0), expected)).clip(lower=1.0)
+    score = (counts - expected) / scale
+    bursts = (score >= threshold) & (counts >= min_count)
+    return pd.DataFrame({"count": counts, "expected": expected, "score": score})[bursts]
+
+
+def _segment_cost(prefix: np.ndarray, prefix_sq: np.ndarray, start, end):
+    """Sum of squared deviations from the mean of x[start:end] (vectorized over start/end)"""
+    total = prefix[end] - prefix[start]
+    return prefix_sq[end] - prefix_sq[start] - total ** 2 / (end - start)
+
+
+def change_points(counts: pd.Series, min_size: int = MIN_SEGMENT, penalty: Optional[float] = None,
+                  max_points: Optional[int] = None) -> List[Any]:
+    """Index labels where the mean level of `counts` shifts (binary segmentation, L2 cost)
+
+    A split is kept when it lowers the squared-error cost by more than
+    `penalty`, by default 2 sigma^2 log(n) with sigma estimated from the
+    first differences (robust to the shifts themselves).
+    """
+    x = counts.to_numpy(dtype=np.float64)
+    n = len(x)
+    if n < 2 * min_size:
+        return []
+    if penalty is None:
+        diffs = np.diff(x)
+        sigma = 1.4826 * np.median(np.abs(diffs - np.median(diffs))) / np.sqrt(2.0)
+        if sigma == 0:
+            sigma = np.std(x) or 1.0
+        penalty = 2.0 * sigma ** 2 * np.log(n)
+    prefix = np.concatenate([[0.0], np.cumsum(x)])
+    prefix_sq = np.concatenate([[0.0], np.cumsum(x ** 2)])
+
+    found = []
+    segments = [(0, n)]
+    while segments and (max_points is None or len(found) < max_points):
+        start, end = segments.pop()
+        if end - start < 2 * min_size:
+            continue
+        splits = np.arange(start + min_size, end - min_size + 1)
+        gain = (_segment_cost(prefix, prefix_sq, start, end)
+                - _segment_cost(prefix, prefix_sq, start, splits)
+                - _segment_cost(prefix, prefix_sq, splits, end))
+        best = int(np.argmax(gain))
+        if gain[best] <= penalty:
+            continue
+        split = int(splits[best])
+        found.append(split)
+        segments.extend([(start, split), (split, end)])
+    return [counts.index[i] for i in sorted(found)]
+
+
+def lag_features(events: pd.DataFrame, by: str = "entity", as_of: Optional[datetime] = None,
+                 recent_days: int = RECENT_DAYS) -> pd.DataFrame:
+    """Per-group event lags from one sort of the events
+
+    Columns: events, first_event, last_event, span_days, mean_gap_days,
+    min_gap_days, max_gap_days, last_gap_days, days_since_last, recent_events
+    (within `recent_days` of `as_of`). Gap columns are NaN for groups with a
+    single event.
+    """
+    columns = ["events", "first_event", "last_event", "span_days", "mean_gap_days", "min_gap_days",
+               "max_gap_days", "last_gap_days", "days_since_last", "recent_events"]
+    events = events[events[by].notna()]
+    if events.empty:
+        return pd.DataFrame(columns=columns)
+    as_of = np.datetime64(as_of or datetime.now(), "us")
+    codes, groups = pd.factorize(events[by])
+    dates = events.index.to_numpy(dtype="datetime64[us]")
+    order = np.lexsort((dates, codes))
+    codes, dates = codes[order], dates[order]
+
+    day = np.timedelta64(1, "D")
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(codes)] - 1
+    gaps = np.r_[np.nan, (dates[1:] - dates[:-1]) / day]
+    gaps[starts] = np.nan
+    count = ends - starts + 1
+    first, last = dates[starts], dates[ends]
+    span = (last - first) / day
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_gap = np.where(count > 1, span / (count - 1), np.nan)
+    valid = ~np.isnan(gaps)
+    min_gap = np.minimum.reduceat(np.where(valid, gaps, np.inf), starts)
+    max_gap = np.maximum.reduceat(np.where(valid, gaps, -np.inf), starts)
+    recent = np.add.reduceat((dates >= as_of - recent_days * day).astype(np.int64), starts)
+
+    table = pd.DataFrame({
+        "events": count,
+        "first_event": first,
+        "last_event": last,
+        "span_days": span,
+        "mean_gap_days": mean_gap,
+        "min_gap_days": np.where(count > 1, min_gap, np.nan),
+        "max_gap_days": np.where(count > 1, max_gap, np.nan),
+        "last_gap_days": gaps[ends],
+        "days_since_last": (as_of - last) / day,
+        "recent_events": recent,
+    }, index=pd.Index(groups[codes[starts]], name=by))
+    return table[columns]
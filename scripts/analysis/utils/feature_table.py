@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Columnar entity feature matrix with an on-disk cache
+
+Computes the same features as `feature_engineering.extract_all_features`, in
+the same column order, but over one pandas table of all entities: every
+feature is a column expression, the filing histories are exploded into one
+long table and reduced with a groupby, and each distinct date string is
+parsed once. Violation and relationship-edge counts are joined in by filing
+number instead of rescanning the full lists per entity.
+
+`cached_feature_matrix` stores the float32 matrix under data/cache/features,
+keyed by the content hash of the input files, FEATURE_SPEC_VERSION and the
+reference date (the age features count days up to it), so a rerun on the
+same inputs on the same day skips extraction entirely. Bump
+FEATURE_SPEC_VERSION whenever a feature definition changes.
+
+Usage:
+    python scripts/analysis/utils/feature_table.py    # list cached matrices
+"""
+
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.analysis.utils.event_series import parse_iso_dates  # noqa: E402
+
+FEATURE_SPEC_VERSION = 1
+CACHE_SUFFIX = ".features.npz"
+KEEP_MATRICES = 3
+
+# Column order of feature_engineering.extract_all_features
+FEATURE_NAMES = [
+    'days_since_formation', 'years_since_formation', 'avg_filing_gap_days', 'filing_frequency',
+    'is_corporation', 'is_llc', 'is_foreign', 'is_forfeited', 'is_in_existence',
+    'has_tax_id', 'has_fein', 'address_length', 'has_suite',
+    'associated_entity_count', 'management_change_count',
+    'violation_count', 'has_tax_forfeiture', 'has_forfeited_status', 'has_reinstatement', 'violation_velocity',
+    'address_clustering_score', 'management_stability_index', 'reinstatement_risk',
+]
+ENTITY_COLUMNS = ['filing_number', 'original_filing_date', 'filing_history', 'entity_type', 'status',
+                  'tax_id', 'fein', 'address', 'management']
+
+
+def default_cache_dir() -> Path:
+    """data/cache/features in the repo"""
+    from scripts.utils.paths import DATA_CACHE_DIR
+    return DATA_CACHE_DIR / "features"
+
+
+def reference_time(as_of: Optional[datetime] = None) -> datetime:
+    """Midnight of the reference day (today by default)
+
+    The per-entity extractors measure ages from datetime.now(); whole-day
+    counts from date-only filing dates are the same from midnight.
+    """
+    return datetime.combine((as_of or datetime.now()).date(), time())
+
+
+def _column(table: pd.DataFrame, name: str) -> pd.Series:
+    if name in table:
+        return table[name]
+    return pd.Series([None] * len(table), index=table.index, dtype=object)
+
+
+def _truthy(values: pd.Series) -> pd.Series:
+    """bool(value) per row; missing values are False"""
+    return values.map(bool, na_action='ignore').fillna(False).astype(bool)
+
+
+def _text(values: pd.Series) -> pd.Series:
+    """str(value or '') per row"""
+    return values.where(_truthy(values), '').astype(str)
+
+
+def _days_between(later: np.datetime64, dates: pd.Series) -> pd.Series:
+    """Whole days (floored, as timedelta.days) from each date to `later`"""
+    return (np.datetime64(later, 'us') - dates) // pd.Timedelta(days=1)
+
+
+def _filing_gaps(histories: pd.Series, eligible: pd.Series) -> pd.Series:
+    """Mean whole-day gap between consecutive dated filings, per entity with 2+ dated filings"""
+    histories = histories[eligible & _truthy(histories)].explode()
+    histories = histories[histories.map(lambda filing: isinstance(filing, dict))]
+    if histories.empty:
+        return pd.Series(dtype=float)
+    filings = pd.DataFrame(histories.tolist(), index=histories.index)
+    date_strings = _column(filings, 'filing_date')
+    date_strings = date_strings.where(_truthy(date_strings), _column(filings, 'effective_date'))
+    dates = parse_iso_dates(date_strings).dropna()
+    dates = dates.rename('date').rename_axis('entity').reset_index().sort_values(['entity', 'date'])
+    dates['gap'] = dates.groupby('entity')['date'].diff() // pd.Timedelta(days=1)
+    gaps = dates.groupby('entity')['gap'].agg(['sum', 'count'])
+    gaps = gaps[gaps['count'] > 0]
+    return gaps['sum'] / gaps['count']
+
+
+def _edge_counts(relationship_graph: Dict[str, Any]) -> pd.Series:
+    """Edges touching each node (a self-loop counts once)"""
+    edges = pd.DataFrame(relationship_graph.get('edges', []) or [], columns=['source', 'target'])
+    if edges.empty:
+        return pd.Series(dtype=float)
+    source, target = edges['source'], edges['target']
+    return pd.concat([source, target[target != source]]).value_counts()
+
+
+def _violation_stats(violations: Dict[str, List]) -> pd.DataFrame:
+    """Violation count and type flags per filing number"""
+    records = [violation for violation_list in violations.values() for violation in violation_list]
+    columns = ['count', 'has_tax_forfeiture', 'has_forfeited_status', 'has_reinstatement']
+    if not records:
+        return pd.DataFrame(columns=columns, dtype=float)
+    table = pd.DataFrame({
+        'filing_number': [violation.get('filing_number') for violation in records],
+        'violation_type': [violation.get('violation_type') for violation in records],
+    })
+    table['has_tax_forfeiture'] = table['violation_type'] == 'Tax Forfeiture'
+    table['has_forfeited_status'] = table['violation_type'] == 'Forfeited Existence'
+    table['has_reinstatement'] = pd.Series(records).map(str).str.lower().str.contains('reinstatement', regex=False)
+    table = table[table['filing_number'].notna()]
+    grouped = table.groupby('filing_number', sort=False)
+    stats = grouped[['has_tax_forfeiture', 'has_forfeited_status', 'has_reinstatement']].any()
+    stats.insert(0, 'count', grouped.size())
+    return stats.astype(float)
+
+
+def build_feature_table(entities: List[Dict[str, Any]], relationship_graph: Dict[str, Any],
+                        violations: Dict[str, List], as_of: Optional[datetime] = None) -> pd.DataFrame:
+    """One row per entity, columns FEATURE_NAMES (float64)"""
+    now = np.datetime64(reference_time(as_of), 'us')
+    table = pd.DataFrame.from_records(entities, columns=ENTITY_COLUMNS) if entities else \
+        pd.DataFrame(columns=ENTITY_COLUMNS)
+    features = pd.DataFrame(index=table.index)
+
+    # Temporal features
+    filing_date = parse_iso_dates(_column(table, 'original_filing_date'))
+    dated = filing_date.notna()
+    days = _days_between(now, filing_date).where(dated, 0.0).astype(float)
+    features['days_since_formation'] = days
+    features['years_since_formation'] = days / 365.25
+    avg_gap = _filing_gaps(_column(table, 'filing_history'), dated).reindex(table.index).fillna(0.0)
+    features['avg_filing_gap_days'] = avg_gap
+    features['filing_frequency'] = (365.25 / avg_gap.where(avg_gap > 0)).fillna(0.0)
+
+    # Structural features
+    entity_type = _text(_column(table, 'entity_type')).str.lower()
+    status = _text(_column(table, 'status')).str.lower()
+    address = _text(_column(table, 'address')).str.upper()
+    features['is_corporation'] = entity_type.str.contains('corporation', regex=False)
+    features['is_llc'] = (entity_type.str.contains('llc', regex=False)
+                          | entity_type.str.contains('limited liability', regex=False))
+    features['is_foreign'] = entity_type.str.contains('foreign', regex=False)
+    features['is_forfeited'] = status.str.contains('forfeited', regex=False)
+    features['is_in_existence'] = status.str.contains('existence', regex=False)
+    features['has_tax_id'] = _truthy(_column(table, 'tax_id'))
+    features['has_fein'] = _truthy(_column(table, 'fein'))
+    features['address_length'] = address.str.len()
+    features['has_suite'] = address.str.contains('SUITE', regex=False) | address.str.contains('STE', regex=False)
+
+    # Network and violation features (entities without a filing number get zeros)
+    filing_number = _column(table, 'filing_number')
+    keyed = _truthy(filing_number)
+    key = filing_number.where(keyed)
+    features['associated_entity_count'] = key.map(_edge_counts(relationship_graph)).fillna(0.0)
+    management = _column(table, 'management').map(len, na_action='ignore').fillna(0.0)
+    features['management_change_count'] = management.where(keyed, 0.0)
+
+    stats = _violation_stats(violations)
+    for name, column in (('violation_count', 'count'), ('has_tax_forfeiture', 'has_tax_forfeiture'),
+                         ('has_forfeited_status', 'has_forfeited_status'),
+                         ('has_reinstatement', 'has_reinstatement')):
+        features[name] = key.map(stats[column]).fillna(0.0)
+    years = features['years_since_formation']
+    count = features['violation_count']
+    features['violation_velocity'] = (count / years).where(dated & (count > 0) & (years > 0), 0.0)
+
+    # Composite features
+    features['address_clustering_score'] = 0.0
+    features['management_stability_index'] = (1.0 / (1.0 + features['management_change_count'] / years)).where(
+        years > 0, 1.0)
+    features['reinstatement_risk'] = 0.0
+
+    return features[FEATURE_NAMES].astype(float)
+
+
+def feature_matrix(entities: List[Dict[str, Any]], relationship_graph: Dict[str, Any],
+                   violations: Dict[str, List], as_of: Optional[datetime] = None) -> Tuple[np.ndarray, List[Any]]:
+    """(float32 matrix, entity ids) in the layout of ml_utils.prepare_feature_matrix"""
+    if not entities:
+        return np.array([]), []
+    table = build_feature_table(entities, relationship_graph, violations, as_of)
+    return table.to_numpy(dtype=np.float32), [entity.get('filing_number', '') for entity in entities]
+
+
+def input_digest(paths: Sequence[Path]) -> str:
+    """SHA-256 over the names and bytes of the input files"""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).name.encode('utf-8') + b'\x00')
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(cache_dir: Path, digest: str, as_of: datetime) -> Path:
+    return Path(cache_dir) / f"{digest[:20]}-v{FEATURE_SPEC_VERSION}-{as_of:%Y%m%d}{CACHE_SUFFIX}"
+
+
+def _load(path: Path) -> Optional[Tuple[np.ndarray, List[Any]]]:
+    try:
+        with np.load(path) as data:
+            if list(data['feature_names']) != FEATURE_NAMES:
+                return None
+            return data['matrix'], json.loads(str(data['entity_ids']))
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _save(path: Path, matrix: np.ndarray, entity_ids: List[Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, matrix=matrix, entity_ids=np.array(json.dumps(entity_ids)),
+                 feature_names=np.array(FEATURE_NAMES))
+    os.replace(tmp_path, path)
+    # Keep the newest few matrices
+    cached = sorted(path.parent.glob(f"*{CACHE_SUFFIX}"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in cached[KEEP_MATRICES:]:
+        old.unlink(missing_ok=True)
+
+
+def cached_feature_matrix(entities: List[Dict[str, Any]], relationship_graph: Dict[str, Any],
+                          violations: Dict[str, List], source_files: Sequence[Path],
+                          cache_dir: Optional[Path] = None,
+                          as_of: Optional[datetime] = None) -> Tuple[np.ndarray, List[Any], bool]:
+    """feature_matrix, reused from disk when `source_files` are unchanged
+
+    Returns (matrix, entity ids, cache hit).
+    """
+    as_of = reference_time(as_of)
+    path = cache_path(cache_dir or default_cache_dir(), input_digest(source_files), as_of)
+    cached = _load(path) if path.exists() else None
+    if cached is not None:
+        return cached[0], cached[1], True
+    matrix, entity_ids = feature_matrix(entities, relationship_graph, violations, as_of)
+    if len(matrix):
+        _save(path, matrix, entity_ids)
+    return matrix, entity_ids, False
+
+
+def main():
+    """List cached feature matrices"""
+    cache_dir = default_cache_dir()
+    cached = sorted(cache_dir.glob(f"*{CACHE_SUFFIX}")) if cache_dir.exists() else []
+    print(f"Feature cache: {cache_dir} (spec v{FEATURE_SPEC_VERSION})")
+    for path in cached:
+        loaded = _load(path)
+        shape = "stale" if loaded is None else f"{loaded[0].shape[0]} x {loaded[0].shape[1]}"
+        print(f"  {path.name}  {shape}  {path.stat().st_size / 1e6:.1f} MB")
+    if not cached:
+        print("  (empty)")
+
+
+if __name__ == "__main__":
+    main()
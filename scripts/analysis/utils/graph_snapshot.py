@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Compact CSR snapshot of the violation-law-form network
+
+The connections in advanced_ml_analysis.json are compiled once into flat
+arrays and saved as an uncompressed `.npz` next to the JSON:
+
+    indptr       int32 (n_nodes + 1)   CSR row pointers (row = edge source)
+    indices      int32 (n_edges)       edge targets, in insertion order per row
+    weights      float32 (n_edges)     1 - similarity (lower = better path)
+    similarity   float32 (n_edges)
+    edge_types   int8 (n_edges)        index into meta["edge_types"]
+    node_types   int8 (n_nodes)        index into meta["node_types"]
+    id_offsets   int64 (n_nodes + 1)   node id i is id_bytes[id_offsets[i]:id_offsets[i + 1]]
+    id_bytes     uint8                 UTF-8 node ids, concatenated
+    meta         uint8                 JSON: format version, source stamp, type tables, counts
+
+Members are stored uncompressed, so `load` memory-maps them in place instead
+of reading the archive. NetworkX and `scipy.sparse.csgraph` views are built
+only when a caller asks for them. Node and edge order follow the NetworkX
+graph the analyzers used to build from the JSON, so both views agree with it.
+
+Usage:
+    python scripts/analysis/utils/graph_snapshot.py [analysis.json]
+"""
+
+import json
+import os
+import sys
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+FORMAT_VERSION = 1
+SNAPSHOT_SUFFIX = ".graph.npz"
+# Connection lists in the analysis JSON: (key, source field, target field, source type, target type)
+CONNECTION_KINDS = (
+    ("violation_law", "violation", "law", "violation", "law"),
+    ("violation_form", "violation", "form", "violation", "form"),
+    ("law_form", "law", "form", "law", "form"),
+)
+NODE_GROUPS = (("violations", "violation"), ("laws", "law"), ("forms", "form"))
+
+
+def snapshot_path(analysis_file: Path) -> Path:
+    """advanced_ml_analysis.json -> advanced_ml_analysis.graph.npz"""
+    analysis_file = Path(analysis_file)
+    return analysis_file.with_name(analysis_file.stem + SNAPSHOT_SUFFIX)
+
+
+def source_stamp(path: Path) -> Dict[str, Any]:
+    stat = Path(path).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class GraphSnapshot:
+    """Weighted directed graph as CSR arrays plus a string id table"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self.indptr = arrays["indptr"]
+        self.indices = arrays["indices"]
+        self.weights = arrays["weights"]
+        self.similarity = arrays["similarity"]
+        self.edge_types = arrays["edge_types"]
+        self.node_types = arrays["node_types"]
+        self.id_offsets = arrays["id_offsets"]
+        self.id_bytes = arrays["id_bytes"]
+        self.meta = meta
+        self._node_ids: Optional[List[str]] = None
+        self._index: Optional[Dict[str, int]] = None
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_types)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.indices)
+
+    @property
+    def node_ids(self) -> List[str]:
+        """Node id strings, decoded on first access"""
+        if self._node_ids is None:
+            blob = self.id_bytes.tobytes()
+            offsets = self.id_offsets.tolist()
+            self._node_ids = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(self.n_nodes)]
+        return self._node_ids
+
+    @property
+    def index(self) -> Dict[str, int]:
+        if self._index is None:
+            self._index = {node: i for i, node in enumerate(self.node_ids)}
+        return self._index
+
+    def nodes_of_type(self, node_type: str) -> np.ndarray:
+        """Row ids of every node with the given type, in node order"""
+        names = self.meta["node_types"]
+        if node_type not in names:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self.node_types == names.index(node_type))
+
+    def edge_sources(self) -> np.ndarray:
+        """Source row of every edge (CSR rows expanded to COO)"""
+        return np.repeat(np.arange(self.n_nodes, dtype=np.int32), np.diff(self.indptr))
+
+    def row_edges(self, node: int) -> Dict[int, int]:
+        """Target id -> edge position for the out-edges of one node"""
+        start, stop = int(self.indptr[node]), int(self.indptr[node + 1])
+        return {int(target): position for position, target in enumerate(self.indices[start:stop], start)}
+
+    def to_csgraph(self) -> sparse.csr_matrix:
+        """Weight matrix for scipy.sparse.csgraph (explicit zero weights stay edges)"""
+        return sparse.csr_matrix((self.weights.astype(np.float64), np.asarray(self.indices),
+                                  np.asarray(self.indptr)), shape=(self.n_nodes, self.n_nodes))
+
+    def to_networkx(self):
+        """DiGraph with `type` node attributes and weight/similarity/connection_type edges"""
+        import networkx as nx
+
+        graph = nx.DiGraph()
+        node_types = self.meta["node_types"]
+        edge_types = self.meta["edge_types"]
+        node_ids = self.node_ids
+        graph.add_nodes_from((node, {"type": node_types[code]})
+                             for node, code in zip(node_ids, self.node_types.tolist()))
+        sources = self.edge_sources().tolist()
+        graph.add_edges_from(
+            (node_ids[u], node_ids[v], {"weight": w, "similarity": s, "connection_type": edge_types[t]})
+            for u, v, w, s, t in zip(sources, self.indices.tolist(), self.weights.tolist(),
+                                     self.similarity.tolist(), self.edge_types.tolist())
+        )
+        return graph
+
+    @classmethod
+    def from_analysis(cls, data: Dict[str, Any], source: Optional[Dict[str, Any]] = None) -> "GraphSnapshot":
+        """Compile the network nodes and connection lists of an analysis JSON document"""
+        nodes = data.get("network", {}).get("nodes", {})
+        connections = data.get("connections", {})
+
+        index: Dict[str, int] = {}
+        node_ids: List[str] = []
+        node_type_names: List[str] = []
+        node_types: List[int] = []
+
+        def type_code(name: str) -> int:
+            if name not in node_type_names:
+                node_type_names.append(name)
+            return node_type_names.index(name)
+
+        def add_node(node_id: str, node_type: str, overwrite: bool) -> int:
+            row = index.get(node_id)
+            if row is None:
+                row = index[node_id] = len(node_ids)
+                node_ids.append(node_id)
+                node_types.append(type_code(node_type))
+            elif overwrite:
+                node_types[row] = type_code(node_type)
+            return row
+
+        counts = {}
+        for group, default_type in NODE_GROUPS:
+            group_nodes = nodes.get(group, {})
+            counts[group] = len(group_nodes)
+            for node_id, node_data in group_nodes.items():
+                node_type = node_data.get("type", default_type) if isinstance(node_data, dict) else default_type
+                add_node(node_id, node_type, overwrite=True)
+
+        # A repeated (source, target) pair keeps its first position and its last attributes
+        edge_rows: Dict[Tuple[int, int], int] = {}
+        sources: List[int] = []
+        targets: List[int] = []
+        similarities: List[float] = []
+        edge_types: List[int] = []
+        for code, (kind, source_key, target_key, source_type, target_type) in enumerate(CONNECTION_KINDS):
+            for conn in connections.get(kind, []):
+                source_id, target_id = conn.get(source_key), conn.get(target_key)
+                if not (source_id and target_id):
+                    continue
+                u = add_node(source_id, source_type, overwrite=False)
+                v = add_node(target_id, target_type, overwrite=False)
+                similarity = conn.get("similarity", 0.5)
+                position = edge_rows.setdefault((u, v), len(sources))
+                if position == len(sources):
+                    sources.append(u)
+                    targets.append(v)
+                    similarities.append(similarity)
+                    edge_types.append(code)
+                else:
+                    similarities[position] = similarity
+                    edge_types[position] = code
+
+        n_nodes = len(node_ids)
+        sources_array = np.asarray(sources, dtype=np.int64)
+        order = np.argsort(sources_array, kind="stable")
+        similarity_array = np.asarray(similarities, dtype=np.float64)[order]
+        indptr = np.zeros(n_nodes + 1, dtype=np.int32)
+        np.cumsum(np.bincount(sources_array, minlength=n_nodes), out=indptr[1:])
+
+        encoded = [node_id.encode("utf-8") for node_id in node_ids]
+        id_offsets = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=id_offsets[1:])
+
+        arrays = {
+            "indptr": indptr,
+            "indices": np.asarray(targets, dtype=np.int32)[order],
+            "weights": (1.0 - similarity_array).astype(np.float32),
+            "similarity": similarity_array.astype(np.float32),
+            "edge_types": np.asarray(edge_types, dtype=np.int8)[order],
+            "node_types": np.asarray(node_types, dtype=np.int8),
+            "id_offsets": id_offsets,
+            "id_bytes": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        }
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "source": source,
+            "node_types": node_type_names,
+            "edge_types": [kind for kind, *_ in CONNECTION_KINDS],
+            "counts": counts,
+        }
+        return cls(arrays, meta)
+
+    def save(self, path: Path) -> None:
+        """Write an uncompressed .npz (atomically, via a temporary file)"""
+        path = Path(path)
+        tmp_path = path.with_name(f".{path.name}.tmp{os.getpid()}")
+        arrays = {name: np.ascontiguousarray(getattr(self, name)) for name in
+                  ("indptr", "indices", "weights", "similarity", "edge_types", "node_types", "id_offsets", "id_bytes")}
+        arrays["meta"] = np.frombuffer(json.dumps(self.meta).encode("utf-8"), dtype=np.uint8)
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "GraphSnapshot":
+        arrays = _mmap_npz(path) if mmap else dict(np.load(path))
+        meta = json.loads(arrays.pop("meta").tobytes().decode("utf-8"))
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported graph snapshot format {meta.get('format_version')} in {path}")
+        return cls(arrays, meta)
+
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in
+                   ("indptr", "indices", "weights", "similarity", "edge_types", "node_types", "id_offsets", "id_bytes"))
+
+
+def _mmap_npz(path: Path) -> Dict[str, np.ndarray]:
+    """Memory-map every member of an uncompressed .npz in place"""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path} member {info.filename} is compressed; cannot memory-map it")
+            # Local file header: 30 fixed bytes, then the name and extra field
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(f.read(4), dtype="<u2")
+            f.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            name = info.filename[:-len(".npy")] if info.filename.endswith(".npy") else info.filename
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.empty(shape, dtype=dtype)
+                continue
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                     order="F" if fortran_order else "C")
+    return arrays
+
+
+def load_graph_snapshot(analysis_file: Path, rebuild: bool = False) -> GraphSnapshot:
+    """Snapshot for an analysis JSON, recompiled when the JSON has changed since"""
+    analysis_file = Path(analysis_file)
+    path = snapshot_path(analysis_file)
+    stamp = source_stamp(analysis_file)
+    if not rebuild and path.exists():
+        try:
+            snapshot = GraphSnapshot.load(path)
+            if snapshot.meta.get("source") == stamp:
+                return snapshot
+        except (ValueError, OSError, KeyError) as e:
+            print(f"   ⚠️  Could not read graph snapshot {path}: {e}; rebuilding")
+
+    with open(analysis_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    snapshot = GraphSnapshot.from_analysis(data, source=stamp)
+    snapshot.save(path)
+    return GraphSnapshot.load(path)
+
+
+def main():
+    """Compile (if needed) and describe the graph snapshot of an analysis file."""
+    PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
+    sys.path.insert(0, str(PROJECT_ROOT))
+    from scripts.utils.paths import DATA_PROCESSED_DIR
+
+    analysis_file = Path(sys.argv[1]) if len(sys.argv) > 1 else DATA_PROCESSED_DIR / "advanced_ml_analysis.json"
+    snapshot = load_graph_snapshot(analysis_file)
+    print(f"Graph snapshot {snapshot_path(analysis_file)}")
+    print(f"  {snapshot.n_nodes} nodes, {snapshot.n_edges} edges, {snapshot.nbytes() / 1e6:.2f} MB")
+    for name in snapshot.meta["node_types"]:
+        print(f"  {name}: {len(snapshot.nodes_of_type(name))}")
+
+
+if __name__ == "__main__":
+    main()
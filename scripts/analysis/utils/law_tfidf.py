@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+TF-IDF scoring against the law corpus
+
+The vectorizer is fitted once over the law texts and the law matrix is kept as
+an L2-normalized sparse CSR matrix, so cosine similarity is a sparse dot
+product. Evidence is transformed in one batch, and scores can be restricted to
+the (query, candidate) pairs returned by a vector search.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+class LawTfidfIndex:
+    """TF-IDF model fitted on law texts; rows of `law_matrix` follow the fit order"""
+
+    def __init__(self, max_features: int = 5000, ngram_range: tuple = (1, 3)):
+        self.vectorizer = TfidfVectorizer(max_features=max_features, ngram_range=ngram_range)
+        self.law_matrix: Optional[sparse.csr_matrix] = None
+        self.n_laws = 0
+
+    @property
+    def fitted(self) -> bool:
+        return self.law_matrix is not None
+
+    def fit(self, law_texts: Sequence[str]) -> "LawTfidfIndex":
+        """Fit on the law corpus; an empty vocabulary leaves every score at 0"""
+        self.n_laws = len(law_texts)
+        try:
+            self.law_matrix = self.vectorizer.fit_transform(law_texts).tocsr()
+        except ValueError:
+            self.law_matrix = None
+        return self
+
+    def transform(self, texts: Sequence[str]) -> Optional[sparse.csr_matrix]:
+        """Evidence texts -> L2-normalized CSR rows in the law vocabulary"""
+        if self.law_matrix is None:
+            return None
+        return self.vectorizer.transform(texts).tocsr()
+
+    def similarities(self, query_matrix: Optional[sparse.csr_matrix]) -> np.ndarray:
+        """Dense (n_queries, n_laws) cosine similarities"""
+        if query_matrix is None or self.law_matrix is None:
+            rows = 0 if query_matrix is None else query_matrix.shape[0]
+            return np.zeros((rows, self.n_laws))
+        return (query_matrix @ self.law_matrix.T).toarray()
+
+    def candidate_similarities(self, query_matrix: Optional[sparse.csr_matrix],
+                               candidate_indices: np.ndarray) -> np.ndarray:
+        """Cosine similarities for (n, k) candidate law rows per query (-1 entries score 0)
+
+        Gathers one query row and one law row per pair and takes their row-wise
+        sparse dot product, so only candidate pairs are scored.
+        """
+        candidate_indices = np.asarray(candidate_indices)
+        scores = np.zeros(candidate_indices.shape)
+        if query_matrix is None or self.law_matrix is None or candidate_indices.size == 0:
+            return scores
+
+        n, k = candidate_indices.shape
+        valid = candidate_indices >= 0
+        query_rows = np.repeat(np.arange(n), k)[valid.ravel()]
+        law_rows = candidate_indices.ravel()[valid.ravel()]
+        pair_scores = np.asarray(
+            query_matrix[query_rows].multiply(self.law_matrix[law_rows]).sum(axis=1)
+        ).ravel()
+        scores[valid] = pair_scores
+        return scores
+
+    def pair_similarity(self, text_a: str, text_b: str) -> float:
+        """Similarity of two arbitrary texts in the fitted law vocabulary"""
+        matrix = self.transform([text_a, text_b])
+        if matrix is None:
+            return 0.0
+        return float(matrix[0].multiply(matrix[1]).sum())
+
@@ -3,9 +3,16 @@
 ML utility functions for violation analysis
 """
 
+import time
 import numpy as np
 from typing import Dict, List, Any, Tuple, Optional
 
+# Rows the silhouette is computed on per k (it is O(n^2) in the rows scored)
+SILHOUETTE_SAMPLE_SIZE = 5000
+MINIBATCH_SIZE = 4096
+# Below this many (rows x features x k values) the k values are evaluated sequentially
+PARALLEL_MIN_WORK = 5e6
+
 
 def normalize_features(feature_matrix: np.ndarray) -> Tuple[np.ndarray, Dict[str, Any]]:
     """Normalize feature matrix"""
@@ -35,45 +42,126 @@ def calculate_silhouette_score_simple(labels: np.ndarray, features: np.ndarray)
         return 0.0
 
 
-def find_optimal_clusters_kmeans(features: np.ndarray, max_k: int = 10) -> Dict[str, Any]:
-    """Find optimal number of clusters using elbow method"""
+def stratified_sample(labels: np.ndarray, size: int, random_state: int = 42) -> np.ndarray:
+    """Indices of about `size` rows drawn from each label in proportion to its count
+
+    Every label keeps at least one row, so small clusters stay represented.
+    """
+    labels = np.asarray(labels)
+    if size >= len(labels):
+        return np.arange(len(labels))
+    rng = np.random.default_rng(random_state)
+    order = rng.permutation(len(labels))
+    order = order[np.argsort(labels[order], kind="stable")]
+    _, starts, counts = np.unique(labels[order], return_index=True, return_counts=True)
+    quotas = np.minimum(counts, np.maximum(1, counts * size // len(labels)))
+    return np.sort(np.concatenate([order[start:start + quota] for start, quota in zip(starts, quotas)]))
+
+
+def _evaluate_k(features: np.ndarray, k: int, init: np.ndarray, silhouette_sample_size: Optional[int],
+                batch_size: int, random_state: int) -> Dict[str, Any]:
+    """Fit one k (MiniBatchKMeans from the shared seeds) and score it"""
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.metrics import calinski_harabasz_score, davies_bouldin_score, silhouette_score
+
+    start = time.perf_counter()
+    kmeans = MiniBatchKMeans(n_clusters=k, init=init, n_init=1, batch_size=batch_size,
+                             random_state=random_state)
+    labels = kmeans.fit_predict(features)
+    result = {'k': k, 'inertia': float(kmeans.inertia_), 'silhouette': None,
+              'calinski_harabasz': None, 'davies_bouldin': None}
+    # Empty clusters can leave fewer than two labels, where no score is defined
+    if len(np.unique(labels)) > 1:
+        result['calinski_harabasz'] = float(calinski_harabasz_score(features, labels))
+        result['davies_bouldin'] = float(davies_bouldin_score(features, labels))
+        if silhouette_sample_size:
+            sample = stratified_sample(labels, silhouette_sample_size, random_state)
+            if 1 < len(np.unique(labels[sample])) < len(sample):
+                result['silhouette'] = float(silhouette_score(features[sample], labels[sample]))
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def _best_k(k_range: range, scores: List[Optional[float]]) -> int:
+    """k with the highest score; undefined (None) scores rank last"""
+    return k_range[int(np.argmax([-np.inf if score is None else score for score in scores]))]
+
+
+def find_optimal_clusters_kmeans(features: np.ndarray, max_k: int = 10, silhouette: bool = True,
+                                 silhouette_sample_size: int = SILHOUETTE_SAMPLE_SIZE,
+                                 n_jobs: Optional[int] = None, random_state: int = 42) -> Dict[str, Any]:
+    """Find optimal number of clusters using elbow method
+
+    Every k in 2..max_k is fitted with MiniBatchKMeans, warm-started from a
+    prefix of one shared k-means++ seeding (the first k seeds of a k-means++
+    run are a k-means++ seeding for k), and the k values are evaluated in
+    parallel with joblib. Calinski-Harabasz and Davies-Bouldin scores are
+    computed on all rows in O(n k). The O(n^2) silhouette is computed on a
+    stratified sample of at most `silhouette_sample_size` rows, and skipped
+    entirely with `silhouette=False` (the fast path; `optimal_k_silhouette`
+    then falls back to the Calinski-Harabasz choice).
+
+    `n_jobs=None` runs sequentially for small inputs and on every core
+    otherwise. Per-k fit and scoring times are returned in `timings`.
+    """
     try:
-        from sklearn.cluster import KMeans
-        from sklearn.metrics import silhouette_score
-
-        inertias = []
-        silhouette_scores = []
-        k_range = range(2, min(max_k + 1, len(features)))
-
-        for k in k_range:
-            kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-            labels = kmeans.fit_predict(features)
-            inertias.append(kmeans.inertia_)
-            silhouette_scores.append(silhouette_score(features, labels))
-
-        # Find elbow (simplified: minimum of second derivative approximation)
-        if len(inertias) > 2:
-            diffs = np.diff(inertias)
-            second_diffs = np.diff(diffs)
-            optimal_k_idx = np.argmax(second_diffs) + 2  # +2 because of double diff
-            optimal_k = k_range[optimal_k_idx] if optimal_k_idx < len(k_range) else k_range[-1]
-        else:
-            optimal_k = k_range[0]
-
-        # Also check silhouette score
-        best_silhouette_idx = np.argmax(silhouette_scores)
-        optimal_k_silhouette = k_range[best_silhouette_idx]
-
-        return {
-            'optimal_k_elbow': int(optimal_k),
-            'optimal_k_silhouette': int(optimal_k_silhouette),
-            'inertias': [float(x) for x in inertias],
-            'silhouette_scores': [float(x) for x in silhouette_scores],
-            'k_range': list(k_range)
-        }
+        from joblib import Parallel, delayed
+        from sklearn.cluster import kmeans_plusplus
     except ImportError:
         return {'error': 'sklearn not available'}
 
+    features = np.asarray(features, dtype=np.float64)
+    k_range = range(2, min(max_k + 1, len(features)))
+    if len(k_range) == 0:
+        return {'error': 'not enough samples to cluster'}
+
+    seeds, _ = kmeans_plusplus(features, n_clusters=k_range[-1], random_state=random_state)
+    if n_jobs is None:
+        n_jobs = 1 if features.size * len(k_range) < PARALLEL_MIN_WORK else -1
+    batch_size = min(len(features), MINIBATCH_SIZE)
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluate_k)(features, k, seeds[:k], silhouette_sample_size if silhouette else None,
+                             batch_size, random_state)
+        for k in k_range
+    )
+
+    inertias = [r['inertia'] for r in results]
+    calinski_harabasz = [r['calinski_harabasz'] for r in results]
+    davies_bouldin = [r['davies_bouldin'] for r in results]
+
+    # Find elbow (simplified: minimum of second derivative approximation)
+    if len(inertias) > 2:
+        diffs = np.diff(inertias)
+        second_diffs = np.diff(diffs)
+        optimal_k_idx = np.argmax(second_diffs) + 2  # +2 because of double diff
+        optimal_k = k_range[optimal_k_idx] if optimal_k_idx < len(k_range) else k_range[-1]
+    else:
+        optimal_k = k_range[0]
+
+    optimal_k_calinski_harabasz = _best_k(k_range, calinski_harabasz)
+    optimal_k_davies_bouldin = _best_k(k_range, [None if score is None else -score for score in davies_bouldin])
+
+    # Also check silhouette score
+    silhouette_scores = [r['silhouette'] for r in results]
+    if silhouette and any(score is not None for score in silhouette_scores):
+        optimal_k_silhouette = _best_k(k_range, silhouette_scores)
+    else:
+        optimal_k_silhouette = optimal_k_calinski_harabasz
+
+    return {
+        'optimal_k_elbow': int(optimal_k),
+        'optimal_k_silhouette': int(optimal_k_silhouette),
+        'optimal_k_calinski_harabasz': int(optimal_k_calinski_harabasz),
+        'optimal_k_davies_bouldin': int(optimal_k_davies_bouldin),
+        'inertias': inertias,
+        'silhouette_scores': silhouette_scores if silhouette else [],
+        'calinski_harabasz_scores': calinski_harabasz,
+        'davies_bouldin_scores': davies_bouldin,
+        'silhouette_sample_size': min(silhouette_sample_size, len(features)) if silhouette else 0,
+        'timings': [round(r['seconds'], 4) for r in results],
+        'k_range': list(k_range)
+    }
+
 
 def prepare_feature_matrix(entities: List[Dict[str, Any]],
                           feature_extractor) -> Tuple[np.ndarray, List[str]]:
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection over sentence embeddings
+
+`NearDuplicateDetector` owns one `CachedEncoder`, so the embedding model is
+loaded at most once per process however many texts or name pairs it is asked
+about. Candidate pairs come from a blocked self top-k join
+(`similarity_join.topk_join` with `right=None`): each block of rows is scored
+against the whole matrix and reduced with `argpartition`, so memory stays at
+one (block_rows x n) tile plus n * k edges instead of a dense n x n matrix.
+
+Usage:
+    from scripts.analysis.utils.near_duplicates import get_detector
+    detector = get_detector()
+    embeddings = detector.encode(texts)
+    edges = detector.pairs(embeddings)          # SimilarityEdges, row < column
+    score = detector.similarity("KETTLER INC", "KETTLER CORP")
+"""
+
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from scripts.analysis.utils.similarity_join import SimilarityEdges, normalize_rows, threshold_join, topk_join
+from scripts.utils.embedding_cache import DEFAULT_MODEL, CachedEncoder
+
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_K = 10
+
+
+def near_duplicate_pairs(embeddings: np.ndarray, threshold: float = DEFAULT_THRESHOLD,
+                         k: Optional[int] = DEFAULT_K, block_rows: Optional[int] = None) -> SimilarityEdges:
+    """Unordered pairs (row < column) of near-duplicate rows, in row-major order
+
+    A pair is kept when its cosine similarity reaches `threshold` and one row
+    is among the other's `k` most similar; `k=None` keeps every pair above
+    the threshold.
+    """
+    unit = normalize_rows(embeddings)
+    if k is None:
+        return threshold_join(unit, None, threshold, block_rows=block_rows, normalized=True)
+    return topk_join(unit, None, k, threshold, block_rows=block_rows, normalized=True)
+
+
+class NearDuplicateDetector:
+    """Shared embedding model plus blocked top-k pair search"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, threshold: float = DEFAULT_THRESHOLD,
+                 k: Optional[int] = DEFAULT_K, encoder: Optional[CachedEncoder] = None):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.k = k
+        self.encoder = encoder if encoder is not None else CachedEncoder(model_name)
+
+    def encode(self, texts: Sequence[str], show_progress_bar: bool = False) -> np.ndarray:
+        """Unit-length float32 embeddings, one row per text"""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        embeddings = self.encoder.encode(list(texts), normalize_embeddings=True,
+                                         show_progress_bar=show_progress_bar)
+        return normalize_rows(embeddings)
+
+    def similarity(self, text1: str, text2: str) -> float:
+        """Cosine similarity of two texts"""
+        embeddings = self.encode([text1, text2])
+        return float(embeddings[0] @ embeddings[1])
+
+    def pairs(self, embeddings: np.ndarray, **kwargs) -> SimilarityEdges:
+        """near_duplicate_pairs with this detector's threshold and k as defaults"""
+        kwargs.setdefault("threshold", self.threshold)
+        kwargs.setdefault("k", self.k)
+        return near_duplicate_pairs(embeddings, **kwargs)
+
+    def find(self, texts: Sequence[str], **kwargs) -> SimilarityEdges:
+        """Encode texts and return their near-duplicate pairs"""
+        return self.pairs(self.encode(texts), **kwargs)
+
+
+def pair_records(edges: SimilarityEdges) -> List[Dict[str, float]]:
+    """JSON-ready {entity_1_index, entity_2_index, similarity} records"""
+    return [
+        {"entity_1_index": i, "entity_2_index": j, "similarity": similarity}
+        for i, j, similarity in zip(edges.rows.tolist(), edges.cols.tolist(), edges.scores.tolist())
+    ]
+
+
+_shared_detectors: Dict[str, NearDuplicateDetector] = {}
+_shared_detectors_lock = threading.Lock()
+
+
+def get_detector(model_name: str = DEFAULT_MODEL) -> NearDuplicateDetector:
+    """Process-wide NearDuplicateDetector for `model_name`"""
+    with _shared_detectors_lock:
+        detector = _shared_detectors.get(model_name)
+        if detector is None:
+            detector = NearDuplicateDetector(model_name)
+            _shared_detectors[model_name] = detector
+        return detector
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Blocked cosine similarity joins
+
+Finds the (row, column) pairs whose cosine similarity passes a threshold
+without materializing the full similarity matrix. Row blocks of the left
+matrix are multiplied against the right matrix with one BLAS call each, and
+only the surviving pairs are kept (`np.nonzero` for threshold joins,
+`argpartition` for per-row top-k joins), so peak memory is one
+(block_rows x n_right) float32 tile plus the output edges.
+
+Results are `SimilarityEdges`: parallel row/column/score arrays (a COO edge
+list) that convert to `scipy.sparse.coo_matrix`.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+from scipy import sparse
+
+# Bound on the float32 similarity tile computed per block (64 MB)
+BLOCK_ELEMENTS = 1 << 24
+
+
+class SimilarityEdges:
+    """COO edge list: rows[i] -- cols[i] with similarity scores[i]"""
+
+    def __init__(self, rows: np.ndarray, cols: np.ndarray, scores: np.ndarray, shape: tuple):
+        self.rows = rows
+        self.cols = cols
+        self.scores = scores
+        self.shape = shape
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def to_coo(self) -> sparse.coo_matrix:
+        return sparse.coo_matrix((self.scores, (self.rows, self.cols)), shape=self.shape)
+
+    @classmethod
+    def concatenate(cls, parts: List["SimilarityEdges"], shape: tuple) -> "SimilarityEdges":
+        if not parts:
+            return cls(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64),
+                       np.empty(0, dtype=np.float32), shape)
+        return cls(np.concatenate([p.rows for p in parts]), np.concatenate([p.cols for p in parts]),
+                   np.concatenate([p.scores for p in parts]), shape)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalized float32 copy; all-zero rows stay zero (cosine 0, as in sklearn)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _block_rows(n_columns: int, block_rows: Optional[int]) -> int:
+    return block_rows or max(1, BLOCK_ELEMENTS // max(1, n_columns))
+
+
+def threshold_join(left: np.ndarray, right: Optional[np.ndarray], threshold: float,
+                   block_rows: Optional[int] = None, normalized: bool = False) -> SimilarityEdges:
+    """All pairs with cosine similarity >= threshold, in row-major order
+
+    With `right=None` this is a self-join over `left` that returns each
+    unordered pair once (row < column) and skips the diagonal; each block only
+    multiplies against the rows at or after it.
+    """
+    self_join = right is None
+    left = left if normalized else normalize_rows(left)
+    right = left if self_join else (right if normalized else normalize_rows(right))
+    n_left, n_right = left.shape[0], right.shape[0]
+    shape = (n_left, n_right)
+    if n_left == 0 or n_right == 0:
+        return SimilarityEdges.concatenate([], shape)
+
+    step = _block_rows(n_right, block_rows)
+    parts = []
+    for start in range(0, n_left, step):
+        stop = min(n_left, start + step)
+        col_start = start if self_join else 0
+        tile = left[start:stop] @ right[col_start:].T
+        mask = tile >= threshold
+        if self_join:
+            # The tile starts at the diagonal: drop its lower triangle and the diagonal itself
+            square = stop - start
+            mask[:, :square] &= ~np.tri(square, dtype=bool)
+        rows, cols = np.nonzero(mask)
+        parts.append(SimilarityEdges(rows.astype(np.int64) + start, cols.astype(np.int64) + col_start,
+                                     tile[rows, cols], shape))
+    return SimilarityEdges.concatenate(parts, shape)
+
+
+def topk_join(left: np.ndarray, right: Optional[np.ndarray], k: int, threshold: float = -np.inf,
+              block_rows: Optional[int] = None, normalized: bool = False) -> SimilarityEdges:
+    """Each left row's k most similar right rows that also reach `threshold`
+
+    Edges are grouped by row, best first within a row. With `right=None` this
+    is a self-join over `left`: each row's k most similar other rows, returned
+    as unordered pairs (row < column), each once, in row-major order.
+    """
+    self_join = right is None
+    left = left if normalized else normalize_rows(left)
+    right = left if self_join else (right if normalized else normalize_rows(right))
+    n_left, n_right = left.shape[0], right.shape[0]
+    shape = (n_left, n_right)
+    k = min(k, n_right - 1 if self_join else n_right)
+    if n_left == 0 or k <= 0:
+        return SimilarityEdges.concatenate([], shape)
+
+    step = _block_rows(n_right, block_rows)
+    parts = []
+    for start in range(0, n_left, step):
+        tile = left[start:start + step] @ right.T
+        if self_join:
+            # A row is not its own neighbour
+            tile[np.arange(tile.shape[0]), np.arange(start, start + tile.shape[0])] = -np.inf
+        if k < n_right:
+            top = np.argpartition(tile, n_right - k, axis=1)[:, n_right - k:]
+        else:
+            top = np.broadcast_to(np.arange(n_right), tile.shape)
+        top_scores = np.take_along_axis(tile, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        rows, ranks = np.nonzero(top_scores >= threshold)
+        parts.append(SimilarityEdges(rows.astype(np.int64) + start, top[rows, ranks].astype(np.int64),
+                                     top_scores[rows, ranks], shape))
+    edges = SimilarityEdges.concatenate(parts, shape)
+    if self_join:
+        # i -> j and j -> i are the same pair; np.unique also sorts the keys row-major
+        rows, cols = np.minimum(edges.rows, edges.cols), np.maximum(edges.rows, edges.cols)
+        _, first = np.unique(rows * n_left + cols, return_index=True)
+        edges = SimilarityEdges(rows[first], cols[first], edges.scores[first], shape)
+    return edges
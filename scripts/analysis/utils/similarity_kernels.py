@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Batched ensemble similarity kernel for evidence-law scoring
+
+Computes the six ensemble metrics (cosine, euclidean, manhattan, dot product,
+jaccard over positive components, pearson) for every (query, candidate) pair
+at once. Per-law norms, means and positive masks are precomputed once in
+`LawVectorStats`, so the per-pair work reduces to batched matrix products:
+
+    dot       = q . l
+    cosine    = dot / (|q| |l|)
+    euclidean = 1 / (1 + sqrt(|q|^2 + |l|^2 - 2 dot))
+    pearson   = (dot - d mean_q mean_l) / (|q - mean_q| |l - mean_l|)
+    jaccard   = |q+ & l+| / (|q+| + |l+| - |q+ & l+|)
+
+Manhattan distance has no inner-product form and is computed blockwise. When
+numba is installed, a fused JIT kernel can compute all metrics in one pass
+without the temporaries; numba is imported and the kernel compiled only the
+first time a large enough input needs it.
+"""
+
+import threading
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from scripts.utils import backends
+
+NUMBA_AVAILABLE = backends.available("numba")
+
+METRICS = ("cosine", "euclidean", "manhattan", "dot_product", "jaccard", "pearson")
+
+# Pairs (n * k) above which the numba kernel is worth its compile time
+NUMBA_MIN_PAIRS = 20_000
+# Bound on the (rows, k, d) float32 candidate block gathered per chunk
+BLOCK_ELEMENTS = 1 << 22
+
+
+class LawVectorStats:
+    """Law embedding matrix with the per-row statistics the kernel reuses"""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.dimension = self.vectors.shape[1] if self.vectors.ndim == 2 else 0
+        self.sq_norms = np.einsum('ij,ij->i', self.vectors, self.vectors, dtype=np.float64)
+        self.norms = np.sqrt(self.sq_norms)
+        self.means = self.vectors.mean(axis=1, dtype=np.float64)
+        self.centered_norms = np.sqrt(np.maximum(self.sq_norms - self.dimension * self.means ** 2, 0.0))
+        self.positive = (self.vectors > 0).astype(np.float32)
+        self.positive_counts = self.positive.sum(axis=1)
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """numerator / denominator with 0 where the denominator is 0 (or the result is NaN)"""
+    result = np.zeros(np.broadcast(numerator, denominator).shape)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return np.nan_to_num(result, nan=0.0)
+
+
+def _numpy_block(queries: np.ndarray, stats: LawVectorStats, indices: np.ndarray,
+                 out: Dict[str, np.ndarray], rows: slice) -> None:
+    """All metrics for one block of queries with NumPy batched matmuls"""
+    d = stats.dimension
+    cand = stats.vectors[indices]                                   # (m, k, d)
+    q64 = queries.astype(np.float64)
+
+    q_sq = np.einsum('md,md->m', q64, q64)
+    q_norm = np.sqrt(q_sq)
+    q_mean = q64.mean(axis=1)
+    q_centered_norm = np.sqrt(np.maximum(q_sq - d * q_mean ** 2, 0.0))
+
+    dots = np.matmul(cand, queries[:, :, None])[..., 0].astype(np.float64)   # (m, k)
+    l_sq = stats.sq_norms[indices]
+    l_norm = stats.norms[indices]
+
+    out["dot_product"][rows] = dots
+    out["cosine"][rows] = _safe_divide(dots, q_norm[:, None] * l_norm)
+    out["euclidean"][rows] = 1 / (1 + np.sqrt(np.maximum(q_sq[:, None] + l_sq - 2 * dots, 0.0)))
+    out["manhattan"][rows] = 1 / (1 + np.abs(queries[:, None, :] - cand).sum(axis=2, dtype=np.float64))
+
+    q_pos = (queries > 0).astype(np.float32)
+    intersection = np.matmul(stats.positive[indices], q_pos[:, :, None])[..., 0]
+    union = q_pos.sum(axis=1)[:, None] + stats.positive_counts[indices] - intersection
+    out["jaccard"][rows] = _safe_divide(intersection, union)
+
+    if d > 1:
+        covariance = dots - d * q_mean[:, None] * stats.means[indices]
+        out["pearson"][rows] = _safe_divide(covariance, q_centered_norm[:, None] * stats.centered_norms[indices])
+
+
+# Replaced by numba.prange when the kernel is compiled
+prange = range
+_numba_kernel: Optional[Callable] = None
+_numba_lock = threading.Lock()
+
+
+def _fused_kernel(queries, laws, indices, out):  # pragma: no cover - exercised only with numba
+    n, k = indices.shape
+    d = queries.shape[1]
+    for i in prange(n):
+        q = queries[i]
+        q_sq = 0.0
+        q_sum = 0.0
+        q_pos = 0.0
+        for t in range(d):
+            q_sq += q[t] * q[t]
+            q_sum += q[t]
+            if q[t] > 0:
+                q_pos += 1.0
+        q_mean = q_sum / d
+        for j in range(k):
+            idx = indices[i, j]
+            if idx < 0:
+                continue
+            l = laws[idx]
+            dot = 0.0
+            l_sq = 0.0
+            l_sum = 0.0
+            manhattan = 0.0
+            both = 0.0
+            l_pos = 0.0
+            for t in range(d):
+                lt = l[t]
+                dot += q[t] * lt
+                l_sq += lt * lt
+                l_sum += lt
+                manhattan += abs(q[t] - lt)
+                # Branch-free counts keep the loop vectorizable
+                positive = 1.0 if lt > 0 else 0.0
+                l_pos += positive
+                both += positive * (1.0 if q[t] > 0 else 0.0)
+            l_mean = l_sum / d
+            denom = np.sqrt(q_sq) * np.sqrt(l_sq)
+            out[0, i, j] = dot / denom if denom > 0 else 0.0
+            out[1, i, j] = 1.0 / (1.0 + np.sqrt(max(q_sq + l_sq - 2.0 * dot, 0.0)))
+            out[2, i, j] = 1.0 / (1.0 + manhattan)
+            out[3, i, j] = dot
+            union = q_pos + l_pos - both
+            out[4, i, j] = both / union if union > 0 else 0.0
+            if d > 1:
+                centered = np.sqrt(max(q_sq - d * q_mean * q_mean, 0.0)) * \
+                    np.sqrt(max(l_sq - d * l_mean * l_mean, 0.0))
+                out[5, i, j] = (dot - d * q_mean * l_mean) / centered if centered > 0 else 0.0
+
+
+def _get_numba_kernel() -> Optional[Callable]:
+    """JIT-compile the fused kernel on first use (None without numba)"""
+    global _numba_kernel, prange
+    if _numba_kernel is None:
+        with _numba_lock:
+            if _numba_kernel is None:
+                numba = backends.load("numba")
+                if numba is None:
+                    return None
+                prange = numba.prange
+                _numba_kernel = numba.njit(parallel=True, fastmath=True, cache=True)(_fused_kernel)
+    return _numba_kernel
+
+
+def ensemble_similarities(queries: np.ndarray, stats: LawVectorStats, candidate_indices: np.ndarray,
+                          use_numba: Optional[bool] = None) -> Dict[str, np.ndarray]:
+    """Every ensemble metric for each query against its candidate laws
+
+    Args:
+        queries: (n, d) evidence embeddings
+        stats: Precomputed statistics of the law matrix
+        candidate_indices: (n, k) law rows per query; -1 marks a missing candidate (scores 0)
+        use_numba: Force the numba kernel on/off; default uses it for large inputs when installed
+
+    Returns:
+        Metric name -> (n, k) float64 array
+    """
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    candidate_indices = np.asarray(candidate_indices, dtype=np.int64)
+    if candidate_indices.ndim == 1:
+        candidate_indices = candidate_indices[None, :]
+    n, k = candidate_indices.shape
+    out = {name: np.zeros((n, k)) for name in METRICS}
+    if n == 0 or k == 0 or len(stats) == 0:
+        return out
+
+    if use_numba is None:
+        use_numba = NUMBA_AVAILABLE and n * k >= NUMBA_MIN_PAIRS
+    kernel = _get_numba_kernel() if use_numba and NUMBA_AVAILABLE else None
+    if kernel is not None:
+        packed = np.zeros((len(METRICS), n, k))
+        kernel(queries, stats.vectors, candidate_indices, packed)
+        return {name: packed[i] for i, name in enumerate(METRICS)}
+
+    valid = candidate_indices >= 0
+    safe_indices = np.where(valid, candidate_indices, 0)
+    rows_per_block = max(1, BLOCK_ELEMENTS // max(1, k * stats.dimension))
+    for start in range(0, n, rows_per_block):
+        rows = slice(start, min(n, start + rows_per_block))
+        _numpy_block(queries[rows], stats, safe_indices[rows], out, rows)
+
+    if not valid.all():
+        for values in out.values():
+            values[~valid] = 0.0
+    return out
+
+
+def pair_similarities(evidence_embedding: np.ndarray, law_embedding: np.ndarray) -> Dict[str, float]:
+    """The ensemble metrics for a single (evidence, law) pair"""
+    stats = LawVectorStats(np.asarray(law_embedding, dtype=np.float32).reshape(1, -1))
+    metrics = ensemble_similarities(np.asarray(evidence_embedding).reshape(1, -1), stats,
+                                    np.zeros((1, 1), dtype=np.int64), use_numba=False)
+    return {name: float(values[0, 0]) for name, values in metrics.items()}
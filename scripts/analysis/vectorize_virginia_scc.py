@@ -8,25 +8,15 @@ import sys
 from pathlib import Path
 from datetime import datetime
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Add project root to path
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-try:
-    from sentence_transformers import SentenceTransformer
-except ImportError:
-    print("Installing sentence-transformers...")
-    import subprocess
-    try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "--user", "sentence-transformers"],
-                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    except:
-        print("Warning: Could not install sentence-transformers automatically.")
-        print("Please install manually: pip install --user sentence-transformers")
-        sys.exit(1)
-    from sentence_transformers import SentenceTransformer
+from scripts.analysis.utils.near_duplicates import (
+    NearDuplicateDetector, get_detector, near_duplicate_pairs, pair_records
+)
 
 def load_virginia_scc_data() -> Dict[str, Any]:
     """Load Virginia SCC raw data"""
@@ -67,36 +57,25 @@ def create_text_representations(data: Dict[str, Any]) -> List[Dict[str, Any]]:
 
     return texts
 
-def generate_embeddings(texts: List[str]) -> np.ndarray:
+def generate_embeddings(texts: List[str], detector: Optional[NearDuplicateDetector] = None) -> np.ndarray:
     """Generate embeddings for texts"""
-    print("Loading embedding model...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+    detector = detector or get_detector()
 
     print(f"Generating embeddings for {len(texts)} texts...")
-    embeddings = model.encode(texts, normalize_embeddings=True, show_progress_bar=True)
+    return detector.encode(texts, show_progress_bar=True)
 
-    return embeddings
+def find_similar_entities(embeddings: np.ndarray, threshold: float = 0.85,
+                          k: Optional[int] = 10) -> List[Dict[str, Any]]:
+    """Find similar entities using cosine similarity
 
-def find_similar_entities(embeddings: np.ndarray, threshold: float = 0.85) -> List[Dict[str, Any]]:
-    """Find similar entities using cosine similarity"""
-    similarities = []
+    Pairs are extracted in row blocks (see near_duplicates), keeping each
+    entity's k most similar entities above the threshold; `k=None` keeps every
+    pair above it. Each pair is listed once (entity_1_index < entity_2_index).
+    """
+    return pair_records(near_duplicate_pairs(embeddings, threshold=threshold, k=k))
 
-    # Calculate cosine similarity matrix
-    similarity_matrix = np.dot(embeddings, embeddings.T)
-
-    for i in range(len(similarity_matrix)):
-        for j in range(i + 1, len(similarity_matrix)):
-            similarity = float(similarity_matrix[i][j])
-            if similarity >= threshold:
-                similarities.append({
-                    "entity_1_index": i,
-                    "entity_2_index": j,
-                    "similarity": similarity
-                })
-
-    return similarities
-
-def analyze_abnormalities(data: Dict[str, Any], embeddings: np.ndarray, texts: List[Dict[str, Any]]) -> Dict[str, Any]:
+def analyze_abnormalities(data: Dict[str, Any], embeddings: np.ndarray, texts: List[Dict[str, Any]],
+                          detector: Optional[NearDuplicateDetector] = None) -> Dict[str, Any]:
     """Analyze data for abnormalities using embeddings and semantic analysis"""
     abnormalities = []
 
@@ -107,8 +86,7 @@ def analyze_abnormalities(data: Dict[str, Any], embeddings: np.ndarray, texts: L
 
     if legal_name and fictitious_name:
         # Check if names are semantically similar but legally different
-        name_embedding = generate_embeddings([legal_name, fictitious_name])
-        name_similarity = float(np.dot(name_embedding[0], name_embedding[1]))
+        name_similarity = (detector or get_detector()).similarity(legal_name, fictitious_name)
 
         if name_similarity > 0.9:
             abnormalities.append({
@@ -216,15 +194,19 @@ def main():
     texts = create_text_representations(data)
     print(f"   ✓ Created {len(texts)} text representations")
 
-    # Generate embeddings
+    # Generate embeddings (one model instance for the whole run)
     print("\n3. Generating embeddings...")
+    detector = get_detector()
     text_strings = [t["text"] for t in texts]
-    embeddings = generate_embeddings(text_strings)
+    embeddings = generate_embeddings(text_strings, detector)
     print(f"   ✓ Generated embeddings (shape: {embeddings.shape})")
 
+    near_duplicates = find_similar_entities(embeddings)
+    print(f"   ✓ Found {len(near_duplicates)} near-duplicate entity pairs")
+
     # Analyze abnormalities
     print("\n4. Analyzing for abnormalities...")
-    analysis = analyze_abnormalities(data, embeddings, texts)
+    analysis = analyze_abnormalities(data, embeddings, texts, detector)
     print(f"   ✓ Found {analysis['total_abnormalities']} abnormalities")
     print(f"     - High severity: {analysis['high_severity']}")
     print(f"     - Medium severity: {analysis['medium_severity']}")
@@ -247,6 +229,7 @@ def main():
             "sample": embeddings[0].tolist() if len(embeddings) > 0 else []
         },
         "text_representations": texts,
+        "near_duplicates": near_duplicates,
         "abnormalities_analysis": analysis,
         "raw_data": data
     }
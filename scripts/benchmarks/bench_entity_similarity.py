@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Entity Similarity Benchmark
+
+Compares the vectorized similarity stage in
+scripts/analysis/embedding_violation_analysis.py (one normalized matrix,
+blocked threshold extraction, one split per filing for the fields) against the
+previous implementation (a scalar cosine per entity pair and repeated
+find/split per field, kept below as the reference) on synthetic filings.
+
+The pairwise reference is quadratic, so it runs on a sample whose pairs and
+entity fields must match the vectorized output; throughput is reported in
+entity pairs/s. The field extractors are compared on every filing.
+
+Usage:
+    python scripts/benchmarks/bench_entity_similarity.py
+    python scripts/benchmarks/bench_entity_similarity.py --entities 50000 --legacy-entities 2000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.analysis import embedding_violation_analysis as analysis  # noqa: E402
+
+STATUSES = ['In Existence', 'Forfeited Existence', 'Voluntarily Terminated', 'Converted']
+STREETS = ['Firestone Dr', 'Pinnacle Dr, Ste 700', 'San Pedro St', 'Nicollet Dr', 'Bryan St.']
+CITIES = ['Frisco, TX 75034', 'McLean, VA 22102', 'Austin, TX 78705', 'Dallas, TX 75201']
+AGENTS = ['Thomas Bisanz', 'National Registered Agents, Inc.', 'United States Corporation Agents, Inc.',
+          'Carlisle Braun', 'Monte B Hartig']
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September',
+          'October', 'November', 'December']
+EVENTS = ['Certificate of Formation', 'Tax Forfeiture', 'Reinstatement', 'Public Information Report (PIR)']
+
+
+def make_filings(entities: int, dimension: int = 384, cluster_size: int = 5, seed: int = 0) -> Dict[str, Any]:
+    """Synthetic lariat_tx_embeddings.json payload
+
+    Embeddings are noisy copies of shared cluster centres, so pairs inside a
+    cluster land around 0.5-0.95 cosine similarity and pairs across clusters
+    near zero, roughly as related filings behave.
+    """
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((max(1, entities // cluster_size), dimension))
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    cluster = rng.integers(0, len(centres), entities)
+    noise = rng.standard_normal((entities, dimension)) / np.sqrt(dimension)
+    embeddings = centres[cluster] + rng.uniform(0.2, 1.0, (entities, 1)) * noise
+
+    vectors = []
+    for i in range(entities):
+        filing = 800000000 + i
+        events = [f"{EVENTS[e]} on {MONTHS[m]} {d}, {y}" for e, m, d, y in
+                  zip(rng.integers(0, len(EVENTS), rng.integers(1, 25)), rng.integers(0, 12, 25),
+                      rng.integers(1, 29, 25), rng.integers(1980, 2025, 25))]
+        fields = [
+            f"Filing Number: {filing}",
+            f"Name: Entity {cluster[i]}-{i}, LLC",
+            f"Status: {STATUSES[rng.integers(len(STATUSES))]}",
+            f"Address: {rng.integers(100, 9999)} {STREETS[rng.integers(len(STREETS))]}\n"
+            f"{CITIES[cluster[i] % len(CITIES)]} USA",
+            f"Registered Agent: {AGENTS[cluster[i] % len(AGENTS)]} {rng.integers(100, 9999)} Main St",
+            f"Tax ID: {32000000000 + i} ",
+            f"Filing History: {'; '.join(events)}",
+            f"Management: {AGENTS[cluster[i] % len(AGENTS)]} (Manager)",
+        ]
+        vectors.append({
+            'id': f"lariat_tx_{filing}",
+            'text': ' | '.join(fields),
+            'embedding': embeddings[i].tolist(),
+        })
+    return {'metadata': {'model': 'synthetic', 'dimension': dimension, 'count': entities}, 'vectors': vectors}
+
+
+# Reference implementation (previous embedding_violation_analysis.py)
+
+def legacy_cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
+    vec1 = np.array(vec1)
+    vec2 = np.array(vec2)
+    dot_product = np.dot(vec1, vec2)
+    norm1 = np.linalg.norm(vec1)
+    norm2 = np.linalg.norm(vec2)
+    if norm1 == 0 or norm2 == 0:
+        return 0.0
+    return float(dot_product / (norm1 * norm2))
+
+
+def legacy_extract_entity_info(text: str) -> Dict[str, str]:
+    info = {}
+    for label, key, first_token in [('Filing Number:', 'filing_number', True), ('Name:', 'name', False),
+                                    ('Address:', 'address', False), ('Status:', 'status', False),
+                                    ('Registered Agent:', 'registered_agent', False),
+                                    ('Tax ID:', 'tax_id', True)]:
+        match = text.find(label)
+        if match != -1:
+            parts = text[match:].split('|')
+            for part in parts:
+                if label in part:
+                    if first_token:
+                        info[key] = part.split(label)[1].strip().split()[0]
+                    else:
+                        value = part.split(label)[1].strip().split('|')[0].strip()
+                        info[key] = value.replace('\n', ' ') if key == 'address' else value
+    if 'Tax Forfeiture' in text:
+        info['has_tax_forfeiture'] = True
+    if 'Forfeited' in text:
+        info['has_forfeited_status'] = True
+    if 'Reinstatement' in text:
+        info['has_reinstatement'] = True
+    return info
+
+
+def legacy_find_similar_entities(embeddings_data: Dict[str, Any],
+                                 similarity_threshold: float = 0.7) -> Dict[str, Any]:
+    vectors = embeddings_data.get('vectors', [])
+    similarity_pairs = []
+    entity_embeddings = {}
+    entity_info = {}
+    for vec in vectors:
+        entity_id = vec.get('id', '').replace('lariat_tx_', '')
+        embedding = vec.get('embedding', [])
+        if embedding and len(embedding) > 0:
+            entity_embeddings[entity_id] = embedding
+            entity_info[entity_id] = legacy_extract_entity_info(vec.get('text', ''))
+            entity_info[entity_id]['original_id'] = vec.get('id', '')
+    entity_ids = list(entity_embeddings.keys())
+    for i, entity_id1 in enumerate(entity_ids):
+        for entity_id2 in entity_ids[i+1:]:
+            similarity = legacy_cosine_similarity(entity_embeddings[entity_id1], entity_embeddings[entity_id2])
+            if similarity >= similarity_threshold:
+                similarity_pairs.append({
+                    'entity1': entity_id1,
+                    'entity2': entity_id2,
+                    'similarity': similarity,
+                    'entity1_info': entity_info[entity_id1],
+                    'entity2_info': entity_info[entity_id2]
+                })
+    similarity_pairs.sort(key=lambda x: x['similarity'], reverse=True)
+    return {'similarity_pairs': similarity_pairs, 'entity_info': entity_info, 'threshold': similarity_threshold}
+
+
+def check_pairs(expected: List[Dict[str, Any]], actual: List[Dict[str, Any]], threshold: float,
+                tolerance: float = 1e-5):
+    """Same pairs and scores, up to float32 rounding for pairs sitting on the threshold"""
+    expected_scores = {(p['entity1'], p['entity2']): p['similarity'] for p in expected}
+    actual_scores = {(p['entity1'], p['entity2']): p['similarity'] for p in actual}
+    for pair in expected_scores.keys() ^ actual_scores.keys():
+        score = expected_scores.get(pair, actual_scores.get(pair))
+        assert abs(score - threshold) < tolerance, f"pair {pair} ({score:.6f}) found by one implementation only"
+    for pair in expected_scores.keys() & actual_scores.keys():
+        assert abs(expected_scores[pair] - actual_scores[pair]) < tolerance, f"pair {pair} score differs"
+    scores = [p['similarity'] for p in actual]
+    assert all(a >= b for a, b in zip(scores, scores[1:])), "pairs are not sorted by similarity"
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pairwise vs vectorized entity similarity")
+    parser.add_argument('--entities', type=int, default=20_000, help="Synthetic filings for the vectorized stage")
+    parser.add_argument('--legacy-entities', type=int, default=1_500,
+                        help="Filings for the pairwise reference (its cost is quadratic, so a sample suffices)")
+    parser.add_argument('--threshold', type=float, default=0.7, help="Similarity threshold")
+    parser.add_argument('--top-k', type=int, default=3, help="Neighbours per entity for the top-k variant")
+    args = parser.parse_args()
+
+    data = make_filings(args.entities)
+    sample = {'metadata': data['metadata'], 'vectors': data['vectors'][:args.legacy_entities]}
+    print(f"Synthetic filings: {args.entities:,} (pairwise reference on {len(sample['vectors']):,}), "
+          f"threshold {args.threshold}\n")
+
+    texts = [vec['text'] for vec in data['vectors']]
+    expected_info, legacy_seconds = timed(lambda: [legacy_extract_entity_info(t) for t in texts])
+    actual_info, seconds = timed(lambda: [analysis.extract_entity_info(t) for t in texts])
+    assert expected_info == actual_info, "extracted entity fields differ"
+    print(f"{'stage':<26} {'reference':>14} {'vectorized':>14} {'speedup':>9}")
+    print(f"{'extract_entity_info':<26} {len(texts) / legacy_seconds:>10,.0f} t/s "
+          f"{len(texts) / seconds:>10,.0f} t/s {legacy_seconds / seconds:>8.1f}x")
+
+    expected, legacy_seconds = timed(legacy_find_similar_entities, sample, args.threshold)
+    actual, _ = timed(analysis.find_similar_entities, sample, args.threshold)
+    check_pairs(expected['similarity_pairs'], actual['similarity_pairs'], args.threshold)
+    assert expected['entity_info'] == actual['entity_info'], "entity info differs"
+
+    result, seconds = timed(analysis.find_similar_entities, data, args.threshold)
+    n = len(sample['vectors'])
+    legacy_rate = n * (n - 1) / 2 / legacy_seconds
+    rate = args.entities * (args.entities - 1) / 2 / seconds
+    print(f"{'find_similar_entities':<26} {legacy_rate:>10,.0f} p/s {rate:>10,.0f} p/s {rate / legacy_rate:>8.0f}x")
+
+    topk, topk_seconds = timed(analysis.find_similar_entities, data, args.threshold, args.top_k)
+    print(f"\nThreshold pairs: {len(result['similarity_pairs']):,} in {seconds:.2f}s; "
+          f"top-{args.top_k} pairs: {len(topk['similarity_pairs']):,} in {topk_seconds:.2f}s")
+    print("Vectorized outputs match the reference on the sample.")
+
+
+if __name__ == "__main__":
+    main()
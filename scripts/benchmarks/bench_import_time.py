@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Entry-Point Import Time Benchmark
+
+Imports every bin/ entry point in a fresh interpreter (so nothing is already
+cached in sys.modules) and reports its cold-start time, the heaviest top-level
+packages it pulled in (from `python -X importtime`), and any heavy optional
+backend from scripts/utils/backends.py that was imported eagerly. Each script
+is imported as a module, so only module-level work is measured, not main().
+
+Exits with status 1 when an entry point exceeds the budget or imports a heavy
+backend at import time, or fails to import (unless --allow-broken, which
+reports broken entry points without failing the run).
+
+Usage:
+    python scripts/benchmarks/bench_import_time.py
+    python scripts/benchmarks/bench_import_time.py --budget 0.8 --repeat 5 --top 3
+    python scripts/benchmarks/bench_import_time.py --allow-broken
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.utils.backends import BACKENDS  # noqa: E402
+
+BIN_DIR = PROJECT_ROOT / "bin"
+RESULT_MARKER = "@@import-time@@"
+
+# Runs in the child interpreter: import one entry point and report what it cost
+CHILD = """
+import importlib, json, sys, time
+sys.path[:0] = [{root!r}, {bin!r}]
+heavy = {heavy!r}
+start = time.perf_counter()
+try:
+    importlib.import_module({name!r})
+    error = None
+except BaseException as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+seconds = time.perf_counter() - start
+loaded = [module for module in heavy if module in sys.modules]
+print({marker!r} + json.dumps({{"seconds": seconds, "error": error, "heavy": loaded}}))
+"""
+
+
+def entry_points() -> List[str]:
+    return sorted(path.stem for path in BIN_DIR.glob("*.py") if not path.name.startswith("_"))
+
+
+def interpreter_startup_modules() -> Set[str]:
+    """Modules a bare interpreter imports before any script runs (site, encodings, ...)"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], capture_output=True, text=True)
+    return {line.rsplit("|", 1)[1].strip() for line in proc.stderr.splitlines() if line.startswith("import time:")}
+
+
+def top_packages(importtime_log: str, top: int, skip: Set[str]) -> List[Tuple[str, float]]:
+    """Top-level packages by cumulative import time (seconds) from -X importtime output"""
+    packages = []
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, raw_name = line[len("import time:"):].split("|")
+        # Nested imports are indented further; keep the ones made directly by the entry point
+        if not cumulative.strip().isdigit() or len(raw_name) - len(raw_name.lstrip()) != 1:
+            continue
+        if raw_name.strip() not in skip:
+            packages.append((raw_name.strip(), int(cumulative) / 1e6))
+    return sorted(packages, key=lambda item: item[1], reverse=True)[:top]
+
+
+def measure(name: str, repeat: int, top: int, skip: Set[str]) -> Dict[str, Any]:
+    """Best-of-`repeat` cold import time of one entry point"""
+    code = CHILD.format(root=str(PROJECT_ROOT), bin=str(BIN_DIR), name=name, marker=RESULT_MARKER,
+                        heavy=sorted({backend.module for backend in BACKENDS.values()}))
+    best: Dict[str, Any] = {}
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True)
+        lines = [line for line in proc.stdout.splitlines() if line.startswith(RESULT_MARKER)]
+        if not lines:
+            return {"seconds": None, "error": f"child exited with status {proc.returncode}", "heavy": [],
+                    "packages": []}
+        result = json.loads(lines[-1][len(RESULT_MARKER):])
+        result["packages"] = top_packages(proc.stderr, top, skip)
+        if not best or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time of the bin/ entry points")
+    parser.add_argument('--budget', type=float, default=1.0, help="Maximum import time per entry point (s)")
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh interpreters per entry point (best is kept)")
+    parser.add_argument('--top', type=int, default=3, help="Heaviest top-level imports to list")
+    parser.add_argument('--allow-broken', action='store_true',
+                        help="Report entry points that fail to import without failing the run")
+    args = parser.parse_args()
+
+    print(f"Cold import of bin/ entry points (best of {args.repeat}, budget {args.budget:.2f}s)\n")
+    print(f"{'entry point':<22} {'seconds':>8}  heaviest imports")
+
+    startup = interpreter_startup_modules()
+    failures = []
+    broken = []
+    for name in entry_points():
+        result = measure(name, args.repeat, args.top, startup)
+        if result["error"]:
+            status = "" if args.allow_broken else "  ❌ import failed"
+            print(f"{name:<22} {'error':>8}  {result['error']}{status}")
+            broken.append(name)
+            continue
+        heaviest = ", ".join(f"{package} {seconds:.2f}s" for package, seconds in result["packages"])
+        status = ""
+        if result["seconds"] > args.budget:
+            status = "  ❌ over budget"
+            failures.append(name)
+        if result["heavy"]:
+            status += f"  ❌ eager backends: {', '.join(result['heavy'])}"
+            failures.append(name)
+        print(f"{name:<22} {result['seconds']:>8.3f}  {heaviest}{status}")
+
+    if broken and not args.allow_broken:
+        print(f"\n{len(broken)} entry point(s) failed to import (pass --allow-broken to skip them)")
+    if failures:
+        print(f"\n{len(set(failures))} entry point(s) over budget or importing heavy backends eagerly")
+    if failures or (broken and not args.allow_broken):
+        sys.exit(1)
+    skipped = f" ({len(broken)} failed to import and were skipped)" if broken else ""
+    print(f"\nAll entry points within budget{skipped}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Time-Series Violation Analysis Benchmark
+
+Compares analyze_time_series_violations in
+scripts/analysis/ml_tax_structure_analysis.py (events on a DatetimeIndex,
+see scripts/analysis/utils/event_series.py) against the previous
+implementation (per-event fromisoformat and dict counters, kept below as the
+reference) on synthetic violation histories, then times the event_series
+primitives on the full event set.
+
+The reference runs on a sample whose trends, seasonal buckets, lifecycle
+stages and summary must match the new output exactly.
+
+Usage:
+    python scripts/benchmarks/bench_time_series.py
+    python scripts/benchmarks/bench_time_series.py --events 5000000 --legacy-events 500000
+"""
+
+import argparse
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.analysis.ml_tax_structure_analysis import analyze_time_series_violations  # noqa: E402
+from scripts.analysis.utils import event_series  # noqa: E402
+
+VIOLATION_TYPES = ['tax_forfeitures', 'forfeited_entities', 'filing_violations', 'address_violations']
+STATUSES = ['In Existence', 'Forfeited Existence', 'Voluntarily Terminated']
+FIRST_DAY = datetime(1995, 1, 1)
+DAYS = 30 * 365
+
+
+def make_history(events: int, entities: int, seed: int = 0):
+    """Synthetic (entities, violations) in the load_data layout
+
+    Event dates follow a rising rate with a few month-long bursts; a small
+    share use ISO timestamps with 'Z' or offsets, or unparseable strings,
+    as scraped filings do.
+    """
+    rng = np.random.default_rng(seed)
+    days = np.sort(rng.triangular(0, DAYS, DAYS, events).astype(int))
+    for start in rng.integers(0, DAYS - 30, 5):
+        burst = rng.integers(start, start + 30, events // 200)
+        days[rng.integers(0, events, len(burst))] = burst
+    dates = [(FIRST_DAY + timedelta(days=int(d))).date().isoformat() for d in range(DAYS)]
+    styles = rng.random(events)
+    owners = rng.zipf(1.5, events) % entities
+
+    violations: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    kinds = rng.integers(0, len(VIOLATION_TYPES), events)
+    for i in range(events):
+        date = dates[days[i]]
+        if styles[i] < 0.02:
+            date = date + 'T12:00:00Z'
+        elif styles[i] < 0.03:
+            date = date + 'T23:30:00-05:00'
+        elif styles[i] < 0.04:
+            date = date.replace('-', '_')
+        record = {'filing_number': str(800000000 + owners[i]), 'violation_type': VIOLATION_TYPES[kinds[i]]}
+        record['filing_date' if styles[i] < 0.5 else 'effective_date'] = date
+        violations[VIOLATION_TYPES[kinds[i]]].append(record)
+
+    entities_list = []
+    for i in range(entities):
+        history = [{'filing_type': 'Tax Forfeiture'}] if i % 7 == 0 else []
+        if i % 14 == 0:
+            history.append({'filing_type': 'Reinstatement'})
+        entities_list.append({
+            'filing_number': str(800000000 + i),
+            'original_filing_date': dates[rng.integers(0, DAYS)] if i % 10 else None,
+            'status': STATUSES[i % len(STATUSES)],
+            'filing_history': history,
+        })
+    return entities_list, dict(violations)
+
+
+# Reference implementation (previous analyze_time_series_violations, predictions omitted)
+
+def legacy_analyze_time_series_violations(entities: List[Dict[str, Any]],
+                                          violations: Dict[str, List]) -> Dict[str, Any]:
+    violation_dates = []
+    violation_by_month = defaultdict(int)
+    violation_by_year = defaultdict(int)
+    for violation_type, violation_list in violations.items():
+        for violation in violation_list:
+            date_str = violation.get('filing_date') or violation.get('effective_date')
+            if date_str:
+                try:
+                    if isinstance(date_str, str):
+                        violation_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+                    else:
+                        continue
+                    violation_dates.append(violation_date)
+                    violation_by_month[violation_date.strftime('%Y-%m')] += 1
+                    violation_by_year[violation_date.year] += 1
+                except Exception:
+                    continue
+
+    trends = {}
+    if len(violation_by_year) > 1:
+        years = sorted(violation_by_year.keys())
+        counts = [violation_by_year[y] for y in years]
+        trend_slope = (counts[-1] - counts[0]) / len(counts)
+        trends['yearly_trend'] = {
+            'slope': float(trend_slope),
+            'direction': 'increasing' if trend_slope > 0 else 'decreasing' if trend_slope < 0 else 'stable',
+            'years': years,
+            'counts': counts
+        }
+
+    monthly_patterns = {}
+    if violation_by_month:
+        months = sorted(violation_by_month.keys())
+        monthly_patterns = {
+            'months': months,
+            'counts': [violation_by_month[m] for m in months],
+            'month_numbers': [int(m.split('-')[1]) for m in months]
+        }
+
+    lifecycle_stages = defaultdict(int)
+    lifecycle_transitions = []
+    for entity in entities:
+        filing_date_str = entity.get('original_filing_date')
+        status = entity.get('status', '').lower()
+        if filing_date_str:
+            try:
+                days_existed = (datetime.now() - datetime.fromisoformat(filing_date_str)).days
+                if 'forfeited' in status:
+                    lifecycle_stages['forfeited'] += 1
+                elif days_existed < 365:
+                    lifecycle_stages['new'] += 1
+                elif days_existed < 1825:
+                    lifecycle_stages['established'] += 1
+                else:
+                    lifecycle_stages['mature'] += 1
+                filing_history = entity.get('filing_history', [])
+                if (any('Tax Forfeiture' in str(f) for f in filing_history)
+                        and any('Reinstatement' in str(f) for f in filing_history)):
+                    lifecycle_transitions.append({
+                        'entity_id': entity.get('filing_number'),
+                        'pattern': 'forfeiture_reinstatement'
+                    })
+            except Exception:
+                pass
+
+    return {
+        'violation_trends': trends,
+        'seasonal_patterns': monthly_patterns,
+        'lifecycle_analysis': {
+            'stages': dict(lifecycle_stages),
+            'transitions': lifecycle_transitions,
+            'forfeiture_reinstatement_count': len(lifecycle_transitions)
+        },
+        'summary': {
+            'total_violations_over_time': len(violation_dates),
+            'violation_months': len(violation_by_month),
+            'violation_years': len(violation_by_year),
+            'entities_in_lifecycle': sum(lifecycle_stages.values())
+        }
+    }
+
+
+def check_results(expected: Dict[str, Any], actual: Dict[str, Any]):
+    for key in ('violation_trends', 'seasonal_patterns', 'summary'):
+        assert expected[key] == actual[key], f"{key} differs"
+    expected_lifecycle, actual_lifecycle = expected['lifecycle_analysis'], actual['lifecycle_analysis']
+    assert expected_lifecycle['transitions'] == actual_lifecycle['transitions'], "lifecycle transitions differ"
+    assert sorted(expected_lifecycle['stages'].items()) == sorted(actual_lifecycle['stages'].items()), \
+        "lifecycle stages differ"
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dict-counter vs DatetimeIndex violation time series")
+    parser.add_argument('--events', type=int, default=2_000_000, help="Synthetic violation events")
+    parser.add_argument('--entities', type=int, default=50_000, help="Synthetic entities owning the events")
+    parser.add_argument('--legacy-events', type=int, default=200_000,
+                        help="Events for the reference implementation (a sample suffices)")
+    args = parser.parse_args()
+
+    entities, violations = make_history(args.events, args.entities)
+    sample_entities, sample_violations = make_history(args.legacy_events, args.entities, seed=1)
+    print(f"Synthetic events: {args.events:,} over {args.entities:,} entities "
+          f"(reference on {args.legacy_events:,})\n")
+
+    expected, legacy_seconds = timed(legacy_analyze_time_series_violations, sample_entities, sample_violations)
+    actual, _ = timed(analyze_time_series_violations, sample_entities, sample_violations)
+    check_results(expected, actual)
+    _, sample_seconds = timed(analyze_time_series_violations, sample_entities, sample_violations)
+    print(f"{'analyze_time_series':<22} {args.legacy_events / legacy_seconds:>12,.0f} ev/s (reference) "
+          f"{args.legacy_events / sample_seconds:>12,.0f} ev/s {legacy_seconds / sample_seconds:>7.1f}x")
+
+    result, seconds = timed(analyze_time_series_violations, entities, violations)
+    print(f"{'full run':<22} {args.events / seconds:>12,.0f} ev/s ({seconds:.2f}s for {args.events:,} events)\n")
+
+    events, seconds = timed(event_series.violation_events, violations)
+    print(f"{'stage':<22} {'seconds':>8}")
+    print(f"{'violation_events':<22} {seconds:>8.2f}")
+    monthly, seconds = timed(event_series.period_counts, events, "MS")
+    print(f"{'period_counts':<22} {seconds:>8.2f}")
+    per_entity, seconds = timed(event_series.period_counts, events, "YS", by="entity")
+    print(f"{'period_counts by year':<22} {seconds:>8.2f}")
+    _, seconds = timed(event_series.rolling_stats, monthly)
+    print(f"{'rolling_stats':<22} {seconds:>8.2f}")
+    bursts, seconds = timed(event_series.detect_bursts, monthly)
+    print(f"{'detect_bursts':<22} {seconds:>8.2f}")
+    shifts, seconds = timed(event_series.change_points, monthly)
+    print(f"{'change_points':<22} {seconds:>8.2f}")
+    lags, seconds = timed(event_series.lag_features, events)
+    print(f"{'lag_features':<22} {seconds:>8.2f}")
+
+    print(f"\n{len(monthly)} months, {len(per_entity):,} entity-years, {len(bursts)} bursts, "
+          f"{len(shifts)} change points, {len(lags):,} entities with lags, "
+          f"{result['entity_activity']['repeat_violators']:,} repeat violators")
+    print("Trends, seasonal buckets, lifecycle stages and summary match the reference on the sample.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Validation Throughput Benchmark
+
+Compares the columnar validators in bin/validate_data.py against the previous
+row-wise implementation (iterrows + df.at, kept below as the reference) on a
+synthetic license table. The row-wise versions run on a smaller sample, whose
+outputs must match the columnar ones; their throughput is reported in rows/s.
+
+Usage:
+    python scripts/benchmarks/bench_validate_data.py
+    python scripts/benchmarks/bench_validate_data.py --rows 200000 --legacy-rows 20000
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "bin"))
+
+import validate_data  # noqa: E402
+
+STATES = ['VA', 'TX', 'MD', 'DC', 'NC', 'FL', None]
+STREETS = ['Main St', 'Oak Avenue', 'Market Rd', 'Elm Dr', 'Park Blvd', 'Suite 200', 'PO Box 9']
+FIRMS = ['Kettler Inc', 'Bozzuto LLC', 'Acme Management', 'Lariat Co.', 'Greystar, LLC', 'Skidmore']
+
+
+def make_license_table(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic cleaned-license table with realistic defects and duplicate rates."""
+    rng = np.random.default_rng(seed)
+
+    license_numbers = pd.Series(rng.integers(100000, 100000 + rows // 3, rows).astype(str), dtype=object)
+    license_numbers[rng.random(rows) < 0.03] = None
+    license_numbers[rng.random(rows) < 0.02] = '12-AB'
+    license_numbers[rng.random(rows) < 0.01] = '0226#011'
+
+    addresses = pd.Series(
+        [f"{n} {STREETS[s]}, Richmond, VA 2{z:04d}" for n, s, z in
+         zip(rng.integers(1, 9999, rows), rng.integers(0, len(STREETS), rows), rng.integers(0, 9999, rows))],
+        dtype=object
+    )
+    addresses[rng.random(rows) < 0.02] = None
+    addresses[rng.random(rows) < 0.02] = 'Unknown'
+
+    days = rng.integers(-40000, 30000, rows)
+    dates = pd.Series((pd.Timestamp('2000-01-01') + pd.to_timedelta(days, unit='D')).strftime('%Y-%m-%d'),
+                      dtype=object)
+    us_style = rng.random(rows) < 0.3
+    dates[us_style] = pd.to_datetime(dates[us_style]).dt.strftime('%m/%d/%Y')
+    dates[rng.random(rows) < 0.02] = None
+    dates[rng.random(rows) < 0.01] = 'not a date'
+    # In-format but past the datetime64[ns] range: must still read as out of range
+    dates[rng.random(rows) < 0.002] = '12/31/9999'
+
+    return pd.DataFrame({
+        'license_number': license_numbers,
+        'name': [FIRMS[i] for i in rng.integers(0, len(FIRMS), rows)],
+        'address': addresses,
+        'state': [STATES[i] for i in rng.integers(0, len(STATES), rows)],
+        'expiration_date': dates,
+    })
+
+
+# Row-wise reference implementation (previous bin/validate_data.py)
+
+def legacy_validate_license_numbers(df):
+    df['license_valid'] = True
+    df['license_format_issue'] = ""
+    for idx, row in df.iterrows():
+        license = row.get('license_number', '')
+        if pd.isna(license) or license == "":
+            df.at[idx, 'license_valid'] = False
+            df.at[idx, 'license_format_issue'] = "Missing license number"
+            continue
+        license = str(license).strip()
+        if len(license) < 6 or len(license) > 15:
+            df.at[idx, 'license_valid'] = False
+            df.at[idx, 'license_format_issue'] = f"Invalid length: {len(license)}"
+        if not re.match(r'^[A-Za-z0-9\s\-]+$', license):
+            df.at[idx, 'license_valid'] = False
+            df.at[idx, 'license_format_issue'] = "Contains invalid characters"
+    return df
+
+
+def legacy_flag_duplicates(df):
+    normalize_text = validate_data.normalize_text
+    df['is_duplicate'] = False
+    df['duplicate_group'] = None
+    df['duplicate_reason'] = ""
+    license_part = df['license_number'].apply(lambda x: normalize_text(str(x)))
+    name_part = df['name'].apply(lambda x: normalize_text(str(x)))
+    address_part = df['address'].apply(lambda x: normalize_text(str(x)))
+    state_part = df['state'].apply(lambda x: normalize_text(str(x)))
+    df['match_key1'] = license_part + "|" + name_part + "|" + state_part
+    df['match_key2'] = name_part + "|" + address_part + "|" + state_part
+
+    dup_groups1 = df[df.groupby('match_key1')['match_key1'].transform('size') > 1].copy()
+    if len(dup_groups1) > 0:
+        dup_groups1['duplicate_group'] = dup_groups1.groupby('match_key1').ngroup() + 1
+        df.loc[dup_groups1.index, 'is_duplicate'] = True
+        df.loc[dup_groups1.index, 'duplicate_group'] = dup_groups1['duplicate_group']
+        df.loc[dup_groups1.index, 'duplicate_reason'] = "Same license number, name, and state"
+    max_dup_group = df['duplicate_group'].max()
+    if pd.isna(max_dup_group):
+        max_dup_group = 0
+    dup_groups2 = df[~df['is_duplicate'] & (df.groupby('match_key2')['match_key2'].transform('size') > 1)].copy()
+    if len(dup_groups2) > 0:
+        dup_groups2['duplicate_group'] = max_dup_group + dup_groups2.groupby('match_key2').ngroup() + 1
+        df.loc[dup_groups2.index, 'is_duplicate'] = True
+        df.loc[dup_groups2.index, 'duplicate_group'] = dup_groups2['duplicate_group']
+        df.loc[dup_groups2.index, 'duplicate_reason'] = "Same name, address, and state (different license)"
+    return df.drop(columns=['match_key1', 'match_key2'])
+
+
+def legacy_validate_addresses(df):
+    df['address_valid'] = True
+    df['address_issue'] = ""
+    for idx, row in df.iterrows():
+        addr = row.get('address', '')
+        if pd.isna(addr) or addr == "":
+            df.at[idx, 'address_valid'] = False
+            df.at[idx, 'address_issue'] = "Missing address"
+            continue
+        addr = str(addr).strip()
+        if len(addr) < 10:
+            df.at[idx, 'address_valid'] = False
+            df.at[idx, 'address_issue'] = "Address too short"
+        has_street = bool(re.search(r'(Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Boulevard|Blvd|Lane|Ln)', addr, re.IGNORECASE))
+        has_city = bool(re.search(r'[A-Z]{2}\s+\d{5}', addr))
+        if not has_street and not has_city:
+            df.at[idx, 'address_valid'] = False
+            df.at[idx, 'address_issue'] = "Missing street or city/state/zip"
+    return df
+
+
+def legacy_validate_dates(df):
+    col = 'expiration_date'
+    df[f'{col}_valid'] = True
+    df[f'{col}_issue'] = ""
+    for idx, row in df.iterrows():
+        date_val = row.get(col)
+        if pd.isna(date_val) or date_val == "":
+            df.at[idx, f'{col}_valid'] = False
+            df.at[idx, f'{col}_issue'] = "Missing date"
+            continue
+        try:
+            parsed_date = pd.to_datetime(date_val)
+            if parsed_date < pd.Timestamp('1900-01-01') or parsed_date > pd.Timestamp('2100-01-01'):
+                df.at[idx, f'{col}_valid'] = False
+                df.at[idx, f'{col}_issue'] = "Date out of reasonable range"
+        except Exception:
+            df.at[idx, f'{col}_valid'] = False
+            df.at[idx, f'{col}_issue'] = "Invalid date format"
+    return df
+
+
+VALIDATORS = [
+    ('validate_license_numbers', legacy_validate_license_numbers, validate_data.validate_license_numbers,
+     ['license_valid', 'license_format_issue']),
+    ('flag_duplicates', legacy_flag_duplicates, validate_data.flag_duplicates,
+     ['is_duplicate', 'duplicate_group', 'duplicate_reason']),
+    ('validate_addresses', legacy_validate_addresses, validate_data.validate_addresses,
+     ['address_valid', 'address_issue']),
+    ('validate_dates', legacy_validate_dates, validate_data.validate_dates,
+     ['expiration_date_valid', 'expiration_date_issue']),
+]
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    result = func(df.copy())
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark row-wise vs columnar validators")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Rows for the columnar validators")
+    parser.add_argument('--legacy-rows', type=int, default=50_000,
+                        help="Rows for the row-wise reference (its cost is linear, so a sample suffices)")
+    args = parser.parse_args()
+
+    table = make_license_table(args.rows)
+    sample = table.iloc[:args.legacy_rows].reset_index(drop=True)
+    print(f"Synthetic license table: {args.rows:,} rows (row-wise reference on {len(sample):,})\n")
+    print(f"{'validator':<26} {'row-wise rows/s':>16} {'columnar rows/s':>16} {'speedup':>9}")
+
+    for name, legacy, columnar, columns in VALIDATORS:
+        expected, legacy_seconds = timed(legacy, sample)
+        actual, _ = timed(columnar, sample)
+        for column in columns:
+            pd.testing.assert_series_equal(
+                expected[column].astype(object), actual[column].astype(object), check_names=False
+            )
+
+        _, columnar_seconds = timed(columnar, table)
+        legacy_rate = len(sample) / legacy_seconds
+        columnar_rate = len(table) / columnar_seconds
+        print(f"{name:<26} {legacy_rate:>16,.0f} {columnar_rate:>16,.0f} {columnar_rate / legacy_rate:>8.0f}x")
+
+    print("\nColumnar outputs match the row-wise reference on the sample.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Lazy Optional Backends
+
+Registry of the heavy optional libraries used by the analysis scripts
+(TensorFlow, FAISS, numba, transformers, UMAP, SHAP, plotly, ...). Nothing is
+imported when this module or its callers are imported; a backend is imported
+the first time it is actually needed and cached for the rest of the process.
+
+    available(name)  installed? (checks the import system, does not import)
+    load(name)       the imported module, or None if it is missing or broken
+    require(name)    the imported module, or ImportError with the pip command
+
+Missing packages are never installed from inside the scripts; install them
+from requirements.txt.
+
+Usage:
+    python scripts/utils/backends.py
+"""
+
+import importlib
+import importlib.util
+import sys
+import threading
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class Backend:
+    """An optional dependency: import name and the pip package that provides it"""
+    module: str
+    package: str
+    purpose: str = ""
+
+
+BACKENDS: Dict[str, Backend] = {
+    "faiss": Backend("faiss", "faiss-cpu", "vector similarity search"),
+    "numba": Backend("numba", "numba", "JIT-compiled similarity kernels"),
+    "sentence_transformers": Backend("sentence_transformers", "sentence-transformers", "text embeddings"),
+    "transformers": Backend("transformers", "transformers", "NER models"),
+    "tensorflow": Backend("tensorflow", "tensorflow", "deep learning"),
+    "umap": Backend("umap", "umap-learn", "UMAP dimensionality reduction"),
+    "shap": Backend("shap", "shap", "SHAP explanations"),
+    "plotly": Backend("plotly", "plotly", "interactive visualizations"),
+    "networkx": Backend("networkx", "networkx", "graph analysis"),
+}
+
+_loaded: Dict[str, Optional[ModuleType]] = {}
+_lock = threading.Lock()
+
+
+def _backend(name: str) -> Backend:
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise KeyError(f"Unknown backend '{name}' (expected one of {', '.join(BACKENDS)})") from None
+
+
+def available(name: str) -> bool:
+    """Whether the backend is importable, without importing it"""
+    backend = _backend(name)
+    if name in _loaded:
+        return _loaded[name] is not None
+    if backend.module in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(backend.module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def load(name: str) -> Optional[ModuleType]:
+    """Import the backend on first use; None if it is not installed or fails to import"""
+    backend = _backend(name)
+    if name in _loaded:
+        return _loaded[name]
+    with _lock:
+        if name not in _loaded:
+            try:
+                _loaded[name] = importlib.import_module(backend.module)
+            except Exception:
+                # Broken installs (e.g. ABI mismatches) raise more than ImportError
+                _loaded[name] = None
+    return _loaded[name]
+
+
+def require(name: str) -> ModuleType:
+    """Import the backend or raise ImportError saying how to install it"""
+    module = load(name)
+    if module is None:
+        backend = _backend(name)
+        purpose = f" for {backend.purpose}" if backend.purpose else ""
+        raise ImportError(f"{backend.module} is required{purpose}; install it with: pip install {backend.package}")
+    return module
+
+
+def main():
+    """Report which optional backends are installed."""
+    for name, backend in BACKENDS.items():
+        status = "✅" if available(name) else "❌"
+        print(f"{status} {name:<22} pip install {backend.package:<22} {backend.purpose}")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,9 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from scripts.utils.paths import PROJECT_ROOT
+from scripts.utils.vector_store import VectorStore, open_store
+from scripts.utils.embedding_cache import CachedEncoder
+from scripts.utils.law_corpus import compile_law_corpus, iter_nodes
 
 try:
     from sentence_transformers import SentenceTransformer
@@ -1101,22 +1104,9 @@ def collect_embedding_tasks(data: Any, path: str = "", tasks: List[Tuple[str, Di
     if tasks is None:
         tasks = []
 
-    if isinstance(data, dict):
-        # Check if this is a jurisdiction entry (has name or description)
-        if "name" in data or "description" in data:
-            tasks.append((path, data))
-
-        # Recursively collect from nested dictionaries
-        for key, value in data.items():
-            if key not in ["embedding", "embedding_text"]:  # Skip already processed embeddings
-                new_path = f"{path}.{key}" if path else key
-                collect_embedding_tasks(value, new_path, tasks)
-
-    elif isinstance(data, list):
-        for i, item in enumerate(data):
-            new_path = f"{path}[{i}]"
-            collect_embedding_tasks(item, new_path, tasks)
-
+    # Jurisdiction entries are the dicts with a name or description
+    tasks.extend((node_path, node) for node_path, node, _, _ in iter_nodes(data, path)
+                 if "name" in node or "description" in node)
     return tasks
 
 
@@ -1136,8 +1126,13 @@ def generate_embeddings_batch(texts_and_paths: List[Tuple[str, str]], model: Sen
     return results
 
 
-def add_embeddings_parallel(data: Dict[str, Any], model: SentenceTransformer, max_workers: int = MAX_WORKERS) -> None:
-    """Add embeddings to jurisdiction data using parallel batch processing (optimized for ARM M4 MAX)"""
+def add_embeddings_parallel(data: Dict[str, Any], model: SentenceTransformer, max_workers: int = MAX_WORKERS,
+                            vector_store: Optional[VectorStore] = None) -> None:
+    """Add embeddings to jurisdiction data using parallel batch processing (optimized for ARM M4 MAX)
+
+    When a vector store is given each embedding is also appended to it (keyed by
+    path) and the item records its row as `embedding_offset`.
+    """
     print(f"📊 Collecting embedding tasks...")
     tasks = collect_embedding_tasks(data)
     total_tasks = len(tasks)
@@ -1194,50 +1189,28 @@ def add_embeddings_parallel(data: Dict[str, Any], model: SentenceTransformer, ma
     print(f"✅ Generated {len(all_results)} embeddings")
     print(f"📝 Applying embeddings to data structure...")
 
-    # Apply embeddings back to data structure
-    def apply_embeddings_recursive(data: Any, path: str = "") -> None:
-        if isinstance(data, dict):
-            if "name" in data or "description" in data:
-                if path in all_results:
-                    embedding, text = all_results[path]
-                    data["embedding"] = embedding
-                    data["embedding_text"] = text
-
-            for key, value in data.items():
-                if key not in ["embedding", "embedding_text"]:
-                    new_path = f"{path}.{key}" if path else key
-                    apply_embeddings_recursive(value, new_path)
-
-        elif isinstance(data, list):
-            for i, item in enumerate(data):
-                new_path = f"{path}[{i}]"
-                apply_embeddings_recursive(item, new_path)
+    # Apply embeddings back to data structure (tasks are in document order)
+    for path, item in tasks:
+        if path in all_results:
+            embedding, text = all_results[path]
+            item["embedding"] = embedding
+            item["embedding_text"] = text
+            if vector_store is not None:
+                item["embedding_offset"] = vector_store.add(path, embedding)
 
-    apply_embeddings_recursive(data)
+    if vector_store is not None:
+        vector_store.flush()
+        print(f"✅ Stored {len(vector_store)} vectors in {vector_store.root}")
     print(f"✅ Applied all embeddings to data structure")
 
 
 def add_embeddings_recursive(data: Dict[str, Any], model: SentenceTransformer, path: str = "") -> None:
-    """Recursively add embeddings to jurisdiction data (legacy sequential version)"""
-    # Process current level
-    if isinstance(data, dict):
-        # Check if this is a jurisdiction entry (has name or description)
-        if "name" in data or "description" in data:
-            text = create_text_for_embedding(data, path)
-            embedding = model.encode(text, normalize_embeddings=True)
-            data["embedding"] = embedding.tolist()
-            data["embedding_text"] = text
-
-        # Recursively process nested dictionaries
-        for key, value in data.items():
-            if key not in ["embedding", "embedding_text"]:  # Skip already processed embeddings
-                new_path = f"{path}.{key}" if path else key
-                add_embeddings_recursive(value, model, new_path)
-
-    elif isinstance(data, list):
-        for i, item in enumerate(data):
-            new_path = f"{path}[{i}]"
-            add_embeddings_recursive(item, model, new_path)
+    """Add embeddings to jurisdiction data one item at a time (legacy sequential version)"""
+    for item_path, item in collect_embedding_tasks(data, path):
+        text = create_text_for_embedding(item, item_path)
+        embedding = model.encode(text, normalize_embeddings=True)
+        item["embedding"] = embedding.tolist()
+        item["embedding_text"] = text
 
 
 def main():
@@ -1256,18 +1229,20 @@ def main():
     print(f"   ✅ Structure created in {structure_time - start_time:.2f}s\n")
 
     print("🤖 Loading embedding model...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+    model = CachedEncoder('all-MiniLM-L6-v2')
     print("✅ Model loaded\n")
 
     print("🚀 Generating embeddings using parallel batch processing...")
     embedding_start = time.time()
-    add_embeddings_parallel(references, model, MAX_WORKERS)
+    ref_dir = PROJECT_ROOT / "ref" / "law"
+    vector_store = open_store(ref_dir / "vectors", dimension=model.get_sentence_embedding_dimension())
+    add_embeddings_parallel(references, model, MAX_WORKERS, vector_store=vector_store)
+    references["metadata"]["vector_store"] = str((ref_dir / "vectors").relative_to(PROJECT_ROOT))
     embedding_time = time.time()
     elapsed = embedding_time - embedding_start
     print(f"   ✅ Embeddings generated in {elapsed:.2f}s\n")
 
     # Create output directory
-    ref_dir = PROJECT_ROOT / "ref" / "law"
     ref_dir.mkdir(parents=True, exist_ok=True)
 
     # Save JSON file
@@ -1279,6 +1254,9 @@ def main():
     save_time = time.time()
     print(f"   ✅ Saved in {save_time - save_start:.2f}s\n")
 
+    print("🗂️  Compiling flat law tables...")
+    compile_law_corpus(output_file)
+
     # Create summary statistics
     def count_embeddings(data: Any) -> int:
         """Count number of embeddings in data"""
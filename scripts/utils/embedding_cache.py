@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Persistent Embedding Cache
+
+Content-addressed on-disk cache for sentence-transformer embeddings, keyed by
+(model name, encode options, normalized text hash) and stored in SQLite with
+size-bounded LRU eviction. `CachedEncoder` is a drop-in replacement for a
+`SentenceTransformer` instance: only texts missing from the cache are sent to
+the model, and the model itself is not loaded until the first miss.
+
+Usage:
+    from scripts.utils.embedding_cache import CachedEncoder
+    model = CachedEncoder('all-MiniLM-L6-v2')
+    embeddings = model.encode(texts, normalize_embeddings=True)
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_MAX_BYTES = 1 << 30  # 1 GiB of vector payload
+CACHE_PATH_ENV = "EMBEDDING_CACHE_PATH"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def default_cache_path() -> Path:
+    """Cache location: $EMBEDDING_CACHE_PATH, else data/cache/embeddings.sqlite in the repo.
+
+    Outside the repository (e.g. inside a service container) falls back to
+    ./cache/embeddings.sqlite.
+    """
+    env_path = os.environ.get(CACHE_PATH_ENV)
+    if env_path:
+        return Path(env_path)
+    try:
+        from scripts.utils.paths import DATA_CACHE_DIR
+    except ImportError:
+        return Path.cwd() / "cache" / "embeddings.sqlite"
+    return DATA_CACHE_DIR / "embeddings.sqlite"
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for hashing: NFC, trimmed, whitespace collapsed."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def text_key(model_name: str, text: str, normalize_embeddings: bool = False) -> str:
+    """Content address for one (model, options, text) combination."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\x00norm=1\x00" if normalize_embeddings else b"\x00norm=0\x00")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed key -> float32 vector cache with LRU eviction by payload size."""
+
+    def __init__(self, path: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path) if path else default_cache_path()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " dimension INTEGER NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        self._conn.commit()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Look up keys; returns only the hits and refreshes their LRU timestamps."""
+        found: Dict[str, np.ndarray] = {}
+        if not keys:
+            return found
+
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            # SQLite limits bound parameters per statement, so query in chunks
+            for start in range(0, len(unique_keys), 900):
+                chunk = unique_keys[start:start + 900]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, dimension, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, dimension, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32, count=dimension)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+        self.hits += len(found)
+        self.misses += len(unique_keys) - len(found)
+        return found
+
+    def put_many(self, model_name: str, keys: Sequence[str], vectors: np.ndarray) -> None:
+        """Insert or replace vectors, then evict least-recently-used rows over budget."""
+        if not len(keys):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        now = time.time()
+        rows = [
+            (key, model_name, int(vectors.shape[1]), vectors[i].tobytes(), now)
+            for i, key in enumerate(keys)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dimension, vector, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            self._evict()
+
+    def _evict(self) -> None:
+        total_bytes, count = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0), COUNT(*) FROM embeddings"
+        ).fetchone()
+        if total_bytes <= self.max_bytes or count == 0:
+            return
+
+        # Drop the oldest rows until the payload is back under 90% of the budget
+        avg_row_bytes = total_bytes / count
+        excess = total_bytes - int(self.max_bytes * 0.9)
+        n_evict = min(count, int(np.ceil(excess / avg_row_bytes)))
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (n_evict,)
+        )
+        self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, payload size and hit/miss counters for this process."""
+        with self._lock:
+            total_bytes, count = self._conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(vector)), 0), COUNT(*) FROM embeddings"
+            ).fetchone()
+        return {
+            'path': str(self.path),
+            'entries': count,
+            'bytes': total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_shared_caches: Dict[str, EmbeddingCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_cache(path: Optional[Path] = None) -> EmbeddingCache:
+    """Process-wide EmbeddingCache for `path` (default location if omitted)."""
+    resolved = str((Path(path) if path else default_cache_path()).resolve())
+    with _shared_caches_lock:
+        cache = _shared_caches.get(resolved)
+        if cache is None:
+            cache = EmbeddingCache(Path(resolved))
+            _shared_caches[resolved] = cache
+        return cache
+
+
+class CachedEncoder:
+    """Drop-in `SentenceTransformer` wrapper whose `encode()` consults the cache first.
+
+    Accepts either a model name (loaded lazily on the first cache miss) or an
+    already-constructed model. Attributes other than `encode` are delegated to the
+    underlying model.
+    """
+
+    def __init__(self, model: Union[str, Any] = DEFAULT_MODEL, cache: Optional[EmbeddingCache] = None,
+                 model_name: Optional[str] = None):
+        if isinstance(model, str):
+            self.model_name = model_name or model
+            self._model = None
+        else:
+            self.model_name = model_name or _model_name_of(model)
+            self._model = model
+        self.cache = cache if cache is not None else get_cache()
+        self._model_lock = threading.Lock()
+
+    @property
+    def model(self) -> Any:
+        """Underlying SentenceTransformer, loaded on first access."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def encode(self, sentences: Union[str, List[str]], normalize_embeddings: bool = False,
+               convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        """Encode texts, running the model only on cache misses.
+
+        Mirrors `SentenceTransformer.encode`: a single string returns a 1-D array,
+        a list returns an (n, dimension) float32 array.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        keys = [text_key(self.model_name, text, normalize_embeddings) for text in texts]
+        cached = self.cache.get_many(keys)
+
+        # Encode each distinct missing text once
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        if missing:
+            missing_keys = list(missing)
+            encoded = self.model.encode(
+                [missing[key] for key in missing_keys],
+                normalize_embeddings=normalize_embeddings,
+                convert_to_numpy=True,
+                **kwargs
+            )
+            encoded = np.asarray(encoded, dtype=np.float32)
+            self.cache.put_many(self.model_name, missing_keys, encoded)
+            for i, key in enumerate(missing_keys):
+                cached[key] = encoded[i]
+
+        result = np.stack([cached[key] for key in keys]).astype(np.float32, copy=False)
+        return result[0] if single else result
+
+
+def _model_name_of(model: Any) -> str:
+    """Best-effort model identifier for a constructed SentenceTransformer."""
+    for attr in ("model_name", "model_name_or_path", "_model_name"):
+        name = getattr(model, attr, None)
+        if isinstance(name, str) and name:
+            return name
+    card = getattr(model, "model_card_data", None)
+    base = getattr(card, "base_model", None) if card is not None else None
+    return base or DEFAULT_MODEL
+
+
+def main():
+    """Print cache statistics."""
+    import sys
+    PROJECT_ROOT = Path(__file__).parent.parent.parent
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+    stats = get_cache().stats()
+    print(f"Embedding cache: {stats['path']}")
+    print(f"  Entries: {stats['entries']}")
+    print(f"  Size: {stats['bytes'] / 1e6:.1f} MB / {stats['max_bytes'] / 1e6:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
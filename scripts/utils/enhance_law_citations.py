@@ -18,6 +18,7 @@ PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from scripts.utils.paths import PROJECT_ROOT
+from scripts.utils.embedding_cache import CachedEncoder
 
 try:
     from sentence_transformers import SentenceTransformer
@@ -228,7 +229,7 @@ def main():
     print(f"✅ Loaded law references\n")
 
     print("🤖 Loading embedding model...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+    model = CachedEncoder('all-MiniLM-L6-v2')
     print("✅ Model loaded\n")
 
     print("🚀 Generating ground truth embeddings for full law citations...")
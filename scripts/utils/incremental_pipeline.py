@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Incremental Pipeline Runner
+
+Dependency-aware step runner used by bin/run_pipeline.py. Each step declares
+the files it reads and writes (paths or glob patterns relative to the project
+root). Before running, the runner fingerprints the inputs and outputs and skips
+any step whose fingerprints match the last successful run. Steps whose
+dependencies are satisfied run concurrently.
+
+File hashes are cached alongside (size, mtime) in the state file, so an
+unchanged tree is fingerprinted from `stat()` alone without re-reading content.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from scripts.utils.paths import PROJECT_ROOT, DATA_CACHE_DIR
+
+STATE_FILE = DATA_CACHE_DIR / "pipeline_state.json"
+STATE_VERSION = 1
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class PipelineStep:
+    """One unit of pipeline work with declared file inputs, outputs and dependencies.
+
+    Args:
+        name: Unique step name
+        func: Callable returning True on success
+        inputs: Paths or glob patterns (relative to project root) the step reads
+        outputs: Paths or glob patterns the step writes
+        depends_on: Names of steps that must finish first
+        required: Stop scheduling further steps if this one fails
+        always_run: Never skip (for steps with undeclared external inputs)
+    """
+
+    def __init__(self, name: str, func: Callable[[], bool],
+                 inputs: Sequence[str] = (), outputs: Sequence[str] = (),
+                 depends_on: Sequence[str] = (), required: bool = False,
+                 always_run: bool = False):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.depends_on = list(depends_on)
+        self.required = required
+        self.always_run = always_run
+
+
+def expand_patterns(patterns: Iterable[str], root: Path = PROJECT_ROOT) -> List[Path]:
+    """Resolve paths/globs to a sorted list of existing files."""
+    files = set()
+    for pattern in patterns:
+        if any(ch in pattern for ch in "*?["):
+            files.update(p for p in root.glob(pattern) if p.is_file())
+        else:
+            path = root / pattern
+            if path.is_file():
+                files.add(path)
+            elif path.is_dir():
+                files.update(p for p in path.rglob("*") if p.is_file())
+    return sorted(files)
+
+
+class FileFingerprinter:
+    """Content hashes keyed by path, reused while (size, mtime_ns) is unchanged."""
+
+    def __init__(self, cache: Optional[Dict[str, Any]] = None):
+        self.cache: Dict[str, Any] = cache if cache is not None else {}
+        self._lock = threading.Lock()
+
+    def file_hash(self, path: Path) -> str:
+        stat = path.stat()
+        key = str(path)
+        with self._lock:
+            cached = self.cache.get(key)
+        if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+            return cached['hash']
+
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        file_hash = digest.hexdigest()
+
+        with self._lock:
+            self.cache[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': file_hash}
+        return file_hash
+
+    def fingerprint(self, patterns: Iterable[str], root: Path = PROJECT_ROOT) -> str:
+        """Combined hash of every file matched by `patterns` (empty match is a valid state)."""
+        digest = hashlib.blake2b(digest_size=16)
+        for path in expand_patterns(patterns, root):
+            digest.update(os.path.relpath(path, root).encode('utf-8'))
+            digest.update(self.file_hash(path).encode('ascii'))
+        return digest.hexdigest()
+
+
+class IncrementalRunner:
+    """Schedules PipelineSteps as a DAG, skipping steps whose fingerprints are unchanged."""
+
+    def __init__(self, steps: Sequence[PipelineStep], state_file: Path = STATE_FILE,
+                 max_workers: Optional[int] = None, force: bool = False):
+        self.steps = {step.name: step for step in steps}
+        self.order = [step.name for step in steps]
+        self.state_file = Path(state_file)
+        self.max_workers = max_workers or min(4, len(steps)) or 1
+        self.force = force
+
+        for step in steps:
+            unknown = [dep for dep in step.depends_on if dep not in self.steps]
+            if unknown:
+                raise ValueError(f"Step '{step.name}' depends on unknown steps: {unknown}")
+
+        self.state = self._load_state()
+        self.fingerprinter = FileFingerprinter(self.state.setdefault('files', {}))
+
+    def _load_state(self) -> Dict[str, Any]:
+        if self.state_file.exists():
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                if state.get('version') == STATE_VERSION:
+                    return state
+            except (json.JSONDecodeError, OSError):
+                pass
+        return {'version': STATE_VERSION, 'steps': {}, 'files': {}}
+
+    def _save_state(self) -> None:
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.state_file.with_suffix('.json.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+    def _is_fresh(self, step: PipelineStep) -> bool:
+        if self.force or step.always_run:
+            return False
+        record = self.state['steps'].get(step.name)
+        if not record:
+            return False
+        return (record.get('inputs') == self.fingerprinter.fingerprint(step.inputs) and
+                record.get('outputs') == self.fingerprinter.fingerprint(step.outputs))
+
+    def _execute(self, step: PipelineStep) -> Dict[str, Any]:
+        """Run (or skip) one step and return its result record."""
+        if self._is_fresh(step):
+            return {'status': 'skipped', 'success': True, 'seconds': 0.0}
+
+        start = time.perf_counter()
+        try:
+            success = bool(step.func())
+        except Exception as e:
+            print(f"✗ {step.name} raised: {e}\n")
+            success = False
+        elapsed = time.perf_counter() - start
+
+        if success:
+            # Fingerprint inputs after the run too, so files a step rewrites itself do not retrigger it
+            self.state['steps'][step.name] = {
+                'inputs': self.fingerprinter.fingerprint(step.inputs),
+                'outputs': self.fingerprinter.fingerprint(step.outputs),
+                'completed': time.time(),
+                'seconds': round(elapsed, 3),
+            }
+        else:
+            self.state['steps'].pop(step.name, None)
+        return {'status': 'ran' if success else 'failed', 'success': success, 'seconds': elapsed}
+
+    def run(self) -> Dict[str, Dict[str, Any]]:
+        """Execute the DAG; returns per-step {'status', 'success', 'seconds'}."""
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = list(self.order)
+        running = {}
+        halted = False
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if not halted:
+                    for name in list(pending):
+                        step = self.steps[name]
+                        if all(dep in results for dep in step.depends_on):
+                            pending.remove(name)
+                            running[executor.submit(self._execute, step)] = name
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    if not results[name]['success'] and self.steps[name].required:
+                        print(f"Pipeline stopped due to {name.lower()} failure.")
+                        halted = True
+
+        for name in pending:
+            results[name] = {'status': 'not run', 'success': False, 'seconds': 0.0}
+
+        self._save_state()
+        return results
+
+
+def print_run_summary(results: Dict[str, Dict[str, Any]], elapsed: float) -> None:
+    """Print one line per step plus the total wall time."""
+    print("Step results:")
+    for name, result in results.items():
+        print(f"  {name:<24} {result['status']:<8} {result['seconds']:.2f}s")
+    print(f"Total: {elapsed:.2f}s")
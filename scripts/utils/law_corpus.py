@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Compiled Law Corpus
+
+Flattens the nested ref/law/jurisdiction_references.json tree once into flat
+tables, so analyses join against rows instead of re-walking the tree with
+string-built paths. The compiled corpus lives in data/cache/law_corpus:
+
+    law_corpus.sqlite       tables laws, forms, penalties, enforcement, meta
+    vectors/                VectorStore of `embedding` vectors (laws.vector_offset)
+    ground_truth_vectors/   VectorStore of `ground_truth_embedding` vectors
+                            (laws.ground_truth_offset)
+
+Every dict in the tree that carries at least one non-dict value (a law, a form,
+the metadata block) is a row of `laws`. Ids are assigned in document
+(pre-order) order, so they are stable for an unchanged tree, and `path` is the
+same dotted/indexed path the recursive walkers used (e.g.
+"federal.criminal.title_18.reporting_forms[0]"). The corpus is recompiled
+automatically when the source file changes.
+
+Usage:
+    python scripts/utils/law_corpus.py compile
+    python scripts/utils/law_corpus.py info
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.utils.paths import PROJECT_ROOT, DATA_CACHE_DIR
+from scripts.utils.vector_store import VectorStore
+
+FORMAT_VERSION = 2
+LAW_REFERENCES_FILE = PROJECT_ROOT / "ref" / "law" / "jurisdiction_references.json"
+CORPUS_DIR = DATA_CACHE_DIR / "law_corpus"
+DB_FILENAME = "law_corpus.sqlite"
+VECTORS_DIRNAME = "vectors"
+GROUND_TRUTH_VECTORS_DIRNAME = "ground_truth_vectors"
+
+# Keys holding vectors/derived text; never descended into and stripped from `fields`
+EMBEDDING_KEYS = ("embedding", "embedding_text", "embedding_offset",
+                  "ground_truth_embedding", "ground_truth_text")
+
+PENALTY_KEYWORDS = [
+    "fine", "penalty", "imprisonment", "misdemeanor", "felony",
+    "criminal", "civil penalty", "monetary", "sentence", "jail",
+    "prison", "restitution", "damages", "punitive", "sanction"
+]
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE laws (
+    law_id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    parent_id INTEGER NOT NULL,
+    parent_path TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    name TEXT, description TEXT, url TEXT, relevance TEXT, agency TEXT,
+    key_sections TEXT,
+    fields TEXT,
+    embedding_text TEXT,
+    ground_truth_text TEXT,
+    vector_offset INTEGER NOT NULL,
+    ground_truth_offset INTEGER NOT NULL
+);
+CREATE TABLE forms (
+    form_id INTEGER PRIMARY KEY,
+    law_id INTEGER NOT NULL,
+    node_id INTEGER NOT NULL,
+    form_index INTEGER NOT NULL,
+    law_path TEXT NOT NULL,
+    law_name TEXT,
+    form_name TEXT, form_number TEXT, agency TEXT, url TEXT, description TEXT, form_type TEXT,
+    fields TEXT
+);
+CREATE TABLE penalties (
+    penalty_id INTEGER PRIMARY KEY,
+    law_id INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    keyword TEXT,
+    law_name TEXT, description TEXT, url TEXT,
+    key_sections TEXT
+);
+CREATE TABLE enforcement (
+    enforcement_id INTEGER PRIMARY KEY,
+    law_id INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    agency TEXT,
+    law_name TEXT
+);
+CREATE INDEX forms_law ON forms(law_id);
+CREATE INDEX penalties_law ON penalties(law_id);
+CREATE INDEX enforcement_law ON enforcement(law_id);
+"""
+
+JSON_COLUMNS = ("key_sections", "fields")
+
+
+def iter_nodes(data: Any, path: str = "", parent_path: str = "",
+               depth: int = 0) -> Iterator[Tuple[str, Dict[str, Any], str, int]]:
+    """Yield (path, dict, parent dict path, depth) for every dict in pre-order.
+
+    This is the single tree walk behind the compiled tables; embedding keys are
+    not descended into. `parent_path` is the path of the enclosing dict (list
+    levels are skipped).
+    """
+    if isinstance(data, dict):
+        yield path, data, parent_path, depth
+        for key, value in data.items():
+            if key not in EMBEDDING_KEYS:
+                yield from iter_nodes(value, f"{path}.{key}" if path else key, path, depth + 1)
+    elif isinstance(data, list):
+        for i, item in enumerate(data):
+            yield from iter_nodes(item, f"{path}[{i}]", parent_path, depth)
+
+
+def is_entry(node: Dict[str, Any]) -> bool:
+    """A dict that carries data of its own rather than only nesting other dicts"""
+    return any(not isinstance(value, dict) for value in node.values())
+
+
+def strip_embeddings(value: Any) -> Any:
+    """`value` with EMBEDDING_KEYS removed from every dict at any depth"""
+    if isinstance(value, dict):
+        return {key: strip_embeddings(item) for key, item in value.items() if key not in EMBEDDING_KEYS}
+    if isinstance(value, list):
+        return [strip_embeddings(item) for item in value]
+    return value
+
+
+def node_fields(node: Dict[str, Any]) -> Dict[str, Any]:
+    """The node's data, nested dicts and forms included, with embeddings stripped at every depth"""
+    return strip_embeddings(node)
+
+
+def penalty_keyword(node: Dict[str, Any]) -> Optional[str]:
+    """First penalty keyword in the node's name, description or relevance"""
+    text = f"{node.get('name', '')} {node.get('description', '')} {node.get('relevance', '')}".lower()
+    for keyword in PENALTY_KEYWORDS:
+        if keyword in text:
+            return keyword
+    return None
+
+
+def source_stamp(law_file: Path) -> Dict[str, Any]:
+    stat = Path(law_file).stat()
+    return {"source": str(Path(law_file).resolve()), "source_size": stat.st_size,
+            "source_mtime_ns": stat.st_mtime_ns}
+
+
+class LawCorpus:
+    """Compiled law tables; rows are dicts keyed by column name"""
+
+    def __init__(self, laws: Optional[List[Dict[str, Any]]] = None,
+                 forms: Optional[List[Dict[str, Any]]] = None,
+                 penalties: Optional[List[Dict[str, Any]]] = None,
+                 enforcement: Optional[List[Dict[str, Any]]] = None,
+                 vectors: Optional[np.ndarray] = None,
+                 ground_truth_vectors: Optional[np.ndarray] = None,
+                 meta: Optional[Dict[str, str]] = None):
+        self.laws = laws or []
+        self.forms = forms or []
+        self.penalties = penalties or []
+        self.enforcement = enforcement or []
+        self.vectors = vectors if vectors is not None else np.empty((0, 0), dtype=np.float32)
+        self.ground_truth_vectors = (ground_truth_vectors if ground_truth_vectors is not None
+                                     else np.empty((0, 0), dtype=np.float32))
+        self.meta = meta or {}
+        self._forms_by_law: Optional[Dict[int, List[Dict[str, Any]]]] = None
+
+    @classmethod
+    def open(cls, corpus_dir: Path = CORPUS_DIR) -> "LawCorpus":
+        """Read a compiled corpus; vectors are memory-mapped"""
+        corpus_dir = Path(corpus_dir)
+        conn = sqlite3.connect(str(corpus_dir / DB_FILENAME))
+        conn.row_factory = sqlite3.Row
+        try:
+            tables = {}
+            for table, key in (("laws", "law_id"), ("forms", "form_id"),
+                               ("penalties", "penalty_id"), ("enforcement", "enforcement_id")):
+                rows = []
+                for row in conn.execute(f"SELECT * FROM {table} ORDER BY {key}"):
+                    record = dict(row)
+                    for column in JSON_COLUMNS:
+                        if column in record:
+                            record[column] = json.loads(record[column]) if record[column] else []
+                    rows.append(record)
+                tables[table] = rows
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        finally:
+            conn.close()
+
+        return cls(tables["laws"], tables["forms"], tables["penalties"], tables["enforcement"],
+                   VectorStore(corpus_dir / VECTORS_DIRNAME).matrix(),
+                   VectorStore(corpus_dir / GROUND_TRUTH_VECTORS_DIRNAME).matrix(),
+                   meta)
+
+    def __len__(self) -> int:
+        return len(self.laws)
+
+    def forms_of(self, law_id: int) -> List[Dict[str, Any]]:
+        """Reporting forms attached to a law, in document order"""
+        if self._forms_by_law is None:
+            self._forms_by_law = {}
+            for form in self.forms:
+                self._forms_by_law.setdefault(form["law_id"], []).append(form)
+        return self._forms_by_law.get(law_id, [])
+
+    def embedding(self, law: Dict[str, Any]) -> Optional[np.ndarray]:
+        """The law's `embedding` vector (a memmap view), or None"""
+        offset = law["vector_offset"]
+        return self.vectors[offset] if offset >= 0 else None
+
+    def ground_truth_embedding(self, law: Dict[str, Any]) -> Optional[np.ndarray]:
+        """The law's `ground_truth_embedding` vector (a memmap view), or None"""
+        offset = law["ground_truth_offset"]
+        return self.ground_truth_vectors[offset] if offset >= 0 else None
+
+    def preferred_embedding(self, law: Dict[str, Any]) -> Optional[Tuple[np.ndarray, str, bool]]:
+        """(vector, text, is_ground_truth), preferring the ground-truth embedding; None if neither exists"""
+        if law["ground_truth_offset"] >= 0:
+            return self.ground_truth_embedding(law), law["ground_truth_text"], True
+        if law["vector_offset"] >= 0:
+            return self.embedding(law), law["embedding_text"], False
+        return None
+
+
+def compile_tables(data: Dict[str, Any]) -> Tuple[Dict[str, List[Dict[str, Any]]], List[Tuple[str, Any]],
+                                                  List[Tuple[str, Any]]]:
+    """Flatten the tree; returns (tables, embedding rows, ground-truth rows) with rows as (path, vector)"""
+    laws, forms, penalties, enforcement = [], [], [], []
+    vectors: List[Tuple[str, Any]] = []
+    ground_truth_vectors: List[Tuple[str, Any]] = []
+    law_ids: Dict[str, int] = {}
+    # Every dict path -> id of the nearest entry at or above it (containers have no row)
+    nearest_entry: Dict[str, int] = {}
+
+    for path, node, parent_path, depth in iter_nodes(data):
+        parent_id = nearest_entry.get(parent_path, -1) if path else -1
+        if not is_entry(node):
+            nearest_entry[path] = parent_id
+            continue
+        law_id = len(laws)
+        law_ids[path] = law_id
+        nearest_entry[path] = law_id
+
+        vector_offset = -1
+        if "embedding" in node and "embedding_text" in node:
+            vector_offset = len(vectors)
+            vectors.append((path, node["embedding"]))
+        ground_truth_offset = -1
+        if "ground_truth_embedding" in node and "ground_truth_text" in node:
+            ground_truth_offset = len(ground_truth_vectors)
+            ground_truth_vectors.append((path, node["ground_truth_embedding"]))
+
+        laws.append({
+            "law_id": law_id, "path": path, "parent_id": parent_id, "parent_path": parent_path,
+            "depth": depth,
+            "name": node.get("name", ""), "description": node.get("description", ""),
+            "url": node.get("url", ""), "relevance": node.get("relevance", ""),
+            "agency": node.get("agency", ""),
+            "key_sections": node.get("key_sections", []),
+            "fields": node_fields(node),
+            "embedding_text": node.get("embedding_text", ""),
+            "ground_truth_text": node.get("ground_truth_text", ""),
+            "vector_offset": vector_offset, "ground_truth_offset": ground_truth_offset,
+        })
+
+        for form_index, form in enumerate(node.get("reporting_forms") or []):
+            if not isinstance(form, dict):
+                continue
+            forms.append({
+                "form_id": len(forms), "law_id": law_id,
+                "node_id": -1,  # Filled in below once the form's own row exists
+                "form_index": form_index, "law_path": path, "law_name": node.get("name", ""),
+                "form_name": form.get("form_name", ""), "form_number": form.get("form_number", ""),
+                "agency": form.get("agency", ""), "url": form.get("url", ""),
+                "description": form.get("description", ""), "form_type": form.get("form_type", ""),
+                "fields": node_fields(form),
+            })
+
+        keyword = penalty_keyword(node)
+        if keyword:
+            description = node.get("description", "").lower()
+            penalties.append({
+                "penalty_id": len(penalties), "law_id": law_id, "path": path, "keyword": keyword,
+                "law_name": node.get("name", ""), "description": description[:200],
+                "url": node.get("url", ""), "key_sections": node.get("key_sections", []),
+            })
+
+        if "agency" in node:
+            enforcement.append({
+                "enforcement_id": len(enforcement), "law_id": law_id, "path": path,
+                "agency": node["agency"], "law_name": node.get("name", ""),
+            })
+
+    for form in forms:
+        form["node_id"] = law_ids.get(f"{form['law_path']}.reporting_forms[{form['form_index']}]", -1)
+
+    tables = {"laws": laws, "forms": forms, "penalties": penalties, "enforcement": enforcement}
+    return tables, vectors, ground_truth_vectors
+
+
+def _write_store(root: Path, rows: List[Tuple[str, Any]]) -> None:
+    dimension = len(rows[0][1]) if rows else None
+    store = VectorStore(root, dimension=dimension)
+    if rows:
+        store.add_many([path for path, _ in rows], [vector for _, vector in rows])
+    store.flush()
+
+
+def compile_law_corpus(law_file: Path = LAW_REFERENCES_FILE, corpus_dir: Path = CORPUS_DIR) -> LawCorpus:
+    """Compile the law reference file into flat tables and vector stores"""
+    law_file, corpus_dir = Path(law_file), Path(corpus_dir)
+    start = time.perf_counter()
+    stamp = source_stamp(law_file)
+    with open(law_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    tables, vectors, ground_truth_vectors = compile_tables(data)
+
+    # Build next to the target and swap it in, so readers never see a partial corpus
+    corpus_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = corpus_dir.parent / f".{corpus_dir.name}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+
+    _write_store(tmp_dir / VECTORS_DIRNAME, vectors)
+    _write_store(tmp_dir / GROUND_TRUTH_VECTORS_DIRNAME, ground_truth_vectors)
+
+    conn = sqlite3.connect(str(tmp_dir / DB_FILENAME))
+    try:
+        conn.executescript(SCHEMA)
+        for table, rows in tables.items():
+            if not rows:
+                continue
+            columns = list(rows[0].keys())
+            conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [[json.dumps(row[c], ensure_ascii=False) if c in JSON_COLUMNS else row[c] for c in columns]
+                 for row in rows]
+            )
+        meta = {**stamp, "format_version": FORMAT_VERSION, "compiled": time.time()}
+        conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [(k, str(v)) for k, v in meta.items()])
+        conn.commit()
+    finally:
+        conn.close()
+
+    shutil.rmtree(corpus_dir, ignore_errors=True)
+    os.replace(tmp_dir, corpus_dir)
+
+    counts = ", ".join(f"{len(rows)} {table}" for table, rows in tables.items())
+    print(f"   ✅ Compiled law corpus ({counts}) in {time.perf_counter() - start:.2f}s")
+    return LawCorpus.open(corpus_dir)
+
+
+def _is_current(corpus_dir: Path, law_file: Path) -> bool:
+    db_path = corpus_dir / DB_FILENAME
+    if not db_path.exists():
+        return False
+    try:
+        conn = sqlite3.connect(str(db_path))
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+    stamp = source_stamp(law_file)
+    return (meta.get("format_version") == str(FORMAT_VERSION)
+            and all(meta.get(key) == str(value) for key, value in stamp.items()))
+
+
+def load_law_corpus(law_file: Path = LAW_REFERENCES_FILE, corpus_dir: Path = CORPUS_DIR) -> LawCorpus:
+    """Open the compiled corpus, recompiling first if the law file changed since the last compile"""
+    law_file, corpus_dir = Path(law_file), Path(corpus_dir)
+    if not law_file.exists():
+        raise FileNotFoundError(law_file)
+    if _is_current(corpus_dir, law_file):
+        return LawCorpus.open(corpus_dir)
+    return compile_law_corpus(law_file, corpus_dir)
+
+
+def main():
+    """Compile the law corpus or describe the compiled one."""
+    command = sys.argv[1] if len(sys.argv) > 1 else "info"
+    if command == "compile":
+        compile_law_corpus()
+    elif command == "info":
+        corpus = load_law_corpus()
+        print(f"Law corpus in {CORPUS_DIR} (source {corpus.meta.get('source')}):")
+        print(f"  laws: {len(corpus.laws)}  forms: {len(corpus.forms)}  "
+              f"penalties: {len(corpus.penalties)}  enforcement: {len(corpus.enforcement)}")
+        print(f"  vectors: {corpus.vectors.shape}  ground truth vectors: {corpus.ground_truth_vectors.shape}")
+    else:
+        print(__doc__)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
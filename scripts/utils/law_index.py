@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Persisted FAISS Law Index
+
+Builds the FAISS index over law embeddings once and stores it on disk with its
+id map, keyed by a content hash of the law corpus (ordered ids + vectors) and
+the index parameters. Later runs with the same corpus reload the index instead
+of rebuilding it.
+
+Backends:
+    flat    exact inner-product search (IndexFlatIP); right for thousands of laws
+    ivfpq   inverted lists + product quantization (IndexIVFPQ); compact, approximate
+    hnsw    graph search (IndexHNSWFlat); fast approximate search, no training
+
+The backend and its parameters come from LawIndexConfig, by default read from
+the environment (LAW_INDEX_KIND, LAW_INDEX_NLIST, LAW_INDEX_PQ_M,
+LAW_INDEX_PQ_BITS, LAW_INDEX_NPROBE, LAW_INDEX_HNSW_M,
+LAW_INDEX_EF_CONSTRUCTION, LAW_INDEX_EF_SEARCH).
+
+Usage:
+    python scripts/utils/law_index.py info
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+INDEX_FILENAME = "index.faiss"
+META_FILENAME = "meta.json"
+KEEP_INDEXES = 3
+KINDS = ("flat", "ivfpq", "hnsw")
+# FAISS k-means wants this many training points per centroid (IVF lists and PQ
+# codebooks); with fewer laws than that IVF-PQ falls back to exact search
+MIN_TRAIN_POINTS_PER_LIST = 39
+
+
+def default_index_dir() -> Path:
+    """data/cache/law_index in the repo"""
+    from scripts.utils.paths import DATA_CACHE_DIR
+    return DATA_CACHE_DIR / "law_index"
+
+
+def _faiss():
+    """The faiss module, imported on first use"""
+    from scripts.utils.backends import require
+    return require("faiss")
+
+
+@dataclass
+class LawIndexConfig:
+    """Backend choice and parameters (build-time ones are part of the cache key)"""
+    kind: str = "flat"
+    nlist: int = 1024             # ivfpq: inverted lists
+    pq_m: int = 48                # ivfpq: sub-quantizers (must divide the dimension)
+    pq_bits: int = 8              # ivfpq: bits per sub-quantizer code
+    nprobe: int = 32              # ivfpq: lists visited per query
+    hnsw_m: int = 32              # hnsw: graph neighbours per node
+    ef_construction: int = 200    # hnsw: build-time beam width
+    ef_search: int = 128          # hnsw: query-time beam width
+
+    def __post_init__(self):
+        self.kind = self.kind.lower()
+        if self.kind not in KINDS:
+            raise ValueError(f"Unknown law index kind '{self.kind}' (expected one of {', '.join(KINDS)})")
+
+    @classmethod
+    def from_env(cls) -> "LawIndexConfig":
+        defaults = cls()
+        return cls(
+            kind=os.environ.get("LAW_INDEX_KIND", defaults.kind),
+            nlist=int(os.environ.get("LAW_INDEX_NLIST", defaults.nlist)),
+            pq_m=int(os.environ.get("LAW_INDEX_PQ_M", defaults.pq_m)),
+            pq_bits=int(os.environ.get("LAW_INDEX_PQ_BITS", defaults.pq_bits)),
+            nprobe=int(os.environ.get("LAW_INDEX_NPROBE", defaults.nprobe)),
+            hnsw_m=int(os.environ.get("LAW_INDEX_HNSW_M", defaults.hnsw_m)),
+            ef_construction=int(os.environ.get("LAW_INDEX_EF_CONSTRUCTION", defaults.ef_construction)),
+            ef_search=int(os.environ.get("LAW_INDEX_EF_SEARCH", defaults.ef_search)),
+        )
+
+    def build_params(self) -> Dict[str, Any]:
+        """Parameters that change the built index (query-time knobs excluded)"""
+        if self.kind == "ivfpq":
+            return {"kind": self.kind, "nlist": self.nlist, "pq_m": self.pq_m, "pq_bits": self.pq_bits}
+        if self.kind == "hnsw":
+            return {"kind": self.kind, "hnsw_m": self.hnsw_m, "ef_construction": self.ef_construction}
+        return {"kind": self.kind}
+
+
+def corpus_hash(law_ids: Sequence[str], vectors: np.ndarray, config: LawIndexConfig) -> str:
+    """Content address of an index: ordered ids, vector bytes and build parameters"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps(config.build_params(), sort_keys=True).encode("utf-8"))
+    for law_id in law_ids:
+        digest.update(law_id.encode("utf-8"))
+        digest.update(b"\x00")
+    digest.update(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+class LawIndex:
+    """A FAISS index over law vectors plus the law id of every row"""
+
+    def __init__(self, index: Any, law_ids: List[str], config: LawIndexConfig, key: str,
+                 kind: str, loaded: bool = False):
+        self.index = index
+        self.law_ids = law_ids
+        self.config = config
+        self.key = key
+        self.kind = kind
+        self.loaded = loaded
+        self.apply_search_params()
+
+    @property
+    def dimension(self) -> int:
+        return self.index.d
+
+    def __len__(self) -> int:
+        return self.index.ntotal
+
+    def apply_search_params(self) -> None:
+        """Set query-time parameters (nprobe / efSearch) from the config"""
+        faiss = _faiss()
+        if self.kind == "ivfpq":
+            faiss.extract_index_ivf(self.index).nprobe = self.config.nprobe
+        elif self.kind == "hnsw":
+            self.index.hnsw.efSearch = self.config.ef_search
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(scores, row indices), both (n, k); missing neighbours have index -1"""
+        return self.index.search(np.ascontiguousarray(queries, dtype=np.float32), k)
+
+
+def _build_faiss_index(vectors: np.ndarray, config: LawIndexConfig) -> Tuple[Any, str]:
+    """Construct and fill the configured index; returns (index, effective kind)"""
+    faiss = _faiss()
+
+    n, dimension = vectors.shape
+    kind = config.kind
+
+    if kind == "ivfpq":
+        nlist = min(config.nlist, max(1, n // MIN_TRAIN_POINTS_PER_LIST))
+        if nlist < 2 or dimension % config.pq_m != 0 or n < MIN_TRAIN_POINTS_PER_LIST * 2 ** config.pq_bits:
+            print(f"   ⚠️  {n} laws are too few for IVF-PQ (nlist={config.nlist}, m={config.pq_m}); using flat index")
+            kind = "flat"
+        else:
+            quantizer = faiss.IndexFlatIP(dimension)
+            index = faiss.IndexIVFPQ(quantizer, dimension, nlist, config.pq_m, config.pq_bits,
+                                     faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            index.add(vectors)
+            return index, kind
+
+    if kind == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, config.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = config.ef_construction
+        index.add(vectors)
+        return index, kind
+
+    index = faiss.IndexFlatIP(dimension)
+    index.add(vectors)
+    return index, "flat"
+
+
+def load_or_build_law_index(law_ids: Sequence[str], vectors: np.ndarray,
+                            config: Optional[LawIndexConfig] = None,
+                            index_dir: Optional[Path] = None) -> LawIndex:
+    """Return the persisted index for this corpus, building and saving it on a miss"""
+    faiss = _faiss()
+
+    config = config or LawIndexConfig.from_env()
+    index_dir = Path(index_dir) if index_dir else default_index_dir()
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    law_ids = list(law_ids)
+    key = corpus_hash(law_ids, vectors, config)
+    entry_dir = index_dir / key
+
+    meta = _read_meta(entry_dir)
+    if meta is not None:
+        try:
+            index = faiss.read_index(str(entry_dir / INDEX_FILENAME))
+            os.utime(entry_dir)  # Mark as recently used for pruning
+            return LawIndex(index, meta["law_ids"], config, key, meta["kind"], loaded=True)
+        except RuntimeError as e:
+            print(f"   ⚠️  Could not read cached law index {entry_dir}: {e}; rebuilding")
+
+    start = time.perf_counter()
+    index, kind = _build_faiss_index(vectors, config)
+    build_seconds = time.perf_counter() - start
+
+    # Write into a temporary directory and rename, so readers never see a partial entry
+    index_dir.mkdir(parents=True, exist_ok=True)
+    tmp_dir = index_dir / f".{key}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+    faiss.write_index(index, str(tmp_dir / INDEX_FILENAME))
+    with open(tmp_dir / META_FILENAME, "w", encoding="utf-8") as f:
+        json.dump({
+            "format_version": FORMAT_VERSION,
+            "key": key,
+            "kind": kind,
+            "config": asdict(config),
+            "dimension": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+            "count": len(law_ids),
+            "build_seconds": round(build_seconds, 3),
+            "created": time.time(),
+            "law_ids": law_ids,
+        }, f, ensure_ascii=False)
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.replace(tmp_dir, entry_dir)
+    prune_law_indexes(index_dir)
+
+    return LawIndex(index, law_ids, config, key, kind, loaded=False)
+
+
+def _read_meta(entry_dir: Path) -> Optional[Dict[str, Any]]:
+    meta_path = entry_dir / META_FILENAME
+    if not meta_path.exists() or not (entry_dir / INDEX_FILENAME).exists():
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return None
+    return meta if meta.get("format_version") == FORMAT_VERSION else None
+
+
+def prune_law_indexes(index_dir: Path, keep: int = KEEP_INDEXES) -> None:
+    """Remove all but the `keep` most recently used index entries"""
+    entries = sorted((p for p in Path(index_dir).iterdir() if p.is_dir() and not p.name.startswith(".")),
+                     key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in entries[keep:]:
+        shutil.rmtree(stale, ignore_errors=True)
+
+
+def main():
+    """List persisted law indexes."""
+    PROJECT_ROOT = Path(__file__).parent.parent.parent
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+    index_dir = default_index_dir()
+    entries = sorted(index_dir.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True) if index_dir.exists() else []
+    print(f"Law indexes in {index_dir}:")
+    for entry in entries:
+        meta = _read_meta(entry)
+        if meta is None:
+            continue
+        size_mb = (entry / INDEX_FILENAME).stat().st_size / 1e6
+        print(f"  {meta['key']}  {meta['kind']:<6} {meta['count']:>8} x {meta['dimension']}  "
+              f"{size_mb:.1f} MB  built in {meta['build_seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
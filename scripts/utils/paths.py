@@ -50,6 +50,7 @@ DATA_SCRAPED_DIR = DATA_DIR / "scraped"
 DATA_VECTORS_DIR = DATA_DIR / "vectors"
 DATA_PROCESSED_DIR = DATA_DIR / "processed"
 DATA_PROCESSED_DIR = DATA_DIR / "processed"
+DATA_CACHE_DIR = DATA_DIR / "cache"
 
 # Research subdirectories
 RESEARCH_CONNECTIONS_DIR = RESEARCH_DIR / "connections"
@@ -61,7 +62,8 @@ RESEARCH_TIMELINES_DIR = RESEARCH_DIR / "timelines"
 RESEARCH_SUMMARIES_DIR = RESEARCH_DIR / "summaries"
 RESEARCH_SEARCH_RESULTS_DIR = RESEARCH_DIR / "search_results"
 
-# Ensure directories exist using efficient pattern
+# Directories are not created on import: entry points call ensure_directories()
+# and individual writers create their own output directories
 def ensure_directories() -> None:
     """Ensure all necessary directories exist."""
     directories = [
@@ -75,6 +77,3 @@ def ensure_directories() -> None:
 
     # Use list comprehension for efficiency
     [directory.mkdir(parents=True, exist_ok=True) for directory in directories]
-
-# Initialize directories on import
-ensure_directories()
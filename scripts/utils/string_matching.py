@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Multi-Pattern String Matching
+
+Aho-Corasick automaton for finding which of a fixed set of reference strings
+occur inside many candidate strings in one pass per candidate, instead of
+testing every (candidate, reference) pair with `in`.
+
+Uses the `pyahocorasick` C extension when installed and a pure-Python automaton
+otherwise; both report the lowest-index pattern contained in a text, which
+matches "first reference in list order that matches" loop semantics.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    import ahocorasick as _ahocorasick
+except ImportError:
+    _ahocorasick = None
+
+
+class AhoCorasick:
+    """Automaton over `patterns`; empty patterns are ignored."""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._automaton = None
+
+        if _ahocorasick is not None:
+            automaton = _ahocorasick.Automaton()
+            for i, pattern in enumerate(self.patterns):
+                if pattern and not automaton.exists(pattern):
+                    automaton.add_word(pattern, i)
+            if len(automaton):
+                automaton.make_automaton()
+                self._automaton = automaton
+            return
+
+        # Pure-Python trie: goto transitions, failure links and, per node, the
+        # lowest pattern index that ends at that node or anywhere on its fail chain
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._first: List[int] = [-1]
+
+        for i, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._first.append(-1)
+                node = nxt
+            if self._first[node] == -1:
+                self._first[node] = i
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                inherited = self._first[self._fail[child]]
+                if inherited != -1 and (self._first[child] == -1 or inherited < self._first[child]):
+                    self._first[child] = inherited
+
+    def first_match(self, text: str) -> int:
+        """Lowest index of a pattern occurring in `text`, or -1."""
+        if not text:
+            return -1
+
+        if _ahocorasick is not None:
+            if self._automaton is None:
+                return -1
+            best = -1
+            for _, index in self._automaton.iter(text):
+                if best == -1 or index < best:
+                    best = index
+                    if best == 0:
+                        break
+            return best
+
+        goto, fail, first = self._goto, self._fail, self._first
+        node = 0
+        best = -1
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            found = first[node]
+            if found != -1 and (best == -1 or found < best):
+                best = found
+                if best == 0:
+                    break
+        return best
+
+
+def first_contained_pattern(texts: Iterable[str], patterns: Sequence[str],
+                            matcher: Optional[AhoCorasick] = None) -> Dict[str, int]:
+    """Map each distinct non-empty text to the lowest-index pattern it contains.
+
+    Texts equal to a pattern are resolved by hash lookup; only the remainder is
+    scanned with the automaton. Texts containing no pattern are omitted.
+    """
+    matcher = matcher or AhoCorasick(patterns)
+
+    # A text equal to pattern p contains exactly the patterns contained in p
+    exact: Dict[str, int] = {}
+    for pattern in patterns:
+        if pattern and pattern not in exact:
+            exact[pattern] = matcher.first_match(pattern)
+
+    result: Dict[str, int] = {}
+    for text in set(texts):
+        if not text:
+            continue
+        index = exact.get(text)
+        if index is None:
+            index = matcher.first_match(text)
+        if index != -1:
+            result[text] = index
+    return result
+
+
+def substrings_of(strings: Iterable[str]) -> set:
+    """Every non-empty substring of the given strings (for small reference sets)."""
+    result = set()
+    for s in strings:
+        for start in range(len(s)):
+            for end in range(start + 1, len(s) + 1):
+                result.add(s[start:end])
+    return result
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Binary Vector Store
+
+Stores embeddings as a flat float32 matrix on disk instead of JSON float lists.
+Each store is a directory holding:
+
+    vectors.f32   raw little-endian float32 rows (count x dimension)
+    index.json    sidecar with dimension, model, row count and the id of each row
+
+Readers memory-map the matrix, so loading vectors costs an mmap rather than a
+json.load, and `get()`/`matrix()` return zero-copy numpy views.
+
+Usage:
+    python scripts/utils/vector_store.py migrate research/texas/pdf_analysis
+    python scripts/utils/vector_store.py info research/texas/pdf_analysis/vectors
+"""
+
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+VECTORS_FILENAME = "vectors.f32"
+INDEX_FILENAME = "index.json"
+FORMAT_VERSION = 1
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_DIMENSION = 384
+
+
+class VectorStore:
+    """Append-only float32 vector store with an id sidecar.
+
+    Writers call `add()`/`add_many()` and then `flush()`; rows are only visible to
+    readers once the sidecar has been rewritten. Re-adding an existing id
+    overwrites its row in place. Safe to share between threads of one process.
+    """
+
+    def __init__(self, root: Path, dimension: Optional[int] = None, model: str = DEFAULT_MODEL):
+        self.root = Path(root)
+        self.vectors_path = self.root / VECTORS_FILENAME
+        self.index_path = self.root / INDEX_FILENAME
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.memmap] = None
+
+        index = self._read_index()
+        if index:
+            if dimension is not None and dimension != index["dimension"]:
+                raise ValueError(
+                    f"Vector store {self.root} has dimension {index['dimension']}, requested {dimension}"
+                )
+            self.dimension = int(index["dimension"])
+            self.model = index.get("model", model)
+            self._ids: List[str] = list(index.get("ids", []))
+        else:
+            self.dimension = int(dimension or DEFAULT_DIMENSION)
+            self.model = model
+            self._ids = []
+
+        self._offsets: Dict[str, int] = {key: i for i, key in enumerate(self._ids)}
+        self._pending_ids: List[str] = []
+        self._pending_rows: List[np.ndarray] = []
+        self._pending_updates: Dict[int, np.ndarray] = {}
+
+    def _read_index(self) -> Optional[Dict[str, Any]]:
+        if not self.index_path.exists():
+            return None
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def __len__(self) -> int:
+        return len(self._ids) + len(self._pending_ids)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._offsets
+
+    @property
+    def ids(self) -> List[str]:
+        """Row ids in offset order (including rows not yet flushed)."""
+        return self._ids + self._pending_ids
+
+    def offset(self, key: str) -> Optional[int]:
+        """Row offset for an id, or None if it is not stored."""
+        return self._offsets.get(key)
+
+    def _as_row(self, vector: Any) -> np.ndarray:
+        row = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if row.shape[0] != self.dimension:
+            raise ValueError(f"Expected vector of dimension {self.dimension}, got {row.shape[0]}")
+        return row
+
+    def add(self, key: str, vector: Any) -> int:
+        """Queue a vector for `key` and return its row offset."""
+        row = self._as_row(vector)
+        with self._lock:
+            existing = self._offsets.get(key)
+            if existing is not None:
+                if existing >= len(self._ids):
+                    self._pending_rows[existing - len(self._ids)] = row
+                else:
+                    self._pending_updates[existing] = row
+                return existing
+
+            offset = len(self._ids) + len(self._pending_ids)
+            self._offsets[key] = offset
+            self._pending_ids.append(key)
+            self._pending_rows.append(row)
+            return offset
+
+    def add_many(self, keys: Iterable[str], vectors: Any) -> List[int]:
+        """Queue a block of vectors; `vectors` is any (n, dimension) array-like."""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        keys = list(keys)
+        if matrix.ndim != 2 or matrix.shape[0] != len(keys):
+            raise ValueError(f"Expected ({len(keys)}, {self.dimension}) matrix, got {matrix.shape}")
+        return [self.add(key, matrix[i]) for i, key in enumerate(keys)]
+
+    def flush(self) -> None:
+        """Append pending rows to disk, apply in-place updates, then publish the sidecar."""
+        with self._lock:
+            if not self._pending_rows and not self._pending_updates and self.index_path.exists():
+                return
+
+            self.root.mkdir(parents=True, exist_ok=True)
+
+            if self._pending_updates:
+                rows = np.memmap(self.vectors_path, dtype=np.float32, mode='r+',
+                                 shape=(len(self._ids), self.dimension))
+                for offset, row in self._pending_updates.items():
+                    rows[offset] = row
+                rows.flush()
+                del rows
+
+            if self._pending_rows:
+                # Truncate any rows left over from an interrupted flush before appending
+                expected_bytes = len(self._ids) * self.dimension * 4
+                with open(self.vectors_path, 'ab') as f:
+                    f.truncate(expected_bytes)
+                    np.stack(self._pending_rows).astype('<f4', copy=False).tofile(f)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            self._ids.extend(self._pending_ids)
+            self._pending_ids = []
+            self._pending_rows = []
+            self._pending_updates = {}
+            self._matrix = None
+            self._write_index()
+
+    def _write_index(self) -> None:
+        index = {
+            'format_version': FORMAT_VERSION,
+            'dtype': 'float32',
+            'model': self.model,
+            'dimension': self.dimension,
+            'count': len(self._ids),
+            'vectors_file': VECTORS_FILENAME,
+            'ids': self._ids,
+        }
+        tmp_path = self.index_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'), ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def matrix(self) -> np.ndarray:
+        """Read-only memory-mapped (count, dimension) view of all flushed rows."""
+        if self._matrix is None:
+            if not self._ids:
+                return np.empty((0, self.dimension), dtype=np.float32)
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r',
+                                     shape=(len(self._ids), self.dimension))
+        return self._matrix
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Vector for `key` as a view into the memory map (pending rows are returned as copies)."""
+        offset = self._offsets.get(key)
+        if offset is None:
+            return None
+        if offset >= len(self._ids):
+            return self._pending_rows[offset - len(self._ids)]
+        if offset in self._pending_updates:
+            return self._pending_updates[offset]
+        return self.matrix()[offset]
+
+    def get_many(self, keys: Iterable[str]) -> np.ndarray:
+        """Stack vectors for `keys` into a new (n, dimension) array; missing ids raise KeyError."""
+        offsets = []
+        for key in keys:
+            offset = self._offsets.get(key)
+            if offset is None or offset >= len(self._ids):
+                raise KeyError(key)
+            offsets.append(offset)
+        return self.matrix()[np.asarray(offsets, dtype=np.int64)]
+
+    def ref(self, key: str) -> Dict[str, Any]:
+        """JSON-serialisable pointer to a stored vector, for embedding in records."""
+        return {
+            'store': store_relpath(self.root),
+            'id': key,
+            'offset': self._offsets[key],
+            'dimension': self.dimension,
+        }
+
+
+_open_stores: Dict[str, VectorStore] = {}
+_open_stores_lock = threading.Lock()
+
+
+def store_relpath(root: Path) -> str:
+    """Path of a store relative to the project root when possible."""
+    root = Path(root).resolve()
+    try:
+        from scripts.utils.paths import PROJECT_ROOT
+        return str(root.relative_to(PROJECT_ROOT.resolve()))
+    except (ImportError, ValueError):
+        return str(root)
+
+
+def open_store(root: Path, dimension: Optional[int] = None, model: str = DEFAULT_MODEL) -> VectorStore:
+    """Return the process-wide VectorStore for `root`, creating it on first use."""
+    key = str(Path(root).resolve())
+    with _open_stores_lock:
+        store = _open_stores.get(key)
+        if store is None:
+            store = VectorStore(Path(root), dimension=dimension, model=model)
+            _open_stores[key] = store
+        return store
+
+
+def resolve_embedding(record: Dict[str, Any], base_dir: Optional[Path] = None) -> Optional[np.ndarray]:
+    """Return a record's embedding whether it is stored inline or as an `embedding_ref`."""
+    embedding = record.get('embedding')
+    if embedding is not None and not isinstance(embedding, dict):
+        if isinstance(embedding, str):
+            embedding = json.loads(embedding)
+        return np.asarray(embedding, dtype=np.float32)
+
+    ref = record.get('embedding_ref') or (embedding if isinstance(embedding, dict) else None)
+    if not ref:
+        return None
+
+    store_path = Path(ref['store'])
+    if not store_path.is_absolute():
+        if base_dir is None:
+            from scripts.utils.paths import PROJECT_ROOT
+            base_dir = PROJECT_ROOT
+        store_path = Path(base_dir) / store_path
+    store = open_store(store_path)
+    vector = store.get(ref['id'])
+    if vector is None and ref.get('offset') is not None and ref['offset'] < len(store.matrix()):
+        vector = store.matrix()[ref['offset']]
+    return vector
+
+
+def migrate_json_tree(json_dir: Path, store_dir: Optional[Path] = None) -> Dict[str, int]:
+    """Move inline `embedding` lists from JSON files under `json_dir` into a store.
+
+    Each rewritten file keeps its other fields and gains an `embedding_ref` pointer.
+    Files are keyed by their path relative to `json_dir`. JSON files are only
+    rewritten after the store flush that publishes their rows, so an
+    interrupted migration never leaves a file pointing at an unpublished row.
+    """
+    json_dir = Path(json_dir)
+    store_dir = Path(store_dir) if store_dir else json_dir / "vectors"
+    store: Optional[VectorStore] = None
+    stats = {'scanned': 0, 'migrated': 0, 'skipped': 0}
+    rewrites: List[tuple] = []
+
+    def publish():
+        store.flush()
+        for path, updated in rewrites:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(updated, f, indent=2, ensure_ascii=False)
+        stats['migrated'] += len(rewrites)
+        rewrites.clear()
+
+    for json_file in sorted(json_dir.rglob("*.json")):
+        if store_dir in json_file.parents:
+            continue
+        stats['scanned'] += 1
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError, OSError):
+            stats['skipped'] += 1
+            continue
+
+        embedding = record.get('embedding') if isinstance(record, dict) else None
+        if not isinstance(embedding, (list, str)) or not embedding:
+            stats['skipped'] += 1
+            continue
+
+        vector = resolve_embedding(record)
+        if store is None:
+            store = open_store(store_dir, dimension=int(vector.shape[0]))
+        key = str(json_file.relative_to(json_dir))
+        store.add(key, vector)
+        record['embedding'] = None
+        record['embedding_ref'] = store.ref(key)
+        rewrites.append((json_file, record))
+
+        # Publish periodically so an interrupted migration loses at most one batch of work
+        if len(rewrites) >= 1000:
+            publish()
+
+    if store is not None:
+        publish()
+    return stats
+
+
+def main():
+    """Command-line entry point for migrating and inspecting stores."""
+    import argparse
+
+    PROJECT_ROOT = Path(__file__).parent.parent.parent
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+    parser = argparse.ArgumentParser(description="Binary vector store utilities")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Move inline JSON embeddings into a store")
+    migrate_parser.add_argument("json_dir", type=Path)
+    migrate_parser.add_argument("--store", type=Path, default=None,
+                                help="Store directory (default: <json_dir>/vectors)")
+
+    info_parser = subparsers.add_parser("info", help="Show store statistics")
+    info_parser.add_argument("store", type=Path)
+
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        stats = migrate_json_tree(args.json_dir, args.store)
+        print(f"Scanned {stats['scanned']} files, migrated {stats['migrated']}, skipped {stats['skipped']}")
+    elif args.command == "info":
+        store = VectorStore(args.store)
+        size_mb = store.vectors_path.stat().st_size / 1e6 if store.vectors_path.exists() else 0.0
+        print(f"Store: {args.store}")
+        print(f"  Model: {store.model}")
+        print(f"  Vectors: {len(store)} x {store.dimension} float32 ({size_mb:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
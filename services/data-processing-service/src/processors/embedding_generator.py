@@ -4,6 +4,7 @@ Generates embeddings using sentence-transformers
 """
 
 from sentence_transformers import SentenceTransformer
+from processors.embedding_cache import CachedEncoder
 import numpy as np
 import logging
 from typing import List, Dict, Any, Optional
@@ -21,7 +22,8 @@ class EmbeddingGenerator:
             model_name: HuggingFace model name for sentence transformers
         """
         logger.info(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        # Repeated texts are served from the on-disk embedding cache
+        self.model = CachedEncoder(SentenceTransformer(model_name), model_name=model_name)
         self.model_name = model_name
         self.dimension = self.model.get_sentence_embedding_dimension()
         logger.info(f"Embedding model loaded. Dimension: {self.dimension}")
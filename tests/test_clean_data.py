@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Regression tests for bin/clean_data.py date parsing and streaming deduplication
+
+Run with:
+    python -m pytest tests/test_clean_data.py
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "bin"))
+
+from clean_data import StreamingDeduplicator, _parse_date_value, dedup_keys, parse_date_column  # noqa: E402
+
+
+def test_parse_date_column_outside_nanosecond_range():
+    """Dates past 2262 or before 1677 parse column-wise like the row-wise fallback"""
+    values = pd.Series(['01/15/2020', '12/31/9999', '01/01/1600', '02/29/2024'])
+    parsed, format_hits = parse_date_column(values)
+    assert parsed.tolist() == ['2020-01-15', '9999-12-31', '1600-01-01', '2024-02-29']
+    assert parsed.tolist() == [_parse_date_value(value) for value in values]
+    assert format_hits == {'%m/%d/%Y': 4}
+
+
+def test_parse_date_column_keeps_unparsed_values():
+    values = pd.Series(['2020-03-04', 'not a date', None])
+    parsed, format_hits = parse_date_column(values)
+    assert parsed.iloc[0] == '2020-03-04'
+    assert parsed.iloc[1] == 'not a date'
+    assert pd.isna(parsed.iloc[2])
+    assert format_hits == {'%Y-%m-%d': 1, 'unparsed': 1}
+
+
+def test_streaming_deduplicator_matches_whole_frame():
+    """Chunked keep-first dedup keeps the same rows as deduplicating the whole frame"""
+    ids = [str(i % 37) for i in range(500)]
+    df = pd.DataFrame({'name': ids, 'address': ids, 'license_number': ids, 'state': 'TX'})
+    dedup = StreamingDeduplicator()
+    kept = pd.concat([dedup.filter(df.iloc[start:start + 64]) for start in range(0, len(df), 64)])
+    assert kept.index.equals(df[~dedup_keys(df).duplicated()].index)
+    assert len(dedup.seen) == 37
+
+
+if __name__ == "__main__":
+    test_parse_date_column_outside_nanosecond_range()
+    test_parse_date_column_keeps_unparsed_values()
+    test_streaming_deduplicator_matches_whole_frame()
+    print("✓ clean_data tests passed")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for scripts/analysis/utils/neighbor_dbscan.py: every neighbour search
+backend must reproduce DBSCAN(metric='cosine') labels
+
+Run with:
+    python -m pytest tests/test_neighbor_dbscan.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+from sklearn.cluster import DBSCAN
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.analysis.utils.neighbor_dbscan import RadiusGraph  # noqa: E402
+from scripts.utils import backends  # noqa: E402
+
+METHODS = ["blocked", "ball_tree"] + (["faiss"] if backends.available("faiss") else [])
+
+
+def reference_labels(vectors, eps, min_samples):
+    return DBSCAN(eps=eps, min_samples=min_samples, metric="cosine").fit_predict(vectors)
+
+
+def check_backends(vectors, eps, min_samples=2):
+    expected = reference_labels(vectors, eps, min_samples)
+    for method in METHODS:
+        labels = RadiusGraph.build(vectors, eps, method).dbscan(eps, min_samples)
+        assert np.array_equal(labels, expected), f"{method} labels differ for eps={eps}"
+
+
+def test_clustered_embeddings():
+    rng = np.random.default_rng(0)
+    centres = rng.standard_normal((20, 16))
+    vectors = (centres[rng.integers(0, 20, 500)] + 0.3 * rng.standard_normal((500, 16))).astype(np.float32)
+    for eps in (0.05, 0.2, 0.5):
+        check_backends(vectors, eps)
+
+
+def test_zero_rows_are_distance_one_from_everything():
+    vectors = np.array([[1, 0], [0, 1], [0, 0], [-1, 0]], dtype=np.float32)
+    check_backends(vectors, eps=0.6)
+    assert (reference_labels(vectors, 0.6, 2) == -1).all()
+    # Once eps reaches 1 the zero row links to every point, as in sklearn
+    check_backends(vectors, eps=1.0)
+    check_backends(np.vstack([vectors, np.zeros((2, 2), dtype=np.float32)]), eps=1.0)
+
+
+if __name__ == "__main__":
+    test_clustered_embeddings()
+    test_zero_rows_are_distance_one_from_everything()
+    print("✓ neighbor_dbscan backend tests passed")
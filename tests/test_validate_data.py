@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Regression tests for bin/validate_data.py date validation
+
+Run with:
+    python -m pytest tests/test_validate_data.py
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path[:0] = [str(PROJECT_ROOT), str(PROJECT_ROOT / "bin")]
+
+from validate_data import validate_dates  # noqa: E402
+
+
+def test_dates_outside_nanosecond_range_are_out_of_range():
+    """A nanosecond-precision value in the column must not push 9999-12-31 to NaT"""
+    df = pd.DataFrame({'expiration_date': ['12/31/9999', '01/01/1600', '2020-01-01 10:00:00.123456789',
+                                           'garbage', None]})
+    result = validate_dates(df)
+    assert result['expiration_date_issue'].tolist() == [
+        "Date out of reasonable range",
+        "Date out of reasonable range",
+        "",
+        "Invalid date format",
+        "Missing date",
+    ]
+    assert result['expiration_date_valid'].tolist() == [False, False, True, False, False]
+
+
+if __name__ == "__main__":
+    test_dates_outside_nanosecond_range_are_out_of_range()
+    print("✓ validate_data date tests passed")